@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import LLMUsage, TripTemplate
+
+
+@admin.register(LLMUsage)
+class LLMUsageAdmin(admin.ModelAdmin):
+    list_display = ['date', 'user', 'operation', 'requests', 'calls', 'retries', 'failures',
+                    'prompt_tokens', 'response_tokens', 'cost_usd']
+    list_filter = ['date', 'operation']
+    search_fields = ['user__username', 'user__email']
+    ordering = ['-date', 'user']
+
+
+@admin.register(TripTemplate)
+class TripTemplateAdmin(admin.ModelAdmin):
+    list_display = ['region', 'travel_style', 'days', 'accommodation_type', 'budget', 'people_count',
+                    'use_count', 'updated_at']
+    list_filter = ['region', 'travel_style', 'days', 'accommodation_type']
+    ordering = ['region', 'travel_style', 'days']
@@ -0,0 +1,177 @@
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import percentile
+
+try:
+    import fcntl
+except ImportError:  # Windows - 파일 잠금 방식 사용 불가
+    fcntl = None
+
+
+# 파일 잠금 방식에서 다른 프로세스의 슬롯 반환을 확인하는 간격 (초)
+_FILE_POLL_INTERVAL = 0.05
+
+
+class LLMOverloaded(Exception):
+    """LLM 동시 실행 한도와 대기열이 모두 찬 경우 (503 응답으로 변환)"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    LLM 호출 요청의 동시 실행 수 제한 (대기열 크기 제한 포함)
+
+    - 'process': 프로세스 내 카운터로 동시 실행 수 제한
+    - 'file': lock_dir의 슬롯 파일(fcntl 잠금)로 같은 서버의 모든 워커 프로세스가 한도를 공유
+    대기열(프로세스 단위)이 가득 차거나 queue_timeout 안에 슬롯을 얻지 못하면 LLMOverloaded를 발생시킵니다.
+    """
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout, retry_after, backend='process', lock_dir=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.lock_dir = None
+        if backend == 'file':
+            if fcntl is None:
+                print('⚠️ 이 플랫폼은 파일 잠금을 지원하지 않아 프로세스 단위 동시 실행 제한을 사용합니다.')
+            else:
+                self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'tripify-llm-slots')
+                os.makedirs(self.lock_dir, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._wait_ms = deque(maxlen=1000)
+        self._counts = {}
+        self._peak_waiting = 0
+
+    @property
+    def backend(self):
+        return 'file' if self.lock_dir else 'process'
+
+    def _count(self, operation, key):
+        counts = self._counts.setdefault(operation, {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0})
+        counts[key] += 1
+
+    def _try_take(self):
+        """슬롯을 즉시 얻을 수 있으면 슬롯 토큰, 아니면 None (self._cond 보유 상태에서 호출)"""
+        if self.lock_dir is None:
+            return True if self._active < self.max_concurrent else None
+
+        for index in range(self.max_concurrent):
+            handle = open(os.path.join(self.lock_dir, f'slot-{index}.lock'), 'a')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except OSError:
+                handle.close()
+        return None
+
+    def acquire(self, operation):
+        """슬롯 획득 (대기열이 가득 차거나 대기 시간 초과 시 LLMOverloaded)"""
+        started = time.monotonic()
+        with self._cond:
+            token = self._try_take() if self._waiting == 0 else None
+            if token is None:
+                if self._waiting >= self.max_queue:
+                    self._count(operation, 'rejected')
+                    raise LLMOverloaded('대기열이 가득 찼습니다.', self.retry_after)
+
+                self._count(operation, 'queued')
+                self._waiting += 1
+                self._peak_waiting = max(self._peak_waiting, self._waiting)
+                deadline = started + self.queue_timeout
+                try:
+                    while token is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._count(operation, 'timed_out')
+                            raise LLMOverloaded('대기 시간이 초과되었습니다.', self.retry_after)
+                        # 파일 잠금은 다른 프로세스가 알려주지 않으므로 주기적으로 다시 확인
+                        self._cond.wait(remaining if self.lock_dir is None else min(remaining, _FILE_POLL_INTERVAL))
+                        token = self._try_take()
+                finally:
+                    self._waiting -= 1
+
+            self._active += 1
+            self._count(operation, 'admitted')
+            self._wait_ms.append((time.monotonic() - started) * 1000)
+        return token
+
+    def release(self, token):
+        """슬롯 반환"""
+        with self._cond:
+            if token is not True:
+                fcntl.flock(token, fcntl.LOCK_UN)
+                token.close()
+            self._active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, operation):
+        """with limiter.slot('generate'): 형태로 LLM 작업 실행"""
+        token = self.acquire(operation)
+        try:
+            yield
+        finally:
+            self.release(token)
+
+    def stats(self):
+        """동시 실행/대기열 현황과 작업별 입장 통계"""
+        with self._cond:
+            wait_ms = sorted(self._wait_ms)
+            return {
+                'backend': self.backend,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queue_depth': self._waiting,
+                'peak_queue_depth': self._peak_waiting,
+                'wait_ms': {
+                    'p50': percentile(wait_ms, 50),
+                    'p95': percentile(wait_ms, 95),
+                    'max': wait_ms[-1] if wait_ms else None,
+                },
+                'operations': {op: dict(counts) for op, counts in self._counts.items()},
+            }
+
+    def reset_stats(self):
+        """입장 통계 초기화 (현재 실행/대기 중인 요청은 유지)"""
+        with self._cond:
+            self._wait_ms.clear()
+            self._counts = {}
+            self._peak_waiting = self._waiting
+
+
+def overloaded_response(exc):
+    """LLMOverloaded를 503 + Retry-After 응답으로 변환"""
+    response = Response({
+        'error': f'AI 요청이 많아 잠시 후 다시 시도해주세요. ({exc.reason})',
+        'retry_after': exc.retry_after,
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+limiter = ConcurrencyLimiter(
+    max_concurrent=settings.LLM_MAX_CONCURRENT,
+    max_queue=settings.LLM_MAX_QUEUE,
+    queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.LLM_RETRY_AFTER_SECONDS,
+    backend=settings.LLM_CONCURRENCY_BACKEND,
+    lock_dir=settings.LLM_CONCURRENCY_LOCK_DIR,
+)
@@ -1,9 +1,22 @@
 import os
 import json
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from django.conf import settings
 from places.models import Place
 from festivals.models import Festival
+from utils.validators import compile_itinerary_validator, validate_itinerary
+from . import metrics
+from .models import LLMUsage
+from .hedging import hedged_call
+from .place_ranker import place_ranker
+from .itinerary_parser import ITINERARY_RESPONSE_SCHEMA, day_number_of, parse_itinerary_text, salvage_itinerary
+from .prompt_builder import build_itinerary_prompt, build_modify_prompt
+from .prompt_compactor import PlaceCatalog, fit_prompt
+from .trip_templates import template_itinerary
 
 load_dotenv()
 
@@ -11,318 +24,521 @@ load_dotenv()
 class GeminiService:
     """SSAFY GMS를 통한 Google Gemini AI 서비스"""
 
-    def __init__(self):
+    def __init__(self, structured_output=None):
         self.api_key = os.getenv('GMS_API_KEY', '')
-        self.base_url = 'https://gms.ssafy.io/gmsapi/generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-lite:generateContent'
+        self.base_url = settings.GEMINI_BASE_URL
+        # 구조화 출력(responseSchema) 사용 여부 - 지정하지 않으면 설정값 사용
+        if structured_output is None:
+            structured_output = settings.GEMINI_STRUCTURED_OUTPUT
+        self.structured_output = structured_output
+        # 이 인스턴스에서 수행한 호출 기록 (요청 단위 집계용)
+        self.calls = []
+        # record_usage 이후 끝난 헤지 요청은 바로 집계 (사용자, 작업)
+        self._calls_lock = threading.Lock()
+        self._usage_owner = None
+
+    def record_usage(self, user, operation):
+        """
+        호출 기록을 사용량 일일 집계(LLMUsage)에 반영
+
+        헤지로 결과를 쓰지 않은 요청은 이 뒤에 끝날 수 있으므로, 그런 호출은 끝나는 대로 같은 집계에 더합니다.
+        """
+        with self._calls_lock:
+            calls = list(self.calls)
+            self._usage_owner = (user, operation)
+        LLMUsage.record(user, operation, calls)
 
-    def generate_itinerary(self, budget, people_count, start_date, end_date, departure_location, region, travel_style, accommodation_type):
+    def generate_itinerary(self, budget, people_count, start_date, end_date, departure_location, region, travel_style, accommodation_type,
+                           use_template=True):
         """
         SSAFY GMS API를 사용하여 여행 일정을 생성
+
+        미리 생성된 템플릿이 있는 조합이면 템플릿을 변환하여 바로 반환합니다.
+        (use_template=False면 항상 Gemini로 생성 - 템플릿 생성 명령어에서 사용)
         """
         # 여행 일수 계산
         days = (end_date - start_date).days + 1
 
+        # 자주 요청되는 조합은 미리 생성된 템플릿 사용
+        if use_template:
+            itinerary_data = template_itinerary(region, travel_style, days, accommodation_type, budget, people_count,
+                                                departure_location)
+            if itinerary_data is not None:
+                return itinerary_data
+
         # 1인당 예산 계산
         budget_per_person = budget // people_count
 
-        # 일일 예산 계산 (총 예산을 일수로 나눔)
-        daily_budget = budget // days
-
         # 예산 허용 범위 (최대 10% 초과까지 허용)
         budget_min = int(budget * 0.9)  # 참고용 (현재는 사용하지 않음)
         budget_max = int(budget * 1.1)  # 예산의 110% 초과 시 재생성
 
         # 데이터베이스에서 해당 지역의 실제 장소 정보 가져오기
-        tourist_spots = self._get_places_by_region(region, 'tourist', limit=15)
-        restaurants = self._get_places_by_region(region, 'restaurant', limit=10)
-        accommodations = self._get_places_by_region(region, 'accommodation', limit=5)
-        festivals = self._get_festivals_by_region(region, start_date, end_date)
-
-        # 장소 정보를 문자열로 포맷팅
-        tourist_spots_str = self._format_places(tourist_spots)
-        restaurants_str = self._format_places(restaurants)
-        accommodations_str = self._format_places(accommodations)
-        festivals_str = self._format_festivals(festivals)
-
-        # 프롬프트 생성
-        prompt = f"""
-다음 조건으로 **정확히 {days}일** 여행 계획을 상세한 JSON 형식으로 작성해주세요:
-**중요: 반드시 {days}일치 일정을 모두 생성해야 합니다. {days-1}일이나 {days+1}일이 아닌 정확히 {days}일입니다.**
-- 총 예산: {budget:,}원 (총 {people_count}명, 1인당 약 {budget_per_person:,}원)
-- 여행 인원: {people_count}명
-- 여행 기간: {start_date} ~ {end_date} ({days}일)
-- 출발지: {departure_location}
-- 여행 지역: {region}
-- 여행 스타일: {travel_style}
-- 숙박 타입: {accommodation_type}
-
-**{region} 지역의 실제 데이터베이스 정보를 활용하세요:**
-
-📍 추천 관광지 (이 중에서 선택하세요):
-{tourist_spots_str}
-
-🍽️ 추천 음식점 (이 중에서 선택하세요):
-{restaurants_str}
-
-🏨 추천 숙박시설 (이 중에서 선택하세요):
-{accommodations_str}
-
-🎉 해당 기간의 축제/행사:
-{festivals_str}
-
-각 일차별로 다음 정보를 **매우 구체적으로** 포함해주세요:
-
-1. **관광지 정보** (attractions):
-   - 위의 추천 관광지 목록에서 선택하여 사용하세요
-   - 각 관광지의 정확한 명칭, 방문 시간, 소요 시간, 간단한 설명 포함
-   - 이동 동선을 고려하여 효율적으로 배치하세요
-
-2. **교통수단 정보** (transportation_info):
-   - 출발지({departure_location})에서 여행 지역({region})으로의 이동 방법을 첫날 일정에 포함하세요
-   - 주요 이동 구간별 교통수단 (버스, 지하철, 택시, 렌터카, KTX, 고속버스 등)
-   - 예상 이동 시간 및 비용
-   - 첫날에는 "{departure_location} → {region}" 이동 경로와 비용을 명시하세요
-
-3. **숙소 정보** (accommodation_info):
-   - {accommodation_type} 타입의 추천 숙소명 또는 숙소 지역
-   - 예상 숙박비
-   - 체크인/체크아웃 시간
-
-4. **식사 정보** (meals_info) - **필수 항목입니다**:
-   - 위의 추천 음식점 목록에서 선택하여 사용하세요
-   - **반드시 아침, 점심, 저녁 각각의 추천 식당명 또는 음식 종류를 포함하세요**
-   - 각 식사마다 예상 식사 비용을 포함하세요
-   - meals_info는 반드시 "아침", "점심", "저녁" 키를 가진 객체여야 합니다
-
-5. **축제/행사 정보** (events_info):
-   - 위에 나열된 축제/행사 정보가 있다면 일정에 포함하세요
-   - 축제명, 시간, 위치 등을 정확히 기재
-
-6. **예상 비용** (estimated_cost):
-   - 해당 일차의 총 예상 비용 (교통비 + 식비 + 입장료 + 숙박비 등)
-
-JSON 형식 (정확히 이 구조를 따라주세요):
-**반드시 "days" 배열에 정확히 {days}개의 일정 객체를 포함해야 합니다. day_number는 1부터 {days}까지 순서대로여야 합니다.**
-
-{{
-  "days": [
-    {{
-      "day_number": 1,
-      "description": "일정 전체 요약 (예: 서울 도심 투어 및 전통문화 체험)",
-      "attractions": [
-        {{
-          "name": "경복궁",
-          "time": "09:00",
-          "duration": "2시간",
-          "description": "조선시대 궁궐, 경회루와 근정전 관람"
-        }},
-        {{
-          "name": "북촌 한옥마을",
-          "time": "11:30",
-          "duration": "1.5시간",
-          "description": "전통 한옥 거리 산책 및 사진 촬영"
-        }}
-      ],
-      "transportation_info": {{
-        "오전": "지하철 3호선 경복궁역 하차 (1,400원)",
-        "오후": "도보 이동 (경복궁→북촌)",
-        "저녁": "택시 이용 (약 8,000원)"
-      }},
-      "accommodation_info": {{
-        "name": "명동 ○○호텔 또는 비슷한 등급",
-        "cost": 80000,
-        "check_in": "15:00",
-        "check_out": "11:00"
-      }},
-      "meals_info": {{
-        "아침": {{
-          "restaurant": "호텔 조식 또는 근처 카페",
-          "cost": 10000
-        }},
-        "점심": {{
-          "restaurant": "삼청동 전통 한정식 (예: ○○식당)",
-          "cost": 15000
-        }},
-        "저녁": {{
-          "restaurant": "명동 칼국수 맛집 (예: ○○집)",
-          "cost": 12000
-        }}
-      }},
-      "events_info": [
-        {{
-          "name": "경복궁 수문장 교대식",
-          "time": "10:00, 14:00",
-          "location": "경복궁 광화문",
-          "description": "전통 수문장 교대 의식 관람 (무료)"
-        }}
-      ],
-      "estimated_cost": 136400
-    }},
-    {{
-      "day_number": 2,
-      "description": "2일차 일정 요약",
-      "attractions": [...],
-      "transportation_info": {{...}},
-      "accommodation_info": {{...}},
-      "meals_info": {{...}},
-      "events_info": [],
-      "estimated_cost": 120000
-    }}{f''',
-    {{
-      "day_number": {days},
-      "description": "{days}일차 일정 요약",
-      "attractions": [...],
-      "transportation_info": {{...}},
-      "accommodation_info": {{...}},
-      "meals_info": {{...}},
-      "events_info": [],
-      "estimated_cost": 110000
-    }}''' if days > 2 else ''}
-  ]
-}}
-
-**중요: 모든 텍스트는 한글로 작성하세요**
-- transportation_info의 키: "오전", "오후", "저녁" 사용 (morning, afternoon, evening 사용 금지)
-- **meals_info는 반드시 포함되어야 하며, "아침", "점심", "저녁" 키를 모두 가져야 합니다** (breakfast, lunch, dinner 사용 금지)
-- 각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함하세요
-- 모든 설명과 내용은 한글로 작성
-- 시간 표기: "09:00", "15:00" 등 숫자는 그대로 사용
-- 장소명과 상호명은 데이터베이스에 있는 그대로 사용
-
-**예산 준수 규칙 (매우 중요)**:
-- 총 예산: {budget:,}원 ({people_count}명 전체 기준)
-- 일일 목표 예산: 약 {daily_budget:,}원
-- **전체 {days}일간 총 비용 합계는 {budget_max:,}원을 초과하지 않아야 합니다 (예산의 110% 이하)**
-- 예산보다 작게 생성되는 것은 문제없지만, 예산을 10% 초과하면 안 됩니다
-- 각 일차의 estimated_cost를 모두 합산했을 때 총 예산의 110%를 넘지 않도록 주의하세요
-- 예산을 초과할 가능성이 있으면 저렴한 음식점/숙소를 선택하고, 불필요한 택시 이용을 줄이세요
-
-**기타 중요 사항**:
-- 반드시 위에 제공된 실제 데이터베이스의 장소/음식점 목록에서 선택하여 사용하세요
-- 장소명은 데이터베이스의 정확한 명칭을 그대로 사용하세요
-- 모든 비용은 {people_count}명 전체를 기준으로 계산해주세요 (예: 숙박비는 {people_count}명이 함께 사용, 식비는 {people_count}명분)
-- 이동 동선이 효율적이도록 근처 장소들을 묶어서 계획해주세요
-- 축제/행사 정보가 있다면 일정에 우선적으로 포함하세요
-- **각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함해야 합니다. 이는 선택 사항이 아닌 필수 항목입니다.**
-"""
+        catalog = self._place_catalog(region, start_date, end_date, travel_style, accommodation_type)
+
+        # 프롬프트 생성 (최대 입력 토큰 수를 넘으면 후보 목록을 줄임)
+        prompt_args = {
+            'budget': budget,
+            'people_count': people_count,
+            'start_date': start_date,
+            'end_date': end_date,
+            'departure_location': departure_location,
+            'region': region,
+            'travel_style': travel_style,
+            'accommodation_type': accommodation_type,
+            'compact': catalog.compact,
+            'include_example': self._include_example(catalog),
+        }
+        prompt, _, scale = fit_prompt(
+            'generate', lambda scale: build_itinerary_prompt(**prompt_args, **catalog.prompt_strings(scale))
+        )
+        prompt_args.update(catalog.prompt_strings(scale))
 
         # API 키가 없으면 샘플 데이터 반환
         if not self.api_key:
             print('경고: GMS_API_KEY가 설정되지 않았습니다. 샘플 데이터를 반환합니다.')
             return self._get_sample_data(days, region, travel_style, people_count, departure_location)
 
+        # 긴 여행은 일차 구간으로 나눠 병렬 생성
+        if days >= settings.GEMINI_CHUNK_MIN_DAYS:
+            itinerary_data = self._generate_in_chunks(prompt_args, days, catalog, scale)
+            if itinerary_data is None:
+                return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+            # 구간별 예산을 지켜도 이어 붙인 전체 일정이 예산을 넘으면 전체를 다시 생성
+            if not self._validate_budget(itinerary_data, budget, budget_min, budget_max):
+                itinerary_data = self._retry_over_budget(itinerary_data, prompt_args, days, budget_min, budget_max)
+            return catalog.expand_ids(itinerary_data)
+
         # SSAFY GMS API 호출
         try:
-            url = f'{self.base_url}?key={self.api_key}'
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            payload = {
-                'contents': [
-                    {
-                        'parts': [
-                            {'text': prompt}
-                        ]
-                    }
-                ]
+            text, call = self._call_gemini(prompt, 'generate', timeout=30)
+        except requests.exceptions.RequestException as e:
+            print(f'GMS API 호출 오류: {e}')
+            return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+
+        # 응답이 비정상인 경우 샘플 데이터 반환
+        if text is None:
+            self._finish_call(call, metrics.OUTCOME_FALLBACK)
+            return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+
+        print('=== Gemini API 원본 응답 ===')
+        print(f'응답 길이: {len(text)} 글자')
+        print(f'첫 200자: {text[:200]}')
+        print('=' * 50)
+
+        # JSON 파싱 시도
+        try:
+            itinerary_data = parse_itinerary_text(text)
+        except json.JSONDecodeError as e:
+            print(f'✗ JSON 파싱 실패: {e}')
+            print(f'파싱 시도한 텍스트 (첫 500자):\n{text[:500]}')
+            itinerary_data = self._salvage(text, days)
+            if itinerary_data is None:
+                # 복구할 수 있는 일정이 없으면 샘플 데이터 반환
+                self._finish_call(call, metrics.OUTCOME_PARSE_FAILURE)
+                return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+            call['salvaged'] = True
+
+        days_count = len(itinerary_data.get("days", []))
+        print(f'✓ JSON 파싱 성공! Days: {days_count}개 (요청: {days}일)')
+
+        # 잘리거나 누락된 일차만 추가로 생성
+        self._fill_missing_days(itinerary_data, days, prompt_args)
+
+        # 구조/타입/일수/식사 정보 검증
+        self._log_validation_errors(itinerary_data, days)
+
+        # 예산 검증
+        if self._validate_budget(itinerary_data, budget, budget_min, budget_max):
+            self._finish_call(call, metrics.OUTCOME_PARSED)
+            return catalog.expand_ids(itinerary_data)
+
+        self._finish_call(call, metrics.OUTCOME_BUDGET_FAIL)
+        return catalog.expand_ids(self._retry_over_budget(itinerary_data, prompt_args, days, budget_min, budget_max))
+
+    def _retry_over_budget(self, itinerary_data, prompt_args, days, budget_min, budget_max):
+        """예산을 넘은 일정을 예산 제약을 강조하여 다시 생성 (모두 넘으면 마지막 결과 반환)"""
+        budget = prompt_args['budget']
+        print('⚠️  예산 초과! 재생성을 시도합니다...')
+        # 재생성 시도 (최대 5회 반복)
+        max_retries = 5
+        regenerated_data = None
+
+        for retry_count in range(1, max_retries + 1):
+            print(f'재생성 시도 {retry_count}/{max_retries}...')
+
+            regenerated_data = self._regenerate_with_budget_constraint(
+                prompt_args, days, budget_min, budget_max, retry_count=retry_count - 1
+            )
+
+            # 재생성된 데이터의 예산 검증
+            if regenerated_data and self._validate_budget(regenerated_data, budget, budget_min, budget_max):
+                print(f'✓ 재생성 성공! ({retry_count}회 시도)')
+                return regenerated_data
+
+            if retry_count < max_retries:
+                print(f'⚠️ 재생성 {retry_count}회차도 예산 초과. 다시 시도합니다...')
+
+        print(f'⚠️ 최대 재시도 횟수({max_retries}회)에 도달했습니다. 마지막 결과를 반환합니다.')
+        return regenerated_data if regenerated_data else itinerary_data
+
+    def _split_days(self, days, chunk_days):
+        """일수를 chunk_days 이하의 고른 구간 [(시작 일차, 끝 일차), ...]으로 분할"""
+        chunk_count = -(-days // chunk_days)
+        base, extra = divmod(days, chunk_count)
+        chunks = []
+        first_day = 1
+        for index in range(chunk_count):
+            span = base + (1 if index < extra else 0)
+            chunks.append((first_day, first_day + span - 1))
+            first_day += span
+        return chunks
+
+    def _generate_chunk(self, prompt_args, days, first_day, last_day, catalog, scale, spots, fixed_accommodation):
+        """
+        한 구간(first_day~last_day)의 일정 생성 (병렬 작업 단위)
+
+        프롬프트는 generate에서 정한 후보 비율(scale)과 이 구간의 관광지 후보(spots, 없으면 전체 목록)로 만들고,
+        generate 최대 입력 토큰 수를 넘으면 fit_prompt로 후보를 더 줄입니다.
+        구간 예산(일수 비례 배분)의 110%를 넘으면 예산을 강조하여 재요청하고,
+        생성에 실패하면 빈 목록을 반환합니다.
+        """
+        chunk_budget = prompt_args['budget'] * (last_day - first_day + 1) // days
+        chunk_budget_max = int(chunk_budget * 1.1)
+        max_retries = settings.GEMINI_CHUNK_BUDGET_RETRIES
+        chunk_days = []
+
+        def render(chunk_scale, strict_budget):
+            strings = catalog.prompt_strings(scale * chunk_scale)
+            if spots:
+                strings['tourist_spots_str'] = catalog.format_places(catalog.head(spots, chunk_scale))
+            return build_itinerary_prompt(
+                **dict(prompt_args, **strings),
+                first_day=first_day, last_day=last_day,
+                fixed_accommodation=fixed_accommodation, strict_budget=strict_budget,
+            )
+
+        for retry_index in range(max_retries + 1):
+            prompt, _, _ = fit_prompt('generate', lambda chunk_scale: render(chunk_scale, retry_index > 0))
+            try:
+                text, call = self._call_gemini(prompt, 'generate_chunk', retry_index=retry_index, timeout=30)
+            except requests.exceptions.RequestException as e:
+                print(f'구간 {first_day}~{last_day}일차 생성 오류: {e}')
+                return chunk_days
+            if text is None:
+                self._finish_call(call, metrics.OUTCOME_FALLBACK)
+                return chunk_days
+
+            try:
+                data = parse_itinerary_text(text)
+            except json.JSONDecodeError:
+                data = self._salvage(text, days)
+                if data is None:
+                    self._finish_call(call, metrics.OUTCOME_PARSE_FAILURE)
+                    continue
+                call['salvaged'] = True
+
+            candidate_days = [
+                day for day in data['days']
+                if isinstance(day, dict) and isinstance(day.get('day_number'), int)
+                and first_day <= day['day_number'] <= last_day
+            ]
+            total_cost = sum(
+                day.get('estimated_cost') or 0 for day in candidate_days
+                if isinstance(day.get('estimated_cost'), (int, float))
+            )
+
+            # 재시도가 모두 예산을 초과하면 마지막 결과 사용
+            chunk_days = candidate_days
+            if total_cost <= chunk_budget_max:
+                self._finish_call(call, metrics.OUTCOME_PARSED)
+                break
+            print(f'⚠️ 구간 {first_day}~{last_day}일차 예산 초과: {total_cost:,}원 / {chunk_budget_max:,}원')
+            self._finish_call(call, metrics.OUTCOME_BUDGET_FAIL)
+
+        return chunk_days
+
+    def _generate_in_chunks(self, prompt_args, days, catalog, scale):
+        """
+        긴 여행 일정을 구간별로 병렬 생성한 뒤 이어 붙여 반환 (모두 실패하면 None)
+
+        구간마다 관광지 후보(generate 프롬프트에 맞춘 비율 scale만큼)를 나눠 주어 중복 방문을 막고,
+        같은 숙소를 쓰도록 지정합니다.
+        이어 붙인 뒤에도 남은 중복 관광지는 제거하고, 누락된 일차는 추가로 생성합니다.
+        전체 예산 검증은 호출하는 쪽에서 합니다.
+        """
+        chunks = self._split_days(days, settings.GEMINI_CHUNK_DAYS)
+        print(f'=== 긴 여행 ({days}일) 구간 병렬 생성: {chunks} ===')
+
+        # 관광지 후보를 구간별로 나눠 배분 (후보가 없으면 전체 목록 공유)
+        tourist_spots = catalog.head(catalog.tourist_spots, scale)
+        spot_groups = [tourist_spots[index::len(chunks)] for index in range(len(chunks))]
+        fixed_accommodation = catalog.accommodations[0].title if catalog.accommodations else None
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), settings.GEMINI_MAX_PARALLEL_CHUNKS)) as executor:
+            futures = [
+                executor.submit(
+                    self._generate_chunk, prompt_args, days, first_day, last_day, catalog, scale,
+                    spot_groups[index], fixed_accommodation,
+                )
+                for index, (first_day, last_day) in enumerate(chunks)
+            ]
+            chunk_results = [future.result() for future in futures]
+
+        # 구간 결과 이어 붙이기 (같은 일차가 중복되면 먼저 생성된 것 사용)
+        stitched = {}
+        for chunk_days in chunk_results:
+            for day in chunk_days:
+                stitched.setdefault(day['day_number'], day)
+        if not stitched:
+            return None
+
+        # 구간 사이 중복 관광지 제거
+        seen_attractions = set()
+        for number in sorted(stitched):
+            attractions = stitched[number].get('attractions')
+            if not isinstance(attractions, list):
+                continue
+            unique = []
+            for attraction in attractions:
+                name = (attraction.get('name') or '').replace(' ', '') if isinstance(attraction, dict) else ''
+                if name and name in seen_attractions:
+                    continue
+                seen_attractions.add(name)
+                unique.append(attraction)
+            stitched[number]['attractions'] = unique
+
+        itinerary_data = {'days': [stitched[number] for number in sorted(stitched)]}
+        self._fill_missing_days(itinerary_data, days, prompt_args)
+        self._log_validation_errors(itinerary_data, days)
+        return itinerary_data
+
+    def _call_gemini(self, prompt, operation, retry_index=0, timeout=30):
+        """
+        Gemini API 호출 후 (응답 텍스트, 호출 기록) 반환
+
+        응답에 텍스트가 없으면 텍스트는 None이며, 호출 결과는 호출한 쪽에서
+        _finish_call로 확정합니다. 네트워크/HTTP 오류는 fallback으로 기록 후 다시 발생시킵니다.
+        """
+        call = metrics.new_call_record(operation, prompt, retry_index)
+        url = f'{self.base_url}?key={self.api_key}'
+        headers = {'Content-Type': 'application/json'}
+        payload = {
+            'contents': [
+                {
+                    'parts': [
+                        {'text': prompt}
+                    ]
+                }
+            ]
+        }
+        if self.structured_output:
+            # JSON 스키마 강제 출력 (코드 블록/설명 문구 없이 days 구조만 반환)
+            payload['generationConfig'] = {
+                'responseMimeType': 'application/json',
+                'responseSchema': ITINERARY_RESPONSE_SCHEMA,
             }
 
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+        timeout = self._timeout_for(operation, timeout)
+        hedge_after = self._hedge_delay(operation, timeout)
+
+        def post():
+            response = requests.post(url, headers=headers, json=payload, timeout=timeout)
             response.raise_for_status()
+            return response.json()
 
-            result = response.json()
-
-            # Gemini API 응답 파싱
-            if 'candidates' in result and len(result['candidates']) > 0:
-                content = result['candidates'][0]['content']
-                if 'parts' in content and len(content['parts']) > 0:
-                    text = content['parts'][0]['text']
-
-                    print('=== Gemini API 원본 응답 ===')
-                    print(f'응답 길이: {len(text)} 글자')
-                    print(f'첫 200자: {text[:200]}')
-                    print('=' * 50)
-
-                    # JSON 파싱 시도
-                    try:
-                        # 코드 블록 제거 (```json ... ``` 형식)
-                        original_text = text
-                        if '```json' in text:
-                            text = text.split('```json')[1].split('```')[0].strip()
-                        elif '```' in text:
-                            text = text.split('```')[1].split('```')[0].strip()
-
-                        itinerary_data = json.loads(text)
-                        days_count = len(itinerary_data.get("days", []))
-                        print(f'✓ JSON 파싱 성공! Days: {days_count}개 (요청: {days}일)')
-                        
-                        # 일수 검증
-                        if days_count != days:
-                            print(f'⚠️ 일수 불일치! 요청: {days}일, 생성: {days_count}일')
-                            if days_count < days:
-                                print(f'⚠️ 일정이 부족합니다. {days - days_count}일이 더 필요합니다.')
-                        
-                        # 식사 정보 검증
-                        if 'days' in itinerary_data:
-                            for i, day in enumerate(itinerary_data['days'], 1):
-                                meals_info = day.get('meals_info', {})
-                                if not meals_info or not isinstance(meals_info, dict):
-                                    print(f'⚠️ Day {i} - meals_info가 없거나 형식이 잘못되었습니다: {meals_info}')
-                                else:
-                                    required_keys = ['아침', '점심', '저녁']
-                                    missing_keys = [key for key in required_keys if key not in meals_info]
-                                    if missing_keys:
-                                        print(f'⚠️ Day {i} - meals_info에 누락된 키: {missing_keys}')
-                                    else:
-                                        print(f'✓ Day {i} - meals_info 정상: {list(meals_info.keys())}')
-
-                        # 예산 검증
-                        if not self._validate_budget(itinerary_data, budget, budget_min, budget_max):
-                            print('⚠️  예산 초과! 재생성을 시도합니다...')
-                            # 재생성 시도 (최대 5회 반복)
-                            max_retries = 5
-                            retry_count = 0
-                            
-                            while retry_count < max_retries:
-                                retry_count += 1
-                                print(f'재생성 시도 {retry_count}/{max_retries}...')
-                                
-                                regenerated_data = self._regenerate_with_budget_constraint(
-                                    budget, people_count, start_date, end_date, departure_location, region,
-                                    travel_style, accommodation_type, days,
-                                    daily_budget, budget_min, budget_max,
-                                    tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
-                                    retry_count=retry_count - 1
-                                )
-                                
-                                # 재생성된 데이터의 예산 검증
-                                if regenerated_data and self._validate_budget(regenerated_data, budget, budget_min, budget_max):
-                                    print(f'✓ 재생성 성공! ({retry_count}회 시도)')
-                                    return regenerated_data
-                                else:
-                                    if retry_count < max_retries:
-                                        print(f'⚠️ 재생성 {retry_count}회차도 예산 초과. 다시 시도합니다...')
-                                    else:
-                                        print(f'⚠️ 최대 재시도 횟수({max_retries}회)에 도달했습니다. 마지막 결과를 반환합니다.')
-                                        return regenerated_data if regenerated_data else itinerary_data
-                            
-                            # 루프를 빠져나온 경우 (이론적으로는 발생하지 않음)
-                            return regenerated_data if 'regenerated_data' in locals() else itinerary_data
-
-                        return itinerary_data
-                    except json.JSONDecodeError as e:
-                        # JSON 파싱 실패 시 텍스트 기반 응답 처리
-                        print(f'✗ JSON 파싱 실패: {e}')
-                        print(f'파싱 시도한 텍스트 (첫 500자):\n{text[:500]}')
-                        # 파싱 실패 시 샘플 데이터 반환
-                        return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+        def discarded(result):
+            # 쓰지 않은 응답도 토큰이 과금되므로 별도 호출로 기록 (지연시간은 남기지 않음)
+            extra = metrics.new_call_record(operation, prompt, retry_index)
+            extra['hedged'] = True
+            metrics.apply_usage_metadata(extra, result)
+            self._finish_call(extra, metrics.OUTCOME_DISCARDED)
 
-            # 응답이 비정상인 경우 샘플 데이터 반환
-            return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+        started = time.perf_counter()
+        try:
+            result, call['hedged'], call['hedge_won'] = hedged_call(post, hedge_after, timeout, on_discarded=discarded)
+        except requests.exceptions.RequestException:
+            call['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            self._finish_call(call, metrics.OUTCOME_FALLBACK)
+            raise
+        call['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        metrics.apply_usage_metadata(call, result)
+
+        text = None
+        if 'candidates' in result and len(result['candidates']) > 0:
+            content = result['candidates'][0].get('content', {})
+            if 'parts' in content and len(content['parts']) > 0:
+                text = content['parts'][0].get('text')
+        call['response_chars'] = len(text) if text else 0
+        return text, call
+
+    def _timeout_for(self, operation, default):
+        """
+        작업별 적응형 타임아웃(초)
 
-        except requests.exceptions.RequestException as e:
-            print(f'GMS API 호출 오류: {e}')
-            return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+        최근 지연시간 표본이 충분하면 p99 x 배수를 사용하되,
+        호출별 기본 타임아웃을 넘지 않고 최소 타임아웃보다 짧아지지 않도록 제한합니다.
+        """
+        if not settings.GEMINI_ADAPTIVE_TIMEOUT:
+            return default
+        p99 = metrics.registry.latency_percentile(99, operation, min_samples=settings.GEMINI_ADAPTIVE_MIN_SAMPLES)
+        if p99 is None:
+            return default
+        p99_seconds = p99 / 1000
+        adaptive = p99_seconds * settings.GEMINI_TIMEOUT_P99_MULTIPLIER
+        return round(min(default, max(settings.GEMINI_TIMEOUT_MIN_SECONDS, adaptive)), 1)
+
+    def _hedge_delay(self, operation, timeout):
+        """헤지 요청을 보낼 대기 시간(초) - 최근 p95, 비활성화/표본 부족 시 None"""
+        if not settings.GEMINI_HEDGE_ENABLED:
+            return None
+        latency = metrics.registry.latency_percentile(settings.GEMINI_HEDGE_PERCENTILE, operation,
+                                                      min_samples=settings.GEMINI_ADAPTIVE_MIN_SAMPLES)
+        if latency is None:
+            return None
+        hedge_after = latency / 1000
+        return hedge_after if hedge_after < timeout else None
+
+    def _finish_call(self, call, outcome):
+        """호출 결과를 확정하고 비용을 계산하여 레지스트리에 등록"""
+        call['outcome'] = outcome
+        call['cost_usd'] = metrics.estimate_cost(call['prompt_tokens'], call['response_tokens'])
+        metrics.registry.record(call)
+        with self._calls_lock:
+            self.calls.append(call)
+            owner = self._usage_owner
+        if owner is not None:
+            LLMUsage.record(*owner, [call], requests=0)
+
+    def _salvage(self, text, days):
+        """파싱 실패 응답에서 완결된 일차만 복구 (복구된 일차가 없으면 None)"""
+        data, complete = salvage_itinerary(text)
+        if data is None:
+            return None
+
+        # 범위를 벗어나거나 중복된 일차 제거
+        recovered = {}
+        for day in data['days']:
+            if 1 <= day['day_number'] <= days:
+                recovered.setdefault(day['day_number'], day)
+        if not recovered:
+            return None
+
+        print(f'✓ 손상된 응답에서 {len(recovered)}일치 일정 복구 (전체 복구: {complete})')
+        data['days'] = [recovered[number] for number in sorted(recovered)]
+        return data
+
+    def _fill_missing_days(self, itinerary_data, days, prompt_args):
+        """
+        누락된 일차만 추가로 생성하여 itinerary_data에 채움
+
+        이미 생성된 일차의 관광지는 중복 방문하지 않도록 프롬프트에 전달합니다.
+        day_number를 먼저 정리하고(_normalize_days) 필수 필드/타입 검증에 실패한 일차도 제외하므로(_drop_invalid_days)
+        잘못된 일차는 남지 않고 누락 일차로 다시 생성됩니다.
+        추가 생성에 실패한 일차는 그대로 비워 둡니다.
+        """
+        self._normalize_days(itinerary_data, days)
+        self._drop_invalid_days(itinerary_data)
+        existing = {day['day_number']: day for day in itinerary_data['days']}
+        missing = [number for number in range(1, days + 1) if number not in existing]
+        if not missing:
+            return
+
+        # 연속된 누락 일차를 구간으로 묶기
+        ranges = []
+        for number in missing:
+            if ranges and ranges[-1][1] == number - 1:
+                ranges[-1][1] = number
+            else:
+                ranges.append([number, number])
+
+        print(f'⚠️ 누락된 일차 추가 생성: {missing}')
+        added_days = []
+        for first_day, last_day in ranges:
+            used_attractions = [
+                attraction['name']
+                for day in existing.values()
+                for attraction in day.get('attractions') or []
+                if isinstance(attraction, dict) and attraction.get('name')
+            ]
+            prompt = build_itinerary_prompt(
+                **prompt_args, first_day=first_day, last_day=last_day,
+                exclude_attractions=used_attractions,
+            )
+            try:
+                text, call = self._call_gemini(prompt, 'generate_missing', timeout=30)
+            except requests.exceptions.RequestException as e:
+                print(f'누락 일차 생성 오류: {e}')
+                continue
+            if text is None:
+                self._finish_call(call, metrics.OUTCOME_FALLBACK)
+                continue
+
+            try:
+                partial = parse_itinerary_text(text)
+            except json.JSONDecodeError:
+                partial = self._salvage(text, days)
+                if partial is None:
+                    self._finish_call(call, metrics.OUTCOME_PARSE_FAILURE)
+                    continue
+                call['salvaged'] = True
+            self._finish_call(call, metrics.OUTCOME_PARSED)
+
+            for day in partial['days']:
+                number = day_number_of(day)
+                if number is not None and first_day <= number <= last_day and number not in existing:
+                    day['day_number'] = number
+                    if self._day_errors(day):
+                        continue
+                    existing[number] = day
+                    added_days.append(day)
+
+        if added_days:
+            print(f'✓ 누락 일차 {len(added_days)}일 추가 완료')
+            itinerary_data['days'] = [existing[number] for number in sorted(existing)]
+
+    def _normalize_days(self, itinerary_data, days):
+        """day_number를 정수로 맞추고 (숫자 문자열 허용) 변환할 수 없거나 범위를 벗어나거나 중복된 일차 제거"""
+        normalized = {}
+        dropped = 0
+        for day in itinerary_data.get('days') or []:
+            number = day_number_of(day)
+            if number is None or not 1 <= number <= days or number in normalized:
+                dropped += 1
+                continue
+            day['day_number'] = number
+            normalized[number] = day
+        if dropped:
+            print(f'⚠️ day_number가 잘못되었거나 중복된 일차 {dropped}개 제외')
+        itinerary_data['days'] = [normalized[number] for number in sorted(normalized)]
+
+    def _day_errors(self, day):
+        """일차 하나의 필수 필드/타입 검증 오류 (식사 키 누락은 저장해도 되므로 검사하지 않음)"""
+        validate = compile_itinerary_validator(expected_days=1, meal_keys=(), first_day=day['day_number'])
+        return validate({'days': [day]})
+
+    def _drop_invalid_days(self, itinerary_data):
+        """검증에 실패한 일차 제거 (day_number는 정리된 상태여야 함, 제거한 일차 번호 목록 반환)"""
+        valid, dropped = [], []
+        for day in itinerary_data['days']:
+            errors = self._day_errors(day)
+            if errors:
+                print(f'⚠️ 검증 실패로 Day {day["day_number"]} 제외: {errors}')
+                dropped.append(day['day_number'])
+            else:
+                valid.append(day)
+        itinerary_data['days'] = valid
+        return dropped
+
+    def _log_validation_errors(self, itinerary_data, days):
+        """일정 검증 결과 로그 출력 (오류 목록 반환)"""
+        errors = validate_itinerary(itinerary_data, expected_days=days)
+        if errors:
+            for error in errors:
+                print(f'⚠️ {error}')
+        else:
+            print(f'✓ 일정 검증 통과 ({days}일, 식사 정보 포함)')
+        return errors
 
     def _validate_budget(self, itinerary_data, budget, budget_min, budget_max):
         """예산 검증: 총 비용이 예산을 10% 초과했는지 확인"""
@@ -345,211 +561,56 @@ JSON 형식 (정확히 이 구조를 따라주세요):
         print(f'✓ 예산 범위 내 ({(total_cost / budget * 100):.1f}%)')
         return True
 
-    def _regenerate_with_budget_constraint(self, budget, people_count, start_date, end_date, departure_location,
-                                          region, travel_style, accommodation_type, days,
-                                          daily_budget, budget_min, budget_max,
-                                          tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
-                                          retry_count=0):
-        """예산 제약을 더 강조하여 재생성 (재시도 횟수 포함)"""
-        budget_per_person = budget // people_count
-
-        prompt = f"""
-다음 조건으로 {days}일 여행 계획을 상세한 JSON 형식으로 작성해주세요:
-- 총 예산: {budget:,}원 (총 {people_count}명, 1인당 약 {budget_per_person:,}원)
-- 여행 인원: {people_count}명
-- 여행 기간: {start_date} ~ {end_date} ({days}일)
-- 출발지: {departure_location}
-- 여행 지역: {region}
-- 여행 스타일: {travel_style}
-- 숙박 타입: {accommodation_type}
-
-**{region} 지역의 실제 데이터베이스 정보를 활용하세요:**
-
-📍 추천 관광지 (이 중에서 선택하세요):
-{tourist_spots_str}
-
-🍽️ 추천 음식점 (이 중에서 선택하세요):
-{restaurants_str}
-
-🏨 추천 숙박시설 (이 중에서 선택하세요):
-{accommodations_str}
-
-🎉 해당 기간의 축제/행사:
-{festivals_str}
-
-각 일차별로 다음 정보를 **매우 구체적으로** 포함해주세요:
-
-1. **관광지 정보** (attractions):
-   - 위의 추천 관광지 목록에서 선택하여 사용하세요
-   - 각 관광지의 정확한 명칭, 방문 시간, 소요 시간, 간단한 설명 포함
-   - 이동 동선을 고려하여 효율적으로 배치하세요
-
-2. **교통수단 정보** (transportation_info):
-   - 출발지({departure_location})에서 여행 지역({region})으로의 이동 방법을 첫날 일정에 포함하세요
-   - 주요 이동 구간별 교통수단 (버스, 지하철, 택시, 렌터카, KTX, 고속버스 등)
-   - 예상 이동 시간 및 비용
-   - 첫날에는 "{departure_location} → {region}" 이동 경로와 비용을 명시하세요
-
-3. **숙소 정보** (accommodation_info):
-   - {accommodation_type} 타입의 추천 숙소명 또는 숙소 지역
-   - 예상 숙박비
-   - 체크인/체크아웃 시간
-
-4. **식사 정보** (meals_info) - **필수 항목입니다**:
-   - 위의 추천 음식점 목록에서 선택하여 사용하세요
-   - **반드시 아침, 점심, 저녁 각각의 추천 식당명 또는 음식 종류를 포함하세요**
-   - 각 식사마다 예상 식사 비용을 포함하세요
-   - meals_info는 반드시 "아침", "점심", "저녁" 키를 가진 객체여야 합니다
-
-5. **축제/행사 정보** (events_info):
-   - 위에 나열된 축제/행사 정보가 있다면 일정에 포함하세요
-   - 축제명, 시간, 위치 등을 정확히 기재
-
-6. **예상 비용** (estimated_cost):
-   - 해당 일차의 총 예상 비용 (교통비 + 식비 + 입장료 + 숙박비 등)
-
-JSON 형식 (정확히 이 구조를 따라주세요):
-**반드시 "days" 배열에 정확히 {days}개의 일정 객체를 포함해야 합니다. day_number는 1부터 {days}까지 순서대로여야 합니다.**
-
-{{
-  "days": [
-    {{
-      "day_number": 1,
-      "description": "일정 전체 요약",
-      "attractions": [...],
-      "transportation_info": {{
-        "오전": "교통수단 및 비용",
-        "오후": "교통수단 및 비용",
-        "저녁": "교통수단 및 비용"
-      }},
-      "accommodation_info": {{
-        "name": "숙소명",
-        "cost": 80000,
-        "check_in": "15:00",
-        "check_out": "11:00"
-      }},
-      "meals_info": {{
-        "아침": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 10000
-        }},
-        "점심": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 15000
-        }},
-        "저녁": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 20000
-        }}
-      }},
-      "events_info": [],
-      "estimated_cost": {daily_budget}
-    }}{f''',
-    {{
-      "day_number": {days},
-      "description": "{days}일차 일정 요약",
-      "attractions": [...],
-      "transportation_info": {{...}},
-      "accommodation_info": {{...}},
-      "meals_info": {{...}},
-      "events_info": [],
-      "estimated_cost": {daily_budget}
-    }}''' if days > 1 else ''}
-  ]
-}}
-
-**중요: 모든 텍스트는 한글로 작성하세요**
-- transportation_info의 키: "오전", "오후", "저녁" 사용 (morning, afternoon, evening 사용 금지)
-- **meals_info는 반드시 포함되어야 하며, "아침", "점심", "저녁" 키를 모두 가져야 합니다** (breakfast, lunch, dinner 사용 금지)
-- 각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함하세요
-- 모든 설명과 내용은 한글로 작성
-- 시간 표기: "09:00", "15:00" 등 숫자는 그대로 사용
-- 장소명과 상호명은 데이터베이스에 있는 그대로 사용
-
-**⚠️ 예산 준수 규칙 (절대적으로 중요) ⚠️**:
-- 총 예산: {budget:,}원 ({people_count}명 전체 기준)
-- 일일 목표 예산: 약 {daily_budget:,}원
-- **전체 {days}일간 총 비용 합계는 절대적으로 {budget_max:,}원을 초과하지 않아야 합니다 (예산의 110% 이하)**
-- 예산보다 작게 생성되는 것은 문제없지만, 예산을 10% 초과하면 안 됩니다
-- **이전 시도에서 예산을 초과했으므로, 이번에는 반드시 더 저렴한 옵션을 선택하세요** (재시도 횟수: {retry_count + 1}회):
-  * 게스트하우스나 모텔 등 저렴한 숙소 선택 (호텔 피하기)
-  * 대중교통 이용 (택시 최소화, 가능하면 도보)
-  * 가성비 좋은 음식점 선택 (고급 레스토랑 피하기)
-  * 무료 관광지 우선 포함 (유료 입장료 최소화)
-  * 각 일차별 비용을 {daily_budget:,}원 이하로 유지
-- **총 비용 합계가 {budget_max:,}원을 넘지 않도록 각 일차의 estimated_cost를 신중하게 계산하세요**
-
-**기타 중요 사항**:
-- 반드시 위에 제공된 실제 데이터베이스의 장소/음식점 목록에서 선택하여 사용하세요
-- 장소명은 데이터베이스의 정확한 명칭을 그대로 사용하세요
-- 모든 비용은 {people_count}명 전체를 기준으로 계산해주세요
-- 이동 동선이 효율적이도록 근처 장소들을 묶어서 계획해주세요
-- **각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함해야 합니다. 이는 선택 사항이 아닌 필수 항목입니다.**
-"""
+    def _regenerate_with_budget_constraint(self, prompt_args, days, budget_min, budget_max, retry_count=0):
+        """예산 제약을 더 강조하여 재생성 (retry_count: 이전 재생성 횟수)"""
+        budget = prompt_args['budget']
+        region = prompt_args['region']
+        travel_style = prompt_args['travel_style']
+        people_count = prompt_args['people_count']
+        departure_location = prompt_args['departure_location']
+        prompt = build_itinerary_prompt(**prompt_args, strict_budget=True)
 
+        call = None
         try:
-            url = f'{self.base_url}?key={self.api_key}'
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                'contents': [
-                    {
-                        'parts': [
-                            {'text': prompt}
-                        ]
-                    }
-                ]
-            }
+            text, call = self._call_gemini(prompt, 'regenerate', retry_index=retry_count + 1, timeout=30)
+
+            if text is not None:
+                try:
+                    itinerary_data = parse_itinerary_text(text)
+                except json.JSONDecodeError as e:
+                    print(f'재생성 실패: {e}')
+                    itinerary_data = self._salvage(text, days)
+                    if itinerary_data is None:
+                        self._finish_call(call, metrics.OUTCOME_PARSE_FAILURE)
+                        return self._get_sample_data(days, region, travel_style, people_count, departure_location)
+                    call['salvaged'] = True
 
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-
-            if 'candidates' in result and len(result['candidates']) > 0:
-                content = result['candidates'][0]['content']
-                if 'parts' in content and len(content['parts']) > 0:
-                    text = content['parts'][0]['text']
-
-                    # 코드 블록 제거
-                    if '```json' in text:
-                        text = text.split('```json')[1].split('```')[0].strip()
-                    elif '```' in text:
-                        text = text.split('```')[1].split('```')[0].strip()
-
-                    itinerary_data = json.loads(text)
-                    days_count = len(itinerary_data.get("days", []))
-                    print(f'✓ 재생성 성공! Days: {days_count}개 (요청: {days}일)')
-                    
-                    # 일수 검증
-                    if days_count != days:
-                        print(f'⚠️ 일수 불일치! 요청: {days}일, 생성: {days_count}일')
-                        if days_count < days:
-                            print(f'⚠️ 일정이 부족합니다. {days - days_count}일이 더 필요합니다.')
-                    
-                    # 식사 정보 검증
-                    if 'days' in itinerary_data:
-                        for i, day in enumerate(itinerary_data['days'], 1):
-                            meals_info = day.get('meals_info', {})
-                            if not meals_info or not isinstance(meals_info, dict):
-                                print(f'⚠️ Day {i} - meals_info가 없거나 형식이 잘못되었습니다: {meals_info}')
-                            else:
-                                required_keys = ['아침', '점심', '저녁']
-                                missing_keys = [key for key in required_keys if key not in meals_info]
-                                if missing_keys:
-                                    print(f'⚠️ Day {i} - meals_info에 누락된 키: {missing_keys}')
-                                else:
-                                    print(f'✓ Day {i} - meals_info 정상: {list(meals_info.keys())}')
-
-                    # 재생성된 데이터도 예산 검증
-                    if self._validate_budget(itinerary_data, budget, budget_min, budget_max):
-                        print(f'✓ 재생성된 계획이 예산 범위 내입니다.')
-                    else:
-                        print(f'⚠️ 재생성된 계획도 여전히 예산을 초과합니다.')
-                    
-                    return itinerary_data
+                days_count = len(itinerary_data.get("days", []))
+                print(f'✓ 재생성 성공! Days: {days_count}개 (요청: {days}일)')
+
+                # 잘리거나 누락된 일차만 추가로 생성
+                self._fill_missing_days(itinerary_data, days, prompt_args)
+
+                # 구조/타입/일수/식사 정보 검증
+                self._log_validation_errors(itinerary_data, days)
+
+                # 재생성된 데이터도 예산 검증
+                if self._validate_budget(itinerary_data, budget, budget_min, budget_max):
+                    print(f'✓ 재생성된 계획이 예산 범위 내입니다.')
+                    self._finish_call(call, metrics.OUTCOME_PARSED)
+                else:
+                    print(f'⚠️ 재생성된 계획도 여전히 예산을 초과합니다.')
+                    self._finish_call(call, metrics.OUTCOME_BUDGET_FAIL)
+
+                return itinerary_data
 
         except Exception as e:
             print(f'재생성 실패: {e}')
 
+        # 응답이 비정상이었다면 대체 데이터 사용으로 기록
+        if call is not None and call['outcome'] is None:
+            self._finish_call(call, metrics.OUTCOME_FALLBACK)
+
         # 재생성 실패 시 샘플 데이터 반환
         return self._get_sample_data(days, region, travel_style, people_count, departure_location)
 
@@ -621,12 +682,20 @@ JSON 형식 (정확히 이 구조를 따라주세요):
             })
         return {'days': sample_days}
 
-    def _get_places_by_region(self, region, place_type, limit=10):
-        """지역과 타입으로 장소 검색"""
+    def _get_places_by_region(self, region, place_type, limit=10, travel_style='', accommodation_type='', seed=None):
+        """
+        지역과 타입으로 장소 검색
+
+        PLACE_RANKING_ENABLED면 여행 스타일/숙박 타입, 인기도, 위치 분산을 고려하여 고릅니다.
+        (seed가 같으면 같은 후보)
+        """
         try:
+            if settings.PLACE_RANKING_ENABLED:
+                return place_ranker.select(region, place_type, limit, travel_style, accommodation_type, seed)
             places = Place.objects.filter(
                 region__icontains=region,
-                place_type=place_type
+                place_type=place_type,
+                is_active=True
             )[:limit]
             return list(places)
         except Exception as e:
@@ -648,29 +717,24 @@ JSON 형식 (정확히 이 구조를 따라주세요):
             print(f'축제 조회 오류: {e}')
             return []
 
-    def _format_places(self, places):
-        """장소 목록을 프롬프트용 문자열로 포맷"""
-        if not places:
-            return "해당 지역의 데이터가 없습니다."
-
-        formatted = []
-        for place in places:
-            category = f" ({place.category})" if place.category else ""
-            formatted.append(f"- {place.title}{category}: {place.address}")
-
-        return "\n".join(formatted)
-
-    def _format_festivals(self, festivals):
-        """축제 목록을 프롬프트용 문자열로 포맷"""
-        if not festivals:
-            return "해당 기간에 축제/행사가 없습니다."
-
-        formatted = []
-        for festival in festivals:
-            period = f"{festival.event_start_date} ~ {festival.event_end_date}" if festival.event_start_date else "날짜 미정"
-            formatted.append(f"- {festival.title} ({festival.category}): {period} @ {festival.address}")
+    def _place_catalog(self, region, start_date, end_date, travel_style, accommodation_type):
+        """
+        지역 후보(관광지/음식점/숙박시설/축제) 목록 (GEMINI_COMPACT_PROMPT면 축약 형식)
 
-        return "\n".join(formatted)
+        같은 지역/스타일/출발일의 생성과 수정 요청은 같은 후보를 받도록 시드를 고정합니다.
+        """
+        seed = f'{region}:{travel_style}:{start_date}'
+        return PlaceCatalog(
+            tourist_spots=self._get_places_by_region(region, 'tourist', 15, travel_style, seed=seed),
+            restaurants=self._get_places_by_region(region, 'restaurant', 10, travel_style, seed=seed),
+            accommodations=self._get_places_by_region(region, 'accommodation', 5, travel_style, accommodation_type, seed),
+            festivals=self._get_festivals_by_region(region, start_date, end_date),
+            compact=settings.GEMINI_COMPACT_PROMPT,
+        )
+
+    def _include_example(self, catalog):
+        """프롬프트에 JSON 예시 포함 여부 (축약 프롬프트 + 구조화 출력이면 스키마로 충분하므로 생략)"""
+        return not (catalog.compact and self.structured_output)
 
     def modify_itinerary(self, existing_plan, requirements, budget, people_count, start_date, end_date, departure_location, region, travel_style, accommodation_type):
         """
@@ -679,149 +743,18 @@ JSON 형식 (정확히 이 구조를 따라주세요):
         # 여행 일수 계산
         days = (end_date - start_date).days + 1
         
-        # 기존 일정을 JSON 형식으로 포맷팅
-        existing_itinerary_str = self._format_existing_itinerary(existing_plan)
-        
         # 데이터베이스에서 해당 지역의 실제 장소 정보 가져오기
-        tourist_spots = self._get_places_by_region(region, 'tourist', limit=15)
-        restaurants = self._get_places_by_region(region, 'restaurant', limit=10)
-        accommodations = self._get_places_by_region(region, 'accommodation', limit=5)
-        festivals = self._get_festivals_by_region(region, start_date, end_date)
-        
-        # 장소 정보를 문자열로 포맷팅
-        tourist_spots_str = self._format_places(tourist_spots)
-        restaurants_str = self._format_places(restaurants)
-        accommodations_str = self._format_places(accommodations)
-        festivals_str = self._format_festivals(festivals)
-        
-        # 일일 예산 계산
-        daily_budget = budget // days
+        catalog = self._place_catalog(region, start_date, end_date, travel_style, accommodation_type)
         budget_max = int(budget * 1.1)
-        
-        # 기존 일정을 JSON 형식으로 변환
-        existing_days_data = []
-        for itinerary in existing_plan.itineraries.all().order_by('day_number'):
-            existing_days_data.append({
-                'day_number': itinerary.day_number,
-                'description': itinerary.description,
-                'attractions': itinerary.attractions or [],
-                'transportation_info': itinerary.transportation_info or {},
-                'accommodation_info': itinerary.accommodation_info or {},
-                'meals_info': itinerary.meals_info or {},
-                'events_info': itinerary.events_info or [],
-                'estimated_cost': itinerary.estimated_cost or 0
-            })
-        
-        existing_json = json.dumps(existing_days_data, ensure_ascii=False, indent=2)
-        
-        # 프롬프트 생성
-        prompt = f"""
-다음은 기존 여행 계획입니다. **기존 계획을 최대한 유지하면서** 사용자의 요구사항에 맞게 **부분적으로만 수정**해주세요.
-
-**⚠️ 매우 중요: 기존 계획의 구조와 내용을 최대한 유지하세요. 요구사항에 명시되지 않은 부분은 그대로 유지해야 합니다.**
-
-**기존 여행 계획 (JSON 형식):**
-```json
-{existing_json}
-```
-
-**사용자 요구사항:**
-{requirements}
-
-**기본 여행 정보:**
-- 총 예산: {budget:,}원 (총 {people_count}명, 1인당 약 {budget // people_count:,}원)
-- 여행 인원: {people_count}명
-- 여행 기간: {start_date} ~ {end_date} ({days}일)
-- 출발지: {departure_location}
-- 여행 지역: {region}
-- 여행 스타일: {travel_style}
-- 숙박 타입: {accommodation_type}
-
-**{region} 지역의 실제 데이터베이스 정보를 활용하세요:**
-
-📍 추천 관광지 (이 중에서 선택하세요):
-{tourist_spots_str}
-
-🍽️ 추천 음식점 (이 중에서 선택하세요):
-{restaurants_str}
-
-🏨 추천 숙박시설 (이 중에서 선택하세요):
-{accommodations_str}
-
-🎉 해당 기간의 축제/행사:
-{festivals_str}
-
-**수정 지침 (매우 중요):**
-1. **기존 계획의 구조를 그대로 유지하세요** - day_number, 일정 순서, 전체적인 흐름은 변경하지 마세요
-2. **요구사항에 명시된 부분만 수정하세요** - 예를 들어 "2일차 저녁 식사"만 언급되었다면, 2일차 저녁 식사만 변경하고 나머지는 그대로 유지
-3. **요구사항에 해당하지 않는 일정은 기존 내용을 그대로 반환하세요**
-4. 예산은 {budget:,}원을 초과하지 않도록 주의하세요 (최대 {budget_max:,}원)
-5. **반드시 {days}일치 일정을 모두 반환해야 하며, 각 일정의 day_number는 기존과 동일해야 합니다**
-6. 각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함하세요
-7. **기존 계획에서 좋은 부분(요구사항과 무관한 부분)은 절대 변경하지 마세요**
-
-JSON 형식 (정확히 이 구조를 따라주세요):
-{{
-  "days": [
-    {{
-      "day_number": 1,
-      "description": "수정된 일정 전체 요약",
-      "attractions": [
-        {{
-          "name": "관광지명",
-          "time": "09:00",
-          "duration": "2시간",
-          "description": "관광지 설명"
-        }}
-      ],
-      "transportation_info": {{
-        "오전": "교통수단 및 비용",
-        "오후": "교통수단 및 비용",
-        "저녁": "교통수단 및 비용"
-      }},
-      "accommodation_info": {{
-        "name": "숙소명",
-        "cost": 80000,
-        "check_in": "15:00",
-        "check_out": "11:00"
-      }},
-      "meals_info": {{
-        "아침": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 10000
-        }},
-        "점심": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 15000
-        }},
-        "저녁": {{
-          "restaurant": "식당명 또는 음식 종류",
-          "cost": 20000
-        }}
-      }},
-      "events_info": [],
-      "estimated_cost": {daily_budget}
-    }}{f''',
-    {{
-      "day_number": {days},
-      "description": "수정된 {days}일차 일정 요약",
-      "attractions": [...],
-      "transportation_info": {{...}},
-      "accommodation_info": {{...}},
-      "meals_info": {{...}},
-      "events_info": [],
-      "estimated_cost": {daily_budget}
-    }}''' if days > 1 else ''}
-  ]
-}}
-
-**중요:**
-- 모든 텍스트는 한글로 작성하세요
-- transportation_info의 키: "오전", "오후", "저녁" 사용
-- meals_info는 반드시 "아침", "점심", "저녁" 키를 모두 가져야 합니다
-- 사용자 요구사항을 반드시 반영하세요
-- 예산을 준수하세요
-"""
+
+        # 프롬프트 생성 (최대 입력 토큰 수를 넘으면 후보 목록을 줄임)
+        existing_days_data = self._get_existing_itinerary_data(existing_plan)['days']
+        prompt, _, _ = fit_prompt('modify', lambda scale: build_modify_prompt(
+            existing_days_data, requirements, budget, people_count, start_date, end_date,
+            departure_location, region, travel_style, accommodation_type,
+            compact=catalog.compact, include_example=self._include_example(catalog),
+            **catalog.prompt_strings(scale),
+        ))
 
         # API 키가 없으면 기존 계획 반환
         if not self.api_key:
@@ -830,66 +763,58 @@ JSON 형식 (정확히 이 구조를 따라주세요):
         
         # SSAFY GMS API 호출
         try:
-            url = f'{self.base_url}?key={self.api_key}'
-            headers = {'Content-Type': 'application/json'}
-            payload = {
-                'contents': [
-                    {
-                        'parts': [
-                            {'text': prompt}
-                        ]
-                    }
-                ]
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Gemini API 응답 파싱
-            if 'candidates' in result and len(result['candidates']) > 0:
-                content = result['candidates'][0]['content']
-                if 'parts' in content and len(content['parts']) > 0:
-                    text = content['parts'][0]['text']
-                    
-                    print('=== 수정된 계획 API 원본 응답 ===')
-                    print(f'응답 길이: {len(text)} 글자')
-                    print(f'첫 200자: {text[:200]}')
-                    print('=' * 50)
-                    
-                    # JSON 파싱 시도
-                    try:
-                        # 코드 블록 제거
-                        if '```json' in text:
-                            text = text.split('```json')[1].split('```')[0].strip()
-                        elif '```' in text:
-                            text = text.split('```')[1].split('```')[0].strip()
-                        
-                        itinerary_data = json.loads(text)
-                        days_count = len(itinerary_data.get("days", []))
-                        print(f'✓ 수정된 계획 JSON 파싱 성공! Days: {days_count}개 (요청: {days}일)')
-                        
-                        # 일수 검증
-                        if days_count != days:
-                            print(f'⚠️ 일수 불일치! 요청: {days}일, 생성: {days_count}일')
-                        
-                        # 예산 검증
-                        self._validate_budget(itinerary_data, budget, int(budget * 0.9), budget_max)
-                        
-                        return itinerary_data
-                    except json.JSONDecodeError as e:
-                        print(f'✗ JSON 파싱 실패: {e}')
-                        print(f'파싱 시도한 텍스트 (첫 500자):\n{text[:500]}')
-                        return self._get_existing_itinerary_data(existing_plan)
-            
-            # 응답이 비정상인 경우 기존 계획 반환
-            return self._get_existing_itinerary_data(existing_plan)
-            
+            text, call = self._call_gemini(prompt, 'modify', timeout=60)
         except requests.exceptions.RequestException as e:
             print(f'GMS API 호출 오류: {e}')
             return self._get_existing_itinerary_data(existing_plan)
 
+        # 응답이 비정상인 경우 기존 계획 반환
+        if text is None:
+            self._finish_call(call, metrics.OUTCOME_FALLBACK)
+            return self._get_existing_itinerary_data(existing_plan)
+
+        print('=== 수정된 계획 API 원본 응답 ===')
+        print(f'응답 길이: {len(text)} 글자')
+        print(f'첫 200자: {text[:200]}')
+        print('=' * 50)
+
+        # JSON 파싱 시도
+        try:
+            itinerary_data = parse_itinerary_text(text)
+        except json.JSONDecodeError as e:
+            print(f'✗ JSON 파싱 실패: {e}')
+            print(f'파싱 시도한 텍스트 (첫 500자):\n{text[:500]}')
+            salvaged = self._salvage(text, days)
+            if salvaged is None:
+                self._finish_call(call, metrics.OUTCOME_PARSE_FAILURE)
+                return self._get_existing_itinerary_data(existing_plan)
+
+            # 복구된 일차만 수정 결과로 사용하고 나머지는 기존 일정 유지
+            call['salvaged'] = True
+            itinerary_data = self._get_existing_itinerary_data(existing_plan)
+            recovered = {day['day_number']: day for day in salvaged['days']}
+            itinerary_data['days'] = [
+                recovered.get(day['day_number'], day) for day in itinerary_data['days']
+            ]
+
+        days_count = len(itinerary_data.get("days", []))
+        print(f'✓ 수정된 계획 JSON 파싱 성공! Days: {days_count}개 (요청: {days}일)')
+
+        # 검증에 실패한 일차는 수정 결과에서 빼고 기존 일정 유지 (뷰는 응답에 있는 일차만 갱신)
+        self._normalize_days(itinerary_data, days)
+        self._drop_invalid_days(itinerary_data)
+
+        # 구조/타입/일수/식사 정보 검증
+        self._log_validation_errors(itinerary_data, days)
+
+        # 예산 검증 (초과해도 수정 결과는 그대로 반환)
+        if self._validate_budget(itinerary_data, budget, int(budget * 0.9), budget_max):
+            self._finish_call(call, metrics.OUTCOME_PARSED)
+        else:
+            self._finish_call(call, metrics.OUTCOME_BUDGET_FAIL)
+
+        return catalog.expand_ids(itinerary_data)
+
     def _format_existing_itinerary(self, travel_plan):
         """기존 여행 계획을 프롬프트용 문자열로 포맷팅"""
         if not travel_plan or not hasattr(travel_plan, 'itineraries'):
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+
+
+# Gemini HTTP 호출 전용 스레드 풀 (원 요청 + 헤지 요청 실행)
+_executor = ThreadPoolExecutor(max_workers=settings.GEMINI_HTTP_POOL_SIZE, thread_name_prefix='gemini-http')
+
+# 현재 진행 중인 헤지 요청 수 (프로세스 전체 상한 관리)
+_hedge_lock = threading.Lock()
+_inflight_hedges = 0
+
+
+def inflight_hedges():
+    """현재 진행 중인 헤지 요청 수"""
+    return _inflight_hedges
+
+
+def _acquire_hedge_slot():
+    global _inflight_hedges
+    with _hedge_lock:
+        if _inflight_hedges >= settings.GEMINI_MAX_INFLIGHT_HEDGES:
+            return False
+        _inflight_hedges += 1
+        return True
+
+
+def _release_hedge_slot(_future=None):
+    global _inflight_hedges
+    with _hedge_lock:
+        _inflight_hedges -= 1
+
+
+def _report_discarded(futures, on_discarded):
+    """사용하지 않은 요청이 성공하면(지금 또는 나중에) on_discarded(결과) 호출 - 응답 토큰도 과금되므로 집계"""
+    def done(future):
+        if not future.cancelled() and future.exception() is None:
+            try:
+                on_discarded(future.result())
+            except Exception as e:
+                print(f'⚠️ 버려진 헤지 응답 집계 오류: {e}')
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def hedged_call(fn, hedge_after, timeout, on_discarded=None):
+    """
+    fn()을 실행하고, hedge_after초 안에 끝나지 않으면 같은 요청을 한 번 더 보내 먼저 성공한 결과 사용
+
+    (결과, 헤지 요청 여부, 헤지 요청이 이겼는지) 반환.
+    hedge_after가 None이거나 헤지 상한에 도달하면 원 요청만 기다립니다.
+    timeout초 안에 성공한 요청이 없으면 requests.exceptions.Timeout을 발생시킵니다.
+    (먼저 끝난 요청이 실패하면 나머지 요청의 결과를 기다립니다)
+    on_discarded: 결과를 쓰지 않은 요청(진 쪽, 시간 초과 후 끝난 요청)이 성공했을 때 그 결과로 호출 (작업 스레드에서 실행)
+    """
+    deadline = time.monotonic() + timeout
+    primary = _executor.submit(fn)
+    submitted = [primary]
+    pending = {primary}
+
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done and _acquire_hedge_slot():
+            hedge = _executor.submit(fn)
+            hedge.add_done_callback(_release_hedge_slot)
+            submitted.append(hedge)
+            pending.add(hedge)
+            print(f'⏱ Gemini 응답 지연 ({hedge_after:.1f}초 초과) - 헤지 요청 전송')
+
+    hedged = len(pending) > 1
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                if on_discarded is not None:
+                    _report_discarded([other for other in submitted if other is not future], on_discarded)
+                return future.result(), hedged, future is not primary
+            error = future.exception()
+
+    if on_discarded is not None:
+        _report_discarded(pending, on_discarded)
+    if error is not None and not pending:
+        raise error
+    raise requests.exceptions.Timeout(f'Gemini 응답 시간 초과 ({timeout:.1f}초)')
@@ -0,0 +1,267 @@
+import json
+
+
+_decoder = json.JSONDecoder()
+
+MEAL_KEYS = ['아침', '점심', '저녁']
+TRANSPORT_KEYS = ['오전', '오후', '저녁']
+
+
+def _object(properties, required=None):
+    """Gemini responseSchema용 OBJECT 스키마"""
+    return {
+        'type': 'OBJECT',
+        'properties': properties,
+        'required': required if required is not None else list(properties.keys()),
+        'propertyOrdering': list(properties.keys()),
+    }
+
+
+_MEAL_SCHEMA = _object({
+    'restaurant': {'type': 'STRING'},
+    'cost': {'type': 'INTEGER'},
+})
+
+# Gemini 구조화 출력(responseSchema)용 일정 스키마 - 프롬프트의 "days" 구조와 동일
+ITINERARY_RESPONSE_SCHEMA = _object({
+    'days': {
+        'type': 'ARRAY',
+        'items': _object({
+            'day_number': {'type': 'INTEGER'},
+            'description': {'type': 'STRING'},
+            'attractions': {
+                'type': 'ARRAY',
+                'items': _object({
+                    'name': {'type': 'STRING'},
+                    'time': {'type': 'STRING'},
+                    'duration': {'type': 'STRING'},
+                    'description': {'type': 'STRING'},
+                }),
+            },
+            'transportation_info': _object({key: {'type': 'STRING'} for key in TRANSPORT_KEYS}),
+            'accommodation_info': _object({
+                'name': {'type': 'STRING'},
+                'cost': {'type': 'INTEGER'},
+                'check_in': {'type': 'STRING'},
+                'check_out': {'type': 'STRING'},
+            }),
+            'meals_info': _object({key: _MEAL_SCHEMA for key in MEAL_KEYS}),
+            'events_info': {
+                'type': 'ARRAY',
+                'items': _object({
+                    'name': {'type': 'STRING'},
+                    'time': {'type': 'STRING'},
+                    'location': {'type': 'STRING'},
+                    'description': {'type': 'STRING'},
+                }, required=['name']),
+            },
+            'estimated_cost': {'type': 'INTEGER'},
+        }),
+    },
+})
+
+
+def extract_json_text(text):
+    """LLM 응답에서 JSON 본문만 추출 (```json 코드 블록 또는 앞뒤 설명 문구 제거)"""
+    text = text.strip()
+    if text.startswith('{'):
+        return text
+
+    fence = text.find('```')
+    if fence != -1:
+        body_start = text.find('\n', fence)
+        if body_start != -1:
+            body_end = text.find('```', body_start)
+            return text[body_start + 1:body_end if body_end != -1 else len(text)].strip()
+
+    # 코드 블록이 없으면 첫 '{'부터 본문으로 간주
+    brace = text.find('{')
+    return text[brace:] if brace != -1 else text
+
+
+def parse_itinerary_text(text):
+    """LLM 응답 텍스트를 일정 dict로 파싱 (실패 시 json.JSONDecodeError)"""
+    data, _ = _decoder.raw_decode(extract_json_text(text))
+    if not isinstance(data, dict):
+        raise json.JSONDecodeError('최상위 JSON이 객체가 아닙니다', text, 0)
+    if not isinstance(data.get('days'), list):
+        raise json.JSONDecodeError('"days" 배열이 없습니다', text, 0)
+    return data
+
+
+def _next_significant(text, start):
+    """start 이후 첫 번째 공백이 아닌 문자 (없으면 빈 문자열)"""
+    length = len(text)
+    while start < length and text[start] in ' \t\r\n':
+        start += 1
+    return text[start] if start < length else ''
+
+
+def repair_json_text(text):
+    """
+    약간 손상된 JSON 문자열 보정
+
+    - 문자열 밖의 // 및 /* */ 주석 제거
+    - 닫는 괄호 앞의 trailing comma 제거
+    - 문자열 안의 이스케이프되지 않은 따옴표/줄바꿈 이스케이프
+      (따옴표 뒤에 , : } ] 또는 끝이 오지 않으면 문자열 내부 따옴표로 간주)
+    """
+    out = []
+    length = len(text)
+    in_string = False
+    escape = False
+    pending_comma = False
+    i = 0
+
+    while i < length:
+        ch = text[i]
+
+        if in_string:
+            if escape:
+                out.append(ch)
+                escape = False
+            elif ch == '\\':
+                out.append(ch)
+                escape = True
+            elif ch == '"':
+                if _next_significant(text, i + 1) in (',', ':', '}', ']', ''):
+                    out.append(ch)
+                    in_string = False
+                else:
+                    out.append('\\"')
+            elif ch == '\n':
+                out.append('\\n')
+            elif ch == '\t':
+                out.append('\\t')
+            elif ch != '\r':
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch == '/' and i + 1 < length and text[i + 1] == '/':
+            newline = text.find('\n', i)
+            i = length if newline == -1 else newline
+            continue
+        if ch == '/' and i + 1 < length and text[i + 1] == '*':
+            end = text.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        if ch in ' \t\r\n':
+            out.append(ch)
+            i += 1
+            continue
+
+        if pending_comma:
+            if ch not in '}]':
+                out.append(',')
+            pending_comma = False
+
+        if ch == ',':
+            pending_comma = True
+        else:
+            if ch == '"':
+                in_string = True
+            out.append(ch)
+        i += 1
+
+    return ''.join(out)
+
+
+def _array_objects(text, start):
+    """text[start]의 '[' 배열에서 완결된 최상위 객체 문자열들을 순서대로 반환 (잘린 마지막 객체는 제외)"""
+    objects = []
+    depth = 0
+    in_string = False
+    escape = False
+    object_start = None
+
+    for i in range(start + 1, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            if depth == 0 and ch == '{':
+                object_start = i
+            depth += 1
+        elif ch in '}]':
+            if depth == 0:
+                break  # 배열 종료
+            depth -= 1
+            if depth == 0 and object_start is not None:
+                objects.append(text[object_start:i + 1])
+                object_start = None
+
+    return objects
+
+
+def _is_day(day):
+    """일차 객체인지 (day_number가 정수인 dict)"""
+    return isinstance(day, dict) and isinstance(day.get('day_number'), int)
+
+
+def day_number_of(day):
+    """일차 객체의 day_number (숫자 문자열 "1"이나 1.0도 정수로, 일차가 아니거나 변환할 수 없으면 None)"""
+    if not isinstance(day, dict):
+        return None
+    value = day.get('day_number')
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value.strip())
+    return None
+
+
+def salvage_days(text):
+    """손상/잘린 응답에서 완결된 일차 객체만 복구하여 반환"""
+    repaired = repair_json_text(extract_json_text(text))
+    key = repaired.find('"days"')
+    if key == -1:
+        return []
+    bracket = repaired.find('[', key)
+    if bracket == -1:
+        return []
+
+    days = []
+    for chunk in _array_objects(repaired, bracket):
+        try:
+            day = json.loads(chunk)
+        except json.JSONDecodeError:
+            continue
+        if _is_day(day):
+            days.append(day)
+    return days
+
+
+def salvage_itinerary(text):
+    """
+    파싱에 실패한 응답을 최대한 복구
+
+    (일정 dict 또는 None, 전체 복구 여부) 반환.
+    보정 후 전체가 파싱되면 그대로(day_number가 없거나 정수가 아닌 일차는 제외), 잘린 경우 완결된 일차만 모아 반환합니다.
+    """
+    repaired = repair_json_text(extract_json_text(text))
+    try:
+        data = parse_itinerary_text(repaired)
+    except json.JSONDecodeError:
+        pass
+    else:
+        data['days'] = [day for day in data['days'] if _is_day(day)]
+        return data, True
+
+    days = salvage_days(text)
+    if not days:
+        return None, False
+    return {'days': days}, False
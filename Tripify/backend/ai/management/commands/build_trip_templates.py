@@ -0,0 +1,142 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from ai import metrics
+from ai.gemini_service import GeminiService
+from ai.models import TripTemplate
+from trips.models import TravelPlan
+from utils.validators import validate_itinerary
+
+
+DEFAULT_REGIONS = ['제주특별자치도', '부산광역시', '강원특별자치도', '서울특별시']
+DEFAULT_STYLES = ['관광', '힐링', '맛집투어']
+DEFAULT_DAYS = [2, 3, 4]
+
+
+class Command(BaseCommand):
+    help = '자주 요청되는 지역/여행 스타일/일수 조합의 여행 일정 템플릿을 미리 생성합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--regions', nargs='+', default=DEFAULT_REGIONS, help='생성할 지역 목록')
+        parser.add_argument('--styles', nargs='+', default=DEFAULT_STYLES, help='생성할 여행 스타일 목록')
+        parser.add_argument('--days', nargs='+', type=int, default=DEFAULT_DAYS, help='생성할 일수 목록')
+        parser.add_argument('--accommodation-types', nargs='+', default=['hotel'], help='생성할 숙박 타입 목록')
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=0,
+            help='지정하면 목록 대신 기존 여행 계획에서 가장 많이 요청된 조합 N개를 생성합니다',
+        )
+        parser.add_argument('--people', type=int, default=2, help='템플릿 기준 인원 (기본: 2)')
+        parser.add_argument('--budget-per-person-day', type=int, default=100000, help='1인 1일 기준 예산 (기본: 100,000원)')
+        parser.add_argument('--departure', default='서울특별시', help='템플릿 기준 출발지')
+        parser.add_argument('--workers', type=int, default=4, help='동시 생성 수 (기본: 4)')
+        parser.add_argument('--overwrite', action='store_true', help='이미 있는 템플릿도 다시 생성합니다')
+
+    def _top_combinations(self, limit):
+        """기존 여행 계획에서 가장 많이 요청된 (지역, 스타일, 일수, 숙박 타입) 조합"""
+        counter = Counter()
+        plans = TravelPlan.objects.values_list('region', 'travel_style', 'start_date', 'end_date', 'accommodation_type')
+        for region, travel_style, start_date, end_date, accommodation_type in plans.iterator():
+            counter[(region, travel_style, (end_date - start_date).days + 1, accommodation_type)] += 1
+        return [combo for combo, _ in counter.most_common(limit)]
+
+    def _build(self, combo, options):
+        """
+        조합 1개 생성 (작업 스레드에서 실행)
+
+        (조합, 결과 메시지, 저장할 템플릿 값 또는 None) 반환.
+        SQLite 쓰기 충돌을 피하기 위해 저장은 메인 스레드에서 합니다.
+        """
+        region, travel_style, days, accommodation_type = combo
+        people = options['people']
+        budget = options['budget_per_person_day'] * people * days
+        start_date = timezone.localdate() + timedelta(days=30)
+
+        try:
+            service = GeminiService()
+            itinerary_data = service.generate_itinerary(
+                budget=budget,
+                people_count=people,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=days - 1),
+                departure_location=options['departure'],
+                region=region,
+                travel_style=travel_style,
+                accommodation_type=accommodation_type,
+                use_template=False,
+            )
+
+            # Gemini로 생성하지 못한 경우(샘플 데이터) 또는 검증/예산 기준 미달은 저장하지 않음
+            if not any(call['outcome'] == metrics.OUTCOME_PARSED for call in service.calls):
+                return combo, 'Gemini 생성 실패 (샘플 데이터)', None
+            errors = validate_itinerary(itinerary_data, days)
+            if errors:
+                return combo, f'검증 실패: {errors[0]}', None
+            total_cost = sum(day.get('estimated_cost') or 0 for day in itinerary_data['days'])
+            if total_cost > budget * 1.1:
+                return combo, f'예산 초과 ({total_cost:,}원 / {budget:,}원)', None
+
+            return combo, f'생성 완료 (Gemini 호출 {len(service.calls)}회, {total_cost:,}원)', {
+                'budget': budget,
+                'people_count': people,
+                'departure_location': options['departure'],
+                'itinerary': itinerary_data,
+            }
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        if options['top']:
+            combinations = self._top_combinations(options['top'])
+        else:
+            combinations = [
+                (region, travel_style, days, accommodation_type)
+                for region in options['regions']
+                for travel_style in options['styles']
+                for days in options['days']
+                for accommodation_type in options['accommodation_types']
+            ]
+
+        if not options['overwrite']:
+            existing = set(TripTemplate.objects.values_list('region', 'travel_style', 'days', 'accommodation_type'))
+            skipped = [combo for combo in combinations if combo in existing]
+            combinations = [combo for combo in combinations if combo not in existing]
+            if skipped:
+                self.stdout.write(f'이미 있는 템플릿 {len(skipped)}개 건너뜀 (--overwrite로 다시 생성)')
+
+        if not combinations:
+            self.stdout.write(self.style.WARNING('생성할 조합이 없습니다.'))
+            return
+
+        self.stdout.write(f'템플릿 {len(combinations)}개 생성 시작 (동시 {options["workers"]}개)...')
+        created = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(self._build, combo, options) for combo in combinations]
+            for future in as_completed(futures):
+                try:
+                    combo, message, values = future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'템플릿 생성 오류: {e}'))
+                    continue
+                label = f'{combo[0]} {combo[1]} {combo[2]}일 ({combo[3]})'
+                if values is not None:
+                    region, travel_style, days, accommodation_type = combo
+                    TripTemplate.objects.update_or_create(
+                        region=region,
+                        travel_style=travel_style,
+                        days=days,
+                        accommodation_type=accommodation_type,
+                        defaults=values,
+                    )
+                    created += 1
+                    self.stdout.write(self.style.SUCCESS(f'✓ {label}: {message}'))
+                else:
+                    self.stdout.write(self.style.WARNING(f'✗ {label}: {message}'))
+
+        self.stdout.write(self.style.SUCCESS(f'\n완료: {created}/{len(combinations)}개 템플릿 생성'))
@@ -0,0 +1,80 @@
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+from ai.gemini_service import GeminiService
+
+
+def _requested_days(prompt):
+    """프롬프트에서 요청한 일차 범위 (첫 일차, 마지막 일차) 추출"""
+    match = re.search(r'(\d+)일차부터 (\d+)일차까지', prompt)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = re.search(r'정확히 (\d+)일', prompt)
+    if match:
+        return 1, int(match.group(1))
+    return 1, 1
+
+
+class Command(BaseCommand):
+    help = '적응형 타임아웃/헤지 요청 테스트용 로컬 Gemini 스텁 서버를 실행합니다 (GEMINI_BASE_URL을 이 서버로 지정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765, help='포트 (기본: 8765)')
+        parser.add_argument('--delay', type=float, default=0.2, help='일반 응답 지연 (초)')
+        parser.add_argument('--slow-delay', type=float, default=5.0, help='느린 응답 지연 (초)')
+        parser.add_argument('--slow-ratio', type=float, default=0.0, help='느린 응답 비율 (0~1)')
+        parser.add_argument('--error-ratio', type=float, default=0.0, help='500 오류 응답 비율 (0~1)')
+
+    def handle(self, *args, **options):
+        sample = GeminiService(structured_output=False)
+        command = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                prompt = payload['contents'][0]['parts'][0]['text']
+
+                slow = random.random() < options['slow_ratio']
+                time.sleep(options['slow_delay'] if slow else options['delay'])
+
+                if random.random() < options['error_ratio']:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+
+                first_day, last_day = _requested_days(prompt)
+                days = sample._get_sample_data(last_day, '스텁', '관광', 2)['days'][first_day - 1:]
+                text = json.dumps({'days': days}, ensure_ascii=False)
+                body = json.dumps({
+                    'candidates': [{'content': {'parts': [{'text': text}]}}],
+                    'usageMetadata': {
+                        'promptTokenCount': len(prompt) // 2,
+                        'candidatesTokenCount': len(text) // 2,
+                        'totalTokenCount': (len(prompt) + len(text)) // 2,
+                    },
+                }).encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                command.stdout.write(f'[stub] {self.address_string()} {format % args}')
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(self.style.SUCCESS(
+            f'Gemini 스텁 서버 실행 중: http://127.0.0.1:{options["port"]}/generateContent '
+            f'(지연 {options["delay"]}초, 느린 응답 {options["slow_ratio"]:.0%} / {options["slow_delay"]}초)'
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
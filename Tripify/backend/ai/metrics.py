@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from .prompt_compactor import estimate_tokens
+
+
+# 호출 결과 구분
+OUTCOME_PARSED = 'parsed'                # JSON 파싱 및 검증 통과
+OUTCOME_PARSE_FAILURE = 'parse_failure'  # JSON 파싱 실패
+OUTCOME_BUDGET_FAIL = 'budget_fail'      # 파싱은 성공했으나 예산 초과
+OUTCOME_FALLBACK = 'fallback'            # API 오류/비정상 응답으로 대체 데이터 사용
+OUTCOME_DISCARDED = 'discarded'          # 헤지 요청 중 결과를 쓰지 않은 쪽 (토큰/비용만 집계)
+
+OUTCOMES = [OUTCOME_PARSED, OUTCOME_PARSE_FAILURE, OUTCOME_BUDGET_FAIL, OUTCOME_FALLBACK, OUTCOME_DISCARDED]
+
+# 지연시간 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = [250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000]
+
+
+def new_call_record(operation, prompt, retry_index=0):
+    """Gemini 호출 1건에 대한 기록 생성"""
+    return {
+        'operation': operation,
+        'retry_index': retry_index,
+        'prompt_chars': len(prompt),
+        'estimated_prompt_tokens': estimate_tokens(prompt),
+        'response_chars': 0,
+        'prompt_tokens': None,
+        'response_tokens': None,
+        'total_tokens': None,
+        'latency_ms': None,
+        'outcome': None,
+        'salvaged': False,
+        'hedged': False,
+        'hedge_won': False,
+        'cost_usd': 0.0,
+        'started_at': time.time(),
+    }
+
+
+def apply_usage_metadata(record, result):
+    """Gemini 응답의 usageMetadata 토큰 수를 기록에 반영"""
+    usage = result.get('usageMetadata') or {}
+    record['prompt_tokens'] = usage.get('promptTokenCount')
+    record['response_tokens'] = usage.get('candidatesTokenCount')
+    record['total_tokens'] = usage.get('totalTokenCount')
+
+
+def estimate_cost(prompt_tokens, response_tokens):
+    """토큰 수로 예상 비용(USD) 계산"""
+    input_price = settings.GEMINI_INPUT_COST_PER_1M_TOKENS
+    output_price = settings.GEMINI_OUTPUT_COST_PER_1M_TOKENS
+    return ((prompt_tokens or 0) * input_price + (response_tokens or 0) * output_price) / 1_000_000
+
+
+def percentile(sorted_values, q):
+    """정렬된 값 목록에서 백분위수 계산 (선형 보간)"""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class MetricsRegistry:
+    """
+    LLM 호출 기록 레지스트리 (프로세스 단위, 스레드 안전)
+
+    최근 호출은 고정 크기 버퍼에 보관하여 백분위수를 계산하고,
+    누적 카운터(호출 수, 결과별 건수, 토큰, 비용, 히스토그램)는 별도로 유지합니다.
+    """
+
+    def __init__(self, max_records=1000):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=max_records)
+        self._totals = {}
+
+    def _empty_totals(self):
+        return {
+            'calls': 0,
+            'outcomes': {outcome: 0 for outcome in OUTCOMES},
+            'retries': 0,
+            'salvaged': 0,
+            'hedged': 0,
+            'hedge_won': 0,
+            'prompt_chars': 0,
+            'estimated_prompt_tokens': 0,
+            'response_chars': 0,
+            'prompt_tokens': 0,
+            'response_tokens': 0,
+            'cost_usd': 0.0,
+            'latency_histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        }
+
+    def record(self, record):
+        """완료된 호출 기록 등록"""
+        with self._lock:
+            self._records.append(record)
+            totals = self._totals.setdefault(record['operation'], self._empty_totals())
+            totals['calls'] += 1
+            if record['outcome'] in totals['outcomes']:
+                totals['outcomes'][record['outcome']] += 1
+            if record['retry_index']:
+                totals['retries'] += 1
+            if record['salvaged']:
+                totals['salvaged'] += 1
+            if record['hedged']:
+                totals['hedged'] += 1
+            if record['hedge_won']:
+                totals['hedge_won'] += 1
+            totals['prompt_chars'] += record['prompt_chars']
+            totals['estimated_prompt_tokens'] += record['estimated_prompt_tokens']
+            totals['response_chars'] += record['response_chars']
+            totals['prompt_tokens'] += record['prompt_tokens'] or 0
+            totals['response_tokens'] += record['response_tokens'] or 0
+            totals['cost_usd'] += record['cost_usd']
+
+            latency = record['latency_ms']
+            if latency is not None:
+                bucket = len(LATENCY_BUCKETS_MS)
+                for i, upper in enumerate(LATENCY_BUCKETS_MS):
+                    if latency <= upper:
+                        bucket = i
+                        break
+                totals['latency_histogram'][bucket] += 1
+
+    def latencies(self, operation=None):
+        """최근 호출의 지연시간(ms) 목록 (정렬됨)"""
+        with self._lock:
+            values = [
+                r['latency_ms'] for r in self._records
+                if r['latency_ms'] is not None and (operation is None or r['operation'] == operation)
+            ]
+        return sorted(values)
+
+    def latency_percentile(self, q, operation=None, min_samples=1):
+        """최근 호출 지연시간(ms)의 q 백분위수 (기록이 min_samples개보다 적으면 None)"""
+        latencies = self.latencies(operation)
+        if len(latencies) < max(1, min_samples):
+            return None
+        return percentile(latencies, q)
+
+    def recent(self, limit=50):
+        """최근 호출 기록 (최신순)"""
+        with self._lock:
+            records = list(self._records)[-limit:]
+        return list(reversed(records))
+
+    def summary(self):
+        """작업별 누적 통계와 최근 구간 백분위수 요약"""
+        with self._lock:
+            totals = {op: dict(t, outcomes=dict(t['outcomes']), latency_histogram=list(t['latency_histogram']))
+                      for op, t in self._totals.items()}
+
+        operations = {}
+        for operation, t in totals.items():
+            latencies = self.latencies(operation)
+            histogram = {
+                f'le_{upper}': count
+                for upper, count in zip(LATENCY_BUCKETS_MS, t['latency_histogram'])
+            }
+            histogram['gt_max'] = t['latency_histogram'][-1]
+            operations[operation] = {
+                'calls': t['calls'],
+                'outcomes': t['outcomes'],
+                'retries': t['retries'],
+                'salvaged': t['salvaged'],
+                'hedged': t['hedged'],
+                'hedge_won': t['hedge_won'],
+                'prompt_chars': t['prompt_chars'],
+                'estimated_prompt_tokens': t['estimated_prompt_tokens'],
+                'response_chars': t['response_chars'],
+                'prompt_tokens': t['prompt_tokens'],
+                'response_tokens': t['response_tokens'],
+                'avg_prompt_tokens': round(t['prompt_tokens'] / t['calls'], 1) if t['calls'] else 0,
+                'avg_estimated_prompt_tokens': round(t['estimated_prompt_tokens'] / t['calls'], 1) if t['calls'] else 0,
+                'avg_response_tokens': round(t['response_tokens'] / t['calls'], 1) if t['calls'] else 0,
+                'cost_usd': round(t['cost_usd'], 6),
+                'latency_ms': {
+                    'window': len(latencies),
+                    'p50': percentile(latencies, 50),
+                    'p90': percentile(latencies, 90),
+                    'p95': percentile(latencies, 95),
+                    'p99': percentile(latencies, 99),
+                    'max': latencies[-1] if latencies else None,
+                },
+                'latency_histogram': histogram,
+            }
+
+        return {
+            'operations': operations,
+            'total_calls': sum(op['calls'] for op in operations.values()),
+            'total_cost_usd': round(sum(op['cost_usd'] for op in operations.values()), 6),
+        }
+
+    def reset(self):
+        """모든 기록 초기화"""
+        with self._lock:
+            self._records.clear()
+            self._totals = {}
+
+
+registry = MetricsRegistry()
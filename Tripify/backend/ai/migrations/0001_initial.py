@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('operation', models.CharField(max_length=20, verbose_name='작업')),
+                ('requests', models.PositiveIntegerField(default=0, verbose_name='요청 수')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='Gemini 호출 수')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='재시도 수')),
+                ('failures', models.PositiveIntegerField(default=0, verbose_name='실패 수')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0, verbose_name='입력 토큰')),
+                ('response_tokens', models.PositiveIntegerField(default=0, verbose_name='출력 토큰')),
+                ('cost_usd', models.FloatField(default=0, verbose_name='예상 비용(USD)')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='llm_usages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'LLM 사용량',
+                'verbose_name_plural': 'LLM 사용량 목록',
+                'db_table': 'llm_usages',
+                'ordering': ['-date', 'user'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'operation'), name='unique_llm_usage_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(max_length=100, verbose_name='여행 지역')),
+                ('travel_style', models.CharField(max_length=100, verbose_name='여행 스타일')),
+                ('days', models.PositiveIntegerField(verbose_name='일수')),
+                ('accommodation_type', models.CharField(max_length=20, verbose_name='숙박 타입')),
+                ('budget', models.IntegerField(verbose_name='생성 예산')),
+                ('people_count', models.IntegerField(verbose_name='생성 인원')),
+                ('departure_location', models.CharField(max_length=100, verbose_name='생성 출발지')),
+                ('itinerary', models.JSONField(verbose_name='일정 데이터')),
+                ('use_count', models.PositiveIntegerField(default=0, verbose_name='사용 횟수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '여행 일정 템플릿',
+                'verbose_name_plural': '여행 일정 템플릿 목록',
+                'db_table': 'trip_templates',
+                'ordering': ['region', 'travel_style', 'days'],
+                'constraints': [models.UniqueConstraint(fields=('region', 'travel_style', 'days', 'accommodation_type'), name='unique_trip_template')],
+            },
+        ),
+    ]
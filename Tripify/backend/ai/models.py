@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from . import metrics
+
+
+class LLMUsage(models.Model):
+    """사용자별 LLM 사용량 일일 집계 (사용자 x 날짜 x 작업당 1행)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='llm_usages')
+    date = models.DateField(verbose_name='날짜')
+    operation = models.CharField(max_length=20, verbose_name='작업')  # generate, modify
+
+    requests = models.PositiveIntegerField(default=0, verbose_name='요청 수')
+    calls = models.PositiveIntegerField(default=0, verbose_name='Gemini 호출 수')
+    retries = models.PositiveIntegerField(default=0, verbose_name='재시도 수')
+    failures = models.PositiveIntegerField(default=0, verbose_name='실패 수')
+    prompt_tokens = models.PositiveIntegerField(default=0, verbose_name='입력 토큰')
+    response_tokens = models.PositiveIntegerField(default=0, verbose_name='출력 토큰')
+    cost_usd = models.FloatField(default=0, verbose_name='예상 비용(USD)')
+
+    class Meta:
+        db_table = 'llm_usages'
+        verbose_name = 'LLM 사용량'
+        verbose_name_plural = 'LLM 사용량 목록'
+        ordering = ['-date', 'user']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date', 'operation'], name='unique_llm_usage_per_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date} {self.operation} ({self.calls}회)"
+
+    @classmethod
+    def record(cls, user, operation, calls, requests=1):
+        """GeminiService.calls 기록을 오늘 집계 행에 누적 (requests: 늘릴 요청 수 - 요청이 끝난 뒤 도착한 헤지 응답은 0)"""
+        usage, _ = cls.objects.get_or_create(user=user, date=timezone.localdate(), operation=operation)
+        cls.objects.filter(pk=usage.pk).update(
+            requests=F('requests') + requests,
+            calls=F('calls') + len(calls),
+            retries=F('retries') + sum(1 for call in calls if call['retry_index']),
+            failures=F('failures') + sum(1 for call in calls if call['outcome'] in (metrics.OUTCOME_FALLBACK, metrics.OUTCOME_PARSE_FAILURE)),
+            prompt_tokens=F('prompt_tokens') + sum(call['prompt_tokens'] or 0 for call in calls),
+            response_tokens=F('response_tokens') + sum(call['response_tokens'] or 0 for call in calls),
+            cost_usd=F('cost_usd') + sum(call['cost_usd'] for call in calls),
+        )
+
+    @classmethod
+    def today_totals(cls, user):
+        """오늘 전체 작업의 Gemini 호출 수/토큰 합계"""
+        totals = cls.objects.filter(user=user, date=timezone.localdate()).aggregate(
+            calls=models.Sum('calls'),
+            tokens=models.Sum(F('prompt_tokens') + F('response_tokens')),
+        )
+        return totals['calls'] or 0, totals['tokens'] or 0
+
+
+class TripTemplate(models.Model):
+    """
+    미리 생성해 둔 여행 일정 템플릿 (지역 x 여행 스타일 x 일수 x 숙박 타입)
+
+    자주 요청되는 조합은 build_trip_templates 명령어로 미리 생성하고,
+    생성 요청 시 날짜/인원/예산에 맞게 변환하여 Gemini 호출 없이 바로 사용합니다.
+    """
+    region = models.CharField(max_length=100, verbose_name='여행 지역')
+    travel_style = models.CharField(max_length=100, verbose_name='여행 스타일')
+    days = models.PositiveIntegerField(verbose_name='일수')
+    accommodation_type = models.CharField(max_length=20, verbose_name='숙박 타입')
+
+    # 템플릿 생성 시 사용한 조건 (예산 비례 변환 기준)
+    budget = models.IntegerField(verbose_name='생성 예산')
+    people_count = models.IntegerField(verbose_name='생성 인원')
+    departure_location = models.CharField(max_length=100, verbose_name='생성 출발지')
+
+    itinerary = models.JSONField(verbose_name='일정 데이터')  # {"days": [...]}
+    use_count = models.PositiveIntegerField(default=0, verbose_name='사용 횟수')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
+
+    class Meta:
+        db_table = 'trip_templates'
+        verbose_name = '여행 일정 템플릿'
+        verbose_name_plural = '여행 일정 템플릿 목록'
+        ordering = ['region', 'travel_style', 'days']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['region', 'travel_style', 'days', 'accommodation_type'],
+                name='unique_trip_template',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.region} {self.travel_style} {self.days}일 ({self.accommodation_type})"
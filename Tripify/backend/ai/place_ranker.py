@@ -0,0 +1,233 @@
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from places.models import Place
+
+
+# 여행 스타일별 선호 분류/키워드 가중치 (분류는 tourism_data 파일명, 키워드는 장소명에 포함 여부)
+STYLE_TERMS = {
+    '관광': {
+        '고궁': 1.0, '성': 0.9, '유적지사적지': 0.9, '민속마을': 0.8, '해안절경': 0.8, '등대': 0.6,
+        '전망대': 0.8, '타워': 0.6, '섬': 0.6, '항구포구': 0.5, '전통시장': 0.5, '박물관': 0.5,
+    },
+    '힐링': {
+        '수목원': 1.0, '자연휴양림': 1.0, '해수욕장': 0.8, '호수': 0.8, '해안절경': 0.7, '온천': 1.0,
+        '스파': 0.8, '카페디저트': 0.6, '정원': 0.8, '숲': 0.8, '펜션': 0.5, '둘레길': 0.7,
+    },
+    '맛집투어': {
+        '전통시장': 1.0, '상설시장': 0.8, '한식': 0.8, '이색음식점': 0.8, '카페디저트': 0.6,
+        '시장': 0.8, '먹자골목': 1.0, '특산물판매점': 0.6, '서양식': 0.5, '일식': 0.5, '중식': 0.5,
+    },
+    '문화체험': {
+        '박물관': 1.0, '미술관화랑': 1.0, '전시관': 0.8, '공연장': 0.8, '기념관': 0.7, '문화전수시설': 0.9,
+        '민속마을': 0.9, '고택': 0.8, '고궁': 0.8, '공예공방': 0.9, '사찰': 0.6, '한옥': 0.8, '체험': 0.7,
+    },
+    '자연탐방': {
+        '국립공원': 1.0, '도립공원': 0.9, '군립공원': 0.8, '산': 0.9, '계곡': 0.9, '폭포': 0.9, '동굴': 0.8,
+        '자연생태관광지': 1.0, '수목원': 0.7, '자연휴양림': 0.8, '강': 0.6, '호수': 0.6, '섬': 0.6,
+        '해안절경': 0.7, '오름': 1.0, '습지': 0.8,
+    },
+    '쇼핑': {
+        '백화점': 1.0, '아울렛': 1.0, '복합쇼핑몰': 1.0, '면세점': 0.9, '전통시장': 0.8, '상설시장': 0.7,
+        '특산물판매점': 0.7, '한국관광명품점': 0.6, '대형마트': 0.4, '거리': 0.5,
+    },
+}
+
+# 숙박 타입별 선호 분류
+ACCOMMODATION_CATEGORIES = {
+    'hotel': {'관광호텔': 1.0, '콘도미니엄': 0.6},
+    'motel': {'모텔': 1.0, '여관': 0.8},
+    'pension': {'펜션': 1.0, '민박': 0.7, '콘도미니엄': 0.5},
+    'guesthouse': {'게스트하우스': 1.0, '호스텔': 0.9, '유스호스텔': 0.8, '홈스테이': 0.7, '민박': 0.5},
+}
+
+# 점수 가중치
+RELEVANCE_WEIGHT = 1.0      # 스타일 일치도 (TF-IDF 방식)
+TITLE_TERM_WEIGHT = 0.6     # 장소명 키워드 일치는 분류 일치보다 약하게
+POPULARITY_WEIGHT = 0.4     # 북마크 수 + 일정 포함 횟수 (로그, 지역 내 최대값 기준 정규화)
+ITINERARY_COUNT_WEIGHT = 0.5  # 일정 포함 1회 = 북마크 0.5개
+IMAGE_BONUS = 0.05          # 이미지가 있는 장소 (정보가 충실한 장소 우선)
+JITTER = 0.15               # 시드 기반 무작위 가산점 (같은 조건이면 같은 결과, 조건이 다르면 다른 후보)
+
+# 다양화 (MMR: 점수 - 이미 고른 후보와의 유사도)
+POOL_FACTOR = 4             # 다양화 대상 = 상위 limit x POOL_FACTOR개
+SPREAD_WEIGHT = 0.35        # 가까운 장소 감점 비중
+SPREAD_KM = 3.0             # 이 거리 이내면 강하게 감점 (exp(-거리/SPREAD_KM))
+CATEGORY_REPEAT_WEIGHT = 0.25  # 같은 분류 반복 감점 비중
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+
+class RegionCandidates:
+    """
+    한 지역/장소 타입의 후보 특성 (미리 계산)
+
+    분류별 IDF(지역 내에서 드문 분류일수록 큼), 인기도(북마크/일정 포함 카운터), 좌표를 보관하고
+    여행 스타일별 기본 점수는 처음 요청될 때 계산하여 캐시합니다.
+    """
+
+    def __init__(self, region, place_type):
+        self.region = region
+        self.place_type = place_type
+        rows = list(
+            Place.objects.filter(region__icontains=region, place_type=place_type, is_active=True)
+            .values_list('id', 'title', 'category', 'latitude', 'longitude', 'image_url',
+                         'bookmark_count', 'itinerary_count')
+        )
+        self.ids = [row[0] for row in rows]
+        self.titles = [row[1] for row in rows]
+        self.categories = [row[2] for row in rows]
+        self.coords = [
+            (float(row[3]), float(row[4])) if row[3] is not None and row[4] is not None else None
+            for row in rows
+        ]
+        self.has_image = [bool(row[5]) for row in rows]
+
+        # 분류별 IDF (0~1 정규화)
+        counts = {}
+        for category in self.categories:
+            counts[category] = counts.get(category, 0) + 1
+        total = len(rows)
+        idf = {category: math.log((total + 1) / (count + 1)) + 1 for category, count in counts.items()}
+        max_idf = max(idf.values(), default=1)
+        self.idf = {category: value / max_idf for category, value in idf.items()}
+
+        # 인기도 (미리 집계된 카운터, 로그 정규화)
+        popularity = [math.log1p(row[6] + row[7] * ITINERARY_COUNT_WEIGHT) for row in rows]
+        max_log = max(popularity, default=0) or 1
+        self.popularity = [value / max_log for value in popularity]
+
+        self._base_scores = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def base_scores(self, terms_key, terms):
+        """스타일 가중치(terms)에 대한 후보별 기본 점수 (terms_key로 캐시)"""
+        with self._lock:
+            scores = self._base_scores.get(terms_key)
+            if scores is not None:
+                return scores
+
+        scores = []
+        for index, category in enumerate(self.categories):
+            relevance = terms.get(category, 0) * self.idf.get(category, 0)
+            title = self.titles[index]
+            title_match = max((weight for term, weight in terms.items() if term in title), default=0)
+            relevance = max(relevance, title_match * TITLE_TERM_WEIGHT)
+            scores.append(
+                relevance * RELEVANCE_WEIGHT
+                + self.popularity[index] * POPULARITY_WEIGHT
+                + (IMAGE_BONUS if self.has_image[index] else 0)
+            )
+
+        with self._lock:
+            self._base_scores[terms_key] = scores
+        return scores
+
+
+class PlaceRanker:
+    """
+    여행 스타일에 맞는 프롬프트 후보 장소 선택 (프로세스 단위, 스레드 안전)
+
+    지역/장소 타입별 후보 특성은 PLACE_RANK_CACHE_SECONDS 동안 재사용하며,
+    점수 상위 후보 중에서 가까운 장소/같은 분류가 몰리지 않도록 MMR 방식으로 고릅니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._regions = {}  # (지역, 장소 타입) -> (계산 시각, RegionCandidates)
+
+    def candidates(self, region, place_type):
+        """지역/장소 타입의 후보 특성 (캐시가 오래되면 다시 계산)"""
+        key = (region, place_type)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._regions.get(key)
+        if cached is not None and now - cached[0] < settings.PLACE_RANK_CACHE_SECONDS:
+            return cached[1]
+
+        candidates = RegionCandidates(region, place_type)
+        with self._lock:
+            self._regions[key] = (now, candidates)
+        return candidates
+
+    def clear(self):
+        with self._lock:
+            self._regions = {}
+
+    def select(self, region, place_type, limit, travel_style='', accommodation_type='', seed=None):
+        """
+        후보 장소 limit개 선택 (점수 순 Place 목록)
+
+        seed가 같으면 같은 결과를 반환하고, seed가 다르면 비슷한 점수의 후보가 바뀌어 나옵니다.
+        """
+        candidates = self.candidates(region, place_type)
+        if not len(candidates):
+            return []
+
+        terms = dict(STYLE_TERMS.get(travel_style, {}))
+        if place_type == 'accommodation':
+            terms.update(ACCOMMODATION_CATEGORIES.get(accommodation_type, {}))
+        terms_key = (travel_style, accommodation_type if place_type == 'accommodation' else '')
+        base_scores = candidates.base_scores(terms_key, terms)
+
+        # 숙박시설은 요청한 숙박 타입이 우선이므로 분류 다양화 제외
+        category_cap = limit if place_type != 'accommodation' else None
+
+        rng = random.Random(seed)
+        scores = [score + rng.random() * JITTER for score in base_scores]
+        # 다양화 대상: 점수 순 상위 후보 (한 분류가 대상을 독차지하지 않도록 분류별 category_cap개까지)
+        pool = []
+        pool_counts = {}
+        for index in sorted(range(len(scores)), key=scores.__getitem__, reverse=True):
+            category = candidates.categories[index]
+            if category_cap is not None and pool_counts.get(category, 0) >= category_cap:
+                continue
+            pool_counts[category] = pool_counts.get(category, 0) + 1
+            pool.append(index)
+            if len(pool) >= limit * POOL_FACTOR:
+                break
+
+        selected = []
+        category_counts = {}
+        while pool and len(selected) < limit:
+            best_index, best_value = None, None
+            for index in pool:
+                value = scores[index] - self._redundancy(candidates, index, selected, category_counts)
+                if best_value is None or value > best_value:
+                    best_index, best_value = index, value
+            pool.remove(best_index)
+            selected.append(best_index)
+            if category_cap is not None:
+                category = candidates.categories[best_index]
+                category_counts[category] = category_counts.get(category, 0) + 1
+
+        places = Place.objects.in_bulk([candidates.ids[index] for index in selected])
+        return [places[candidates.ids[index]] for index in selected if candidates.ids[index] in places]
+
+    def _redundancy(self, candidates, index, selected, category_counts):
+        """이미 고른 후보와 가까울수록, 같은 분류가 많을수록 큰 감점"""
+        penalty = category_counts.get(candidates.categories[index], 0) * CATEGORY_REPEAT_WEIGHT
+        coords = candidates.coords[index]
+        if coords is not None and selected:
+            nearest = min(
+                (_haversine_km(*coords, *candidates.coords[other]) for other in selected
+                 if candidates.coords[other] is not None),
+                default=None,
+            )
+            if nearest is not None:
+                penalty += math.exp(-nearest / SPREAD_KM) * SPREAD_WEIGHT
+        return penalty
+
+
+place_ranker = PlaceRanker()
@@ -0,0 +1,468 @@
+import json
+
+
+def _example_day(day_number, position):
+    """프롬프트 JSON 예시의 일차 객체 (첫 번째 예시만 상세하게)"""
+    if position == 0:
+        return f'''    {{
+      "day_number": {day_number},
+      "description": "일정 전체 요약 (예: 서울 도심 투어 및 전통문화 체험)",
+      "attractions": [
+        {{
+          "name": "경복궁",
+          "time": "09:00",
+          "duration": "2시간",
+          "description": "조선시대 궁궐, 경회루와 근정전 관람"
+        }},
+        {{
+          "name": "북촌 한옥마을",
+          "time": "11:30",
+          "duration": "1.5시간",
+          "description": "전통 한옥 거리 산책 및 사진 촬영"
+        }}
+      ],
+      "transportation_info": {{
+        "오전": "지하철 3호선 경복궁역 하차 (1,400원)",
+        "오후": "도보 이동 (경복궁→북촌)",
+        "저녁": "택시 이용 (약 8,000원)"
+      }},
+      "accommodation_info": {{
+        "name": "명동 ○○호텔 또는 비슷한 등급",
+        "cost": 80000,
+        "check_in": "15:00",
+        "check_out": "11:00"
+      }},
+      "meals_info": {{
+        "아침": {{
+          "restaurant": "호텔 조식 또는 근처 카페",
+          "cost": 10000
+        }},
+        "점심": {{
+          "restaurant": "삼청동 전통 한정식 (예: ○○식당)",
+          "cost": 15000
+        }},
+        "저녁": {{
+          "restaurant": "명동 칼국수 맛집 (예: ○○집)",
+          "cost": 12000
+        }}
+      }},
+      "events_info": [
+        {{
+          "name": "경복궁 수문장 교대식",
+          "time": "10:00, 14:00",
+          "location": "경복궁 광화문",
+          "description": "전통 수문장 교대 의식 관람 (무료)"
+        }}
+      ],
+      "estimated_cost": 136400
+    }}'''
+
+    estimated_cost = 120000 if position == 1 else 110000
+    return f'''    {{
+      "day_number": {day_number},
+      "description": "{day_number}일차 일정 요약",
+      "attractions": [...],
+      "transportation_info": {{...}},
+      "accommodation_info": {{...}},
+      "meals_info": {{...}},
+      "events_info": [],
+      "estimated_cost": {estimated_cost}
+    }}'''
+
+
+def _example_day_numbers(first_day, last_day):
+    """JSON 예시에 보여줄 일차 번호 (첫째 날, 둘째 날, 마지막 날)"""
+    numbers = [first_day]
+    if last_day > first_day:
+        numbers.append(first_day + 1)
+    if last_day > first_day + 1:
+        numbers.append(last_day)
+    return numbers
+
+
+def _extra_rules(fixed_accommodation, exclude_attractions):
+    """구간 생성/누락 일차 생성 시 추가 규칙"""
+    extra_rules = ''
+    if fixed_accommodation:
+        extra_rules += f"\n- **숙소는 모든 일차에 '{fixed_accommodation}'을(를) 동일하게 사용하세요** (다른 구간과 숙소를 맞추기 위함)"
+    if exclude_attractions:
+        extra_rules += f"\n- **다음 관광지는 다른 일차에 이미 포함되어 있으므로 다시 방문하지 마세요**: {', '.join(exclude_attractions)}"
+    return extra_rules
+
+
+def _compact_example(day_number):
+    """축약 프롬프트의 JSON 예시 (일차 1개, 한 줄)"""
+    return (
+        f'{{"days": [{{"day_number": {day_number}, "description": "일정 요약", '
+        '"attractions": [{"name": "관광지명", "time": "09:00", "duration": "2시간", "description": "설명"}], '
+        '"transportation_info": {"오전": "교통수단 및 비용", "오후": "...", "저녁": "..."}, '
+        '"accommodation_info": {"name": "숙소명", "cost": 80000, "check_in": "15:00", "check_out": "11:00"}, '
+        '"meals_info": {"아침": {"restaurant": "식당명", "cost": 10000}, "점심": {...}, "저녁": {...}}, '
+        '"events_info": [], "estimated_cost": 130000}]}'
+    )
+
+
+def _compact_candidates(tourist_spots_str, restaurants_str, accommodations_str, festivals_str):
+    """축약 프롬프트의 후보 목록 (짧은 ID는 목록 안에서만 사용)"""
+    return f"""후보 목록 (ID 이름 [분류] 주소) - 이 목록에서 선택하고, 응답에는 ID 대신 이름을 그대로 쓰세요:
+[관광지]
+{tourist_spots_str}
+[음식점]
+{restaurants_str}
+[숙박시설]
+{accommodations_str}
+[축제/행사]
+{festivals_str}"""
+
+
+def _compact_common_rules(people_count):
+    """축약 프롬프트의 공통 작성 규칙 (전체 프롬프트에서 반복되던 식사/한글 규칙을 한 번만)"""
+    return f"""- meals_info는 모든 일차에 필수: "아침", "점심", "저녁" 키에 각각 restaurant, cost
+- transportation_info 키는 "오전", "오후", "저녁" (영문 키 금지)
+- 모든 비용은 {people_count}명 전체 기준, 모든 내용은 한글, 시간은 "09:00" 형식"""
+
+
+def _compact_itinerary_prompt(header, days_rule, budget_rules, extra_rules,
+                              budget, people_count, start_date, end_date, days, departure_location, region,
+                              travel_style, accommodation_type,
+                              tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
+                              first_day, daily_budget, strict_budget, include_example):
+    """여행 일정 생성 축약 프롬프트 (build_itinerary_prompt(compact=True))"""
+    if first_day == 1:
+        departure_rule = f'- 1일차 transportation_info에 "{departure_location} → {region}" 이동 수단과 비용 포함'
+    else:
+        departure_rule = f'- 출발지 이동은 1일차에 포함되어 있으므로 {region} 지역 내 이동만 포함'
+
+    if strict_budget:
+        budget_rules += f"""
+- **이전 시도에서 예산을 초과했습니다**: 게스트하우스/모텔, 대중교통/도보, 가성비 음식점, 무료 관광지 위주로 각 일차 {daily_budget:,}원 이하"""
+
+    example = f"\n\nJSON 형식:\n{_compact_example(first_day)}" if include_example else ''
+
+    return f"""{header}
+조건: {region} | {start_date}~{end_date} ({days}일) | {people_count}명, 예산 {budget:,}원 | 출발 {departure_location} | {travel_style} | 숙박 {accommodation_type}
+
+{_compact_candidates(tourist_spots_str, restaurants_str, accommodations_str, festivals_str)}
+
+일차별 작성 규칙:
+- attractions: 동선이 효율적이도록 근처 관광지를 묶어 배치 (name, time, duration, description)
+{departure_rule}
+- accommodation_info: {accommodation_type} 숙소 name, cost, check_in, check_out
+- events_info: 기간 내 축제/행사가 있으면 우선 포함
+- estimated_cost: 해당 일차 총비용 (교통비 + 식비 + 입장료 + 숙박비)
+{_compact_common_rules(people_count)}
+{days_rule}
+
+예산 (매우 중요):
+{budget_rules}{extra_rules}{example}
+"""
+
+
+def build_itinerary_prompt(budget, people_count, start_date, end_date, departure_location, region,
+                           travel_style, accommodation_type,
+                           tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
+                           first_day=1, last_day=None, exclude_attractions=None,
+                           fixed_accommodation=None, strict_budget=False,
+                           compact=False, include_example=True):
+    """
+    여행 일정 생성 프롬프트
+
+    first_day~last_day를 지정하면 전체 일정 중 해당 구간의 일차만 생성하도록 요청합니다.
+    (구간 예산은 일수 비례로 배분, exclude_attractions는 다른 일차에서 이미 사용한 관광지)
+    fixed_accommodation은 구간 간 숙소를 맞추기 위한 공통 숙소명, strict_budget은
+    예산 초과 후 재요청 시 더 저렴한 선택을 강조합니다.
+    compact=True면 중복 규칙을 뺀 축약 프롬프트를 만들고, include_example=False면
+    JSON 예시를 생략합니다. (구조화 출력으로 스키마가 강제되는 경우)
+    """
+    days = (end_date - start_date).days + 1
+    if last_day is None:
+        last_day = days
+    span = last_day - first_day + 1
+    is_partial = span != days
+
+    budget_per_person = budget // people_count
+    daily_budget = budget // days
+    budget_max = int(budget * 1.1)
+
+    if is_partial:
+        segment_budget = budget * span // days
+        segment_max = int(segment_budget * 1.1)
+        header = f"""다음 조건의 전체 {days}일 여행 중 **{first_day}일차부터 {last_day}일차까지 정확히 {span}일치** 일정만 상세한 JSON 형식으로 작성해주세요:
+**중요: day_number는 {first_day}부터 {last_day}까지여야 하며, 다른 일차는 포함하지 마세요.**"""
+        days_rule = f'**반드시 "days" 배열에 정확히 {span}개의 일정 객체를 포함해야 합니다. day_number는 {first_day}부터 {last_day}까지 순서대로여야 합니다.**'
+        budget_rules = f"""- 총 예산: {budget:,}원 ({people_count}명 전체 기준, {days}일 전체)
+- 이 구간({first_day}~{last_day}일차) 예산: 약 {segment_budget:,}원 (일일 목표 예산 약 {daily_budget:,}원)
+- **{span}일간 총 비용 합계는 {segment_max:,}원을 초과하지 않아야 합니다 (구간 예산의 110% 이하)**
+- 예산보다 작게 생성되는 것은 문제없지만, 예산을 10% 초과하면 안 됩니다
+- 예산을 초과할 가능성이 있으면 저렴한 음식점/숙소를 선택하고, 불필요한 택시 이용을 줄이세요"""
+    else:
+        header = f"""다음 조건으로 **정확히 {days}일** 여행 계획을 상세한 JSON 형식으로 작성해주세요:
+**중요: 반드시 {days}일치 일정을 모두 생성해야 합니다. {days-1}일이나 {days+1}일이 아닌 정확히 {days}일입니다.**"""
+        days_rule = f'**반드시 "days" 배열에 정확히 {days}개의 일정 객체를 포함해야 합니다. day_number는 1부터 {days}까지 순서대로여야 합니다.**'
+        budget_rules = f"""- 총 예산: {budget:,}원 ({people_count}명 전체 기준)
+- 일일 목표 예산: 약 {daily_budget:,}원
+- **전체 {days}일간 총 비용 합계는 {budget_max:,}원을 초과하지 않아야 합니다 (예산의 110% 이하)**
+- 예산보다 작게 생성되는 것은 문제없지만, 예산을 10% 초과하면 안 됩니다
+- 각 일차의 estimated_cost를 모두 합산했을 때 총 예산의 110%를 넘지 않도록 주의하세요
+- 예산을 초과할 가능성이 있으면 저렴한 음식점/숙소를 선택하고, 불필요한 택시 이용을 줄이세요"""
+
+    if first_day == 1:
+        departure_rules = f"""   - 출발지({departure_location})에서 여행 지역({region})으로의 이동 방법을 첫날 일정에 포함하세요
+   - 주요 이동 구간별 교통수단 (버스, 지하철, 택시, 렌터카, KTX, 고속버스 등)
+   - 예상 이동 시간 및 비용
+   - 첫날에는 "{departure_location} → {region}" 이동 경로와 비용을 명시하세요"""
+    else:
+        departure_rules = f"""   - 출발지({departure_location})에서의 이동은 1일차에 포함되어 있으므로, 이 구간에는 {region} 지역 내 이동만 포함하세요
+   - 주요 이동 구간별 교통수단 (버스, 지하철, 택시, 렌터카 등)
+   - 예상 이동 시간 및 비용"""
+
+    if compact:
+        return _compact_itinerary_prompt(
+            header, days_rule, budget_rules, _extra_rules(fixed_accommodation, exclude_attractions),
+            budget, people_count, start_date, end_date, days, departure_location, region,
+            travel_style, accommodation_type,
+            tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
+            first_day, daily_budget, strict_budget, include_example,
+        )
+
+    examples = ',\n'.join(
+        _example_day(day_number, position)
+        for position, day_number in enumerate(_example_day_numbers(first_day, last_day))
+    )
+
+    if strict_budget:
+        budget_rules += f"""
+- **이전 시도에서 예산을 초과했으므로, 이번에는 반드시 더 저렴한 옵션을 선택하세요**:
+  * 게스트하우스나 모텔 등 저렴한 숙소 선택 (호텔 피하기)
+  * 대중교통 이용 (택시 최소화, 가능하면 도보)
+  * 가성비 좋은 음식점 선택 (고급 레스토랑 피하기)
+  * 무료 관광지 우선 포함 (유료 입장료 최소화)
+  * 각 일차별 비용을 {daily_budget:,}원 이하로 유지"""
+
+    extra_rules = _extra_rules(fixed_accommodation, exclude_attractions)
+
+    return f"""
+{header}
+- 총 예산: {budget:,}원 (총 {people_count}명, 1인당 약 {budget_per_person:,}원)
+- 여행 인원: {people_count}명
+- 여행 기간: {start_date} ~ {end_date} ({days}일)
+- 출발지: {departure_location}
+- 여행 지역: {region}
+- 여행 스타일: {travel_style}
+- 숙박 타입: {accommodation_type}
+
+**{region} 지역의 실제 데이터베이스 정보를 활용하세요:**
+
+📍 추천 관광지 (이 중에서 선택하세요):
+{tourist_spots_str}
+
+🍽️ 추천 음식점 (이 중에서 선택하세요):
+{restaurants_str}
+
+🏨 추천 숙박시설 (이 중에서 선택하세요):
+{accommodations_str}
+
+🎉 해당 기간의 축제/행사:
+{festivals_str}
+
+각 일차별로 다음 정보를 **매우 구체적으로** 포함해주세요:
+
+1. **관광지 정보** (attractions):
+   - 위의 추천 관광지 목록에서 선택하여 사용하세요
+   - 각 관광지의 정확한 명칭, 방문 시간, 소요 시간, 간단한 설명 포함
+   - 이동 동선을 고려하여 효율적으로 배치하세요
+
+2. **교통수단 정보** (transportation_info):
+{departure_rules}
+
+3. **숙소 정보** (accommodation_info):
+   - {accommodation_type} 타입의 추천 숙소명 또는 숙소 지역
+   - 예상 숙박비
+   - 체크인/체크아웃 시간
+
+4. **식사 정보** (meals_info) - **필수 항목입니다**:
+   - 위의 추천 음식점 목록에서 선택하여 사용하세요
+   - **반드시 아침, 점심, 저녁 각각의 추천 식당명 또는 음식 종류를 포함하세요**
+   - 각 식사마다 예상 식사 비용을 포함하세요
+   - meals_info는 반드시 "아침", "점심", "저녁" 키를 가진 객체여야 합니다
+
+5. **축제/행사 정보** (events_info):
+   - 위에 나열된 축제/행사 정보가 있다면 일정에 포함하세요
+   - 축제명, 시간, 위치 등을 정확히 기재
+
+6. **예상 비용** (estimated_cost):
+   - 해당 일차의 총 예상 비용 (교통비 + 식비 + 입장료 + 숙박비 등)
+
+JSON 형식 (정확히 이 구조를 따라주세요):
+{days_rule}
+
+{{
+  "days": [
+{examples}
+  ]
+}}
+
+**중요: 모든 텍스트는 한글로 작성하세요**
+- transportation_info의 키: "오전", "오후", "저녁" 사용 (morning, afternoon, evening 사용 금지)
+- **meals_info는 반드시 포함되어야 하며, "아침", "점심", "저녁" 키를 모두 가져야 합니다** (breakfast, lunch, dinner 사용 금지)
+- 각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함하세요
+- 모든 설명과 내용은 한글로 작성
+- 시간 표기: "09:00", "15:00" 등 숫자는 그대로 사용
+- 장소명과 상호명은 데이터베이스에 있는 그대로 사용
+
+**예산 준수 규칙 (매우 중요)**:
+{budget_rules}
+
+**기타 중요 사항**:
+- 반드시 위에 제공된 실제 데이터베이스의 장소/음식점 목록에서 선택하여 사용하세요
+- 장소명은 데이터베이스의 정확한 명칭을 그대로 사용하세요
+- 모든 비용은 {people_count}명 전체를 기준으로 계산해주세요 (예: 숙박비는 {people_count}명이 함께 사용, 식비는 {people_count}명분)
+- 이동 동선이 효율적이도록 근처 장소들을 묶어서 계획해주세요
+- 축제/행사 정보가 있다면 일정에 우선적으로 포함하세요{extra_rules}
+- **각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함해야 합니다. 이는 선택 사항이 아닌 필수 항목입니다.**
+"""
+
+
+def build_modify_prompt(existing_days, requirements, budget, people_count, start_date, end_date,
+                        departure_location, region, travel_style, accommodation_type,
+                        tourist_spots_str, restaurants_str, accommodations_str, festivals_str,
+                        compact=False, include_example=True):
+    """
+    기존 여행 계획 수정 프롬프트
+
+    existing_days는 기존 일정의 일차별 데이터 목록입니다.
+    compact=True면 기존 일정을 공백 없는 JSON으로 넣고 중복 규칙을 뺀 축약 프롬프트를 만듭니다.
+    """
+    days = (end_date - start_date).days + 1
+    daily_budget = budget // days
+    budget_max = int(budget * 1.1)
+
+    if compact:
+        existing_json = json.dumps(existing_days, ensure_ascii=False, separators=(',', ':'))
+        example = f"\n\nJSON 형식:\n{_compact_example(1)}" if include_example else ''
+        return f"""다음 기존 여행 계획을 **최대한 유지하면서** 사용자 요구사항에 해당하는 부분만 수정해주세요.
+
+기존 계획: {existing_json}
+
+사용자 요구사항: {requirements}
+
+조건: {region} | {start_date}~{end_date} ({days}일) | {people_count}명, 예산 {budget:,}원 | 출발 {departure_location} | {travel_style} | 숙박 {accommodation_type}
+
+{_compact_candidates(tourist_spots_str, restaurants_str, accommodations_str, festivals_str)}
+
+수정 규칙:
+- 요구사항에 명시되지 않은 일차/항목은 기존 내용을 그대로 반환 (일정 순서와 흐름 유지)
+- **반드시 정확히 {days}일치 일정을 모두 반환하고, day_number는 기존과 동일하게 유지**
+- 총 비용은 {budget:,}원 이하 (최대 {budget_max:,}원)
+{_compact_common_rules(people_count)}{example}
+"""
+
+    existing_json = json.dumps(existing_days, ensure_ascii=False, indent=2)
+
+    return f"""
+다음은 기존 여행 계획입니다. **기존 계획을 최대한 유지하면서** 사용자의 요구사항에 맞게 **부분적으로만 수정**해주세요.
+
+**⚠️ 매우 중요: 기존 계획의 구조와 내용을 최대한 유지하세요. 요구사항에 명시되지 않은 부분은 그대로 유지해야 합니다.**
+
+**기존 여행 계획 (JSON 형식):**
+```json
+{existing_json}
+```
+
+**사용자 요구사항:**
+{requirements}
+
+**기본 여행 정보:**
+- 총 예산: {budget:,}원 (총 {people_count}명, 1인당 약 {budget // people_count:,}원)
+- 여행 인원: {people_count}명
+- 여행 기간: {start_date} ~ {end_date} ({days}일)
+- 출발지: {departure_location}
+- 여행 지역: {region}
+- 여행 스타일: {travel_style}
+- 숙박 타입: {accommodation_type}
+
+**{region} 지역의 실제 데이터베이스 정보를 활용하세요:**
+
+📍 추천 관광지 (이 중에서 선택하세요):
+{tourist_spots_str}
+
+🍽️ 추천 음식점 (이 중에서 선택하세요):
+{restaurants_str}
+
+🏨 추천 숙박시설 (이 중에서 선택하세요):
+{accommodations_str}
+
+🎉 해당 기간의 축제/행사:
+{festivals_str}
+
+**수정 지침 (매우 중요):**
+1. **기존 계획의 구조를 그대로 유지하세요** - day_number, 일정 순서, 전체적인 흐름은 변경하지 마세요
+2. **요구사항에 명시된 부분만 수정하세요** - 예를 들어 "2일차 저녁 식사"만 언급되었다면, 2일차 저녁 식사만 변경하고 나머지는 그대로 유지
+3. **요구사항에 해당하지 않는 일정은 기존 내용을 그대로 반환하세요**
+4. 예산은 {budget:,}원을 초과하지 않도록 주의하세요 (최대 {budget_max:,}원)
+5. **반드시 {days}일치 일정을 모두 반환해야 하며, 각 일정의 day_number는 기존과 동일해야 합니다**
+6. 각 일차마다 meals_info에 아침, 점심, 저녁 식사 정보를 반드시 포함하세요
+7. **기존 계획에서 좋은 부분(요구사항과 무관한 부분)은 절대 변경하지 마세요**
+
+JSON 형식 (정확히 이 구조를 따라주세요):
+{{
+  "days": [
+    {{
+      "day_number": 1,
+      "description": "수정된 일정 전체 요약",
+      "attractions": [
+        {{
+          "name": "관광지명",
+          "time": "09:00",
+          "duration": "2시간",
+          "description": "관광지 설명"
+        }}
+      ],
+      "transportation_info": {{
+        "오전": "교통수단 및 비용",
+        "오후": "교통수단 및 비용",
+        "저녁": "교통수단 및 비용"
+      }},
+      "accommodation_info": {{
+        "name": "숙소명",
+        "cost": 80000,
+        "check_in": "15:00",
+        "check_out": "11:00"
+      }},
+      "meals_info": {{
+        "아침": {{
+          "restaurant": "식당명 또는 음식 종류",
+          "cost": 10000
+        }},
+        "점심": {{
+          "restaurant": "식당명 또는 음식 종류",
+          "cost": 15000
+        }},
+        "저녁": {{
+          "restaurant": "식당명 또는 음식 종류",
+          "cost": 20000
+        }}
+      }},
+      "events_info": [],
+      "estimated_cost": {daily_budget}
+    }}{f''',
+    {{
+      "day_number": {days},
+      "description": "수정된 {days}일차 일정 요약",
+      "attractions": [...],
+      "transportation_info": {{...}},
+      "accommodation_info": {{...}},
+      "meals_info": {{...}},
+      "events_info": [],
+      "estimated_cost": {daily_budget}
+    }}''' if days > 1 else ''}
+  ]
+}}
+
+**중요:**
+- 모든 텍스트는 한글로 작성하세요
+- transportation_info의 키: "오전", "오후", "저녁" 사용
+- meals_info는 반드시 "아침", "점심", "저녁" 키를 모두 가져야 합니다
+- 사용자 요구사항을 반드시 반영하세요
+- 예산을 준수하세요
+"""
@@ -0,0 +1,204 @@
+import math
+import re
+
+from django.conf import settings
+
+
+# 후보 목록별 짧은 ID 접두사 (관광지, 음식점, 숙박시설, 축제/행사)
+ID_PREFIXES = {
+    'tourist_spots': 'T',
+    'restaurants': 'R',
+    'accommodations': 'A',
+    'festivals': 'F',
+}
+
+# 프롬프트가 최대 토큰 수를 넘을 때 후보 목록을 줄여 볼 비율 (순서대로 시도)
+CANDIDATE_SCALES = [1.0, 0.75, 0.5, 0.3]
+
+EMPTY_PLACES = '해당 지역의 데이터가 없습니다.'
+EMPTY_FESTIVALS = '해당 기간에 축제/행사가 없습니다.'
+
+_HANGUL = re.compile('[\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3]')
+# 응답에 장소명 대신 쓰인 짧은 ID (예: "T3", "[R2] 식당명")
+_ID_REFERENCE = re.compile(r'^\s*\[?([TRAF]\d+)\]?(?![\w])')
+
+
+def estimate_tokens(text):
+    """
+    입력 토큰 수 추정
+
+    Gemini 토크나이저 기준 한글은 약 1.5자, 그 외 문자는 약 4자당 1토큰으로 계산합니다.
+    (실제 토큰 수는 응답의 usageMetadata로 확인)
+    """
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return math.ceil(hangul / 1.5 + (len(text) - hangul) / 4)
+
+
+def prompt_token_limit(operation):
+    """작업별 최대 입력 토큰 수 (설정이 없으면 None - 제한 없음)"""
+    return settings.GEMINI_PROMPT_MAX_TOKENS.get(operation)
+
+
+def _common_address_prefix(addresses):
+    """
+    주소들의 공통 앞부분 (공백 단위, 예: "제주특별자치도 서귀포시")
+
+    후보가 2개 이상일 때만 사용하며, 주소 전체가 같은 경우에도 마지막 단어는 각 항목에 남깁니다.
+    """
+    split = [address.split() for address in addresses if address]
+    if len(split) < 2 or len(split) != len(addresses):
+        return ''
+    prefix = []
+    for parts in zip(*split):
+        if len(set(parts)) != 1:
+            break
+        prefix.append(parts[0])
+    shortest = min(len(parts) for parts in split)
+    return ' '.join(prefix[:shortest - 1])
+
+
+class PlaceCatalog:
+    """
+    프롬프트에 넣을 지역 후보(장소/축제) 목록
+
+    compact=True면 후보마다 짧은 ID(T1, R1, A1, F1)를 붙이고, 공통 주소 앞부분은
+    목록마다 한 번만 표기하여 프롬프트를 줄입니다. compact=False면 기존 형식
+    ("- 이름 (분류): 주소") 그대로 출력합니다.
+    응답에 장소명 대신 ID가 쓰인 경우 expand_ids로 원래 이름으로 되돌립니다.
+    """
+
+    def __init__(self, tourist_spots, restaurants, accommodations, festivals, compact=False):
+        self.compact = compact
+        self.items = {
+            'tourist_spots': list(tourist_spots),
+            'restaurants': list(restaurants),
+            'accommodations': list(accommodations),
+            'festivals': list(festivals),
+        }
+        self.names = {}  # 짧은 ID -> 이름
+        self._ids = {}  # (목록, pk) -> 짧은 ID
+        for kind, items in self.items.items():
+            for number, item in enumerate(items, 1):
+                short_id = f'{ID_PREFIXES[kind]}{number}'
+                self.names[short_id] = item.title
+                self._ids[(kind, item.pk)] = short_id
+
+    @property
+    def tourist_spots(self):
+        return self.items['tourist_spots']
+
+    @property
+    def accommodations(self):
+        return self.items['accommodations']
+
+    def format_places(self, places, kind='tourist_spots'):
+        """장소 목록을 프롬프트용 문자열로 포맷"""
+        if not places:
+            return EMPTY_PLACES
+
+        if not self.compact:
+            formatted = []
+            for place in places:
+                category = f" ({place.category})" if place.category else ""
+                formatted.append(f"- {place.title}{category}: {place.address}")
+            return "\n".join(formatted)
+
+        prefix = _common_address_prefix([place.address for place in places])
+        formatted = [f"(공통 주소: {prefix})"] if prefix else []
+        for place in places:
+            address = place.address[len(prefix):].strip() if prefix else place.address
+            category = f" [{place.category}]" if place.category else ""
+            formatted.append(f"{self._ids[(kind, place.pk)]} {place.title}{category} {address}".rstrip())
+        return "\n".join(formatted)
+
+    def format_festivals(self, festivals):
+        """축제 목록을 프롬프트용 문자열로 포맷"""
+        if not festivals:
+            return EMPTY_FESTIVALS
+
+        if not self.compact:
+            formatted = []
+            for festival in festivals:
+                period = f"{festival.event_start_date} ~ {festival.event_end_date}" if festival.event_start_date else "날짜 미정"
+                formatted.append(f"- {festival.title} ({festival.category}): {period} @ {festival.address}")
+            return "\n".join(formatted)
+
+        formatted = []
+        for festival in festivals:
+            period = f"{festival.event_start_date}~{festival.event_end_date}" if festival.event_start_date else "날짜 미정"
+            formatted.append(f"{self._ids[('festivals', festival.pk)]} {festival.title} {period} {festival.address}".rstrip())
+        return "\n".join(formatted)
+
+    @staticmethod
+    def head(items, scale):
+        """목록의 앞쪽 후보만 scale 비율만큼 (최소 1개)"""
+        return items[:max(1, math.ceil(len(items) * scale))] if items else items
+
+    def prompt_strings(self, scale=1.0):
+        """
+        프롬프트 인자용 후보 문자열 (tourist_spots_str 등)
+
+        scale이 1보다 작으면 목록마다 앞쪽 후보만 그 비율만큼 (최소 1개) 사용합니다.
+        """
+        return {
+            'tourist_spots_str': self.format_places(self.head(self.items['tourist_spots'], scale), 'tourist_spots'),
+            'restaurants_str': self.format_places(self.head(self.items['restaurants'], scale), 'restaurants'),
+            'accommodations_str': self.format_places(self.head(self.items['accommodations'], scale), 'accommodations'),
+            'festivals_str': self.format_festivals(self.head(self.items['festivals'], scale)),
+        }
+
+    def _expand(self, value):
+        if not isinstance(value, str):
+            return value
+        match = _ID_REFERENCE.match(value)
+        if not match or match.group(1) not in self.names:
+            return value
+        rest = value[match.end():].strip(' :-.)')
+        return rest or self.names[match.group(1)]
+
+    def expand_ids(self, itinerary_data):
+        """응답에서 장소명 자리에 쓰인 짧은 ID를 원래 이름으로 변환 (itinerary_data를 직접 수정)"""
+        if not self.compact or not isinstance(itinerary_data, dict):
+            return itinerary_data
+
+        for day in itinerary_data.get('days') or []:
+            if not isinstance(day, dict):
+                continue
+            for attraction in day.get('attractions') or []:
+                if isinstance(attraction, dict):
+                    attraction['name'] = self._expand(attraction.get('name'))
+            accommodation_info = day.get('accommodation_info')
+            if isinstance(accommodation_info, dict) and 'name' in accommodation_info:
+                accommodation_info['name'] = self._expand(accommodation_info['name'])
+            meals_info = day.get('meals_info')
+            if isinstance(meals_info, dict):
+                for meal in meals_info.values():
+                    if isinstance(meal, dict) and 'restaurant' in meal:
+                        meal['restaurant'] = self._expand(meal['restaurant'])
+            for event in day.get('events_info') or []:
+                if isinstance(event, dict) and 'name' in event:
+                    event['name'] = self._expand(event['name'])
+        return itinerary_data
+
+
+def fit_prompt(operation, render):
+    """
+    작업별 최대 입력 토큰 수에 맞는 프롬프트 생성
+
+    render(scale)로 만든 프롬프트가 GEMINI_PROMPT_MAX_TOKENS를 넘으면 후보 목록 비율을
+    줄여 다시 생성하고, (프롬프트, 추정 토큰 수, 사용한 비율)을 반환합니다.
+    가장 작은 비율로도 넘으면 경고만 출력하고 그대로 사용합니다.
+    """
+    limit = prompt_token_limit(operation)
+    for scale in CANDIDATE_SCALES:
+        prompt = render(scale)
+        tokens = estimate_tokens(prompt)
+        if not limit or tokens <= limit:
+            if scale < 1:
+                print(f'✓ {operation} 프롬프트 후보 목록 축소 ({int(scale * 100)}%): 약 {tokens} 토큰 / 최대 {limit}')
+            return prompt, tokens, scale
+
+    print(f'⚠️ {operation} 프롬프트가 최대 토큰 수를 초과합니다: 약 {tokens} 토큰 / 최대 {limit}')
+    return prompt, tokens, scale
@@ -0,0 +1,50 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ai import metrics
+from ai.gemini_service import GeminiService
+from ai.hedging import hedged_call
+
+
+class HedgedCallTest(SimpleTestCase):
+    """헤지 요청에서 결과를 쓰지 않은 쪽의 응답도 집계"""
+
+    def test_losing_response_is_reported(self):
+        release = threading.Event()
+        reported = threading.Event()
+        responses = iter(['slow', 'fast'])
+        discarded = []
+
+        def fn():
+            response = next(responses)
+            if response == 'slow':
+                release.wait(2)
+            return response
+
+        def on_discarded(result):
+            discarded.append(result)
+            reported.set()
+
+        result, hedged, hedge_won = hedged_call(fn, 0.05, 2, on_discarded=on_discarded)
+        self.assertEqual((result, hedged, hedge_won), ('fast', True, True))
+
+        release.set()
+        self.assertTrue(reported.wait(2))
+        self.assertEqual(discarded, ['slow'])
+
+    def test_late_calls_are_added_to_usage(self):
+        service = GeminiService(structured_output=False)
+        user = object()
+        first = metrics.new_call_record('generate', '프롬프트')
+        late = metrics.new_call_record('generate', '프롬프트')
+        with mock.patch('ai.gemini_service.LLMUsage.record') as record, mock.patch.object(metrics.registry, 'record'):
+            service._finish_call(first, metrics.OUTCOME_PARSED)
+            service.record_usage(user, 'generate')
+            service._finish_call(late, metrics.OUTCOME_DISCARDED)
+
+        self.assertEqual(record.call_args_list, [
+            mock.call(user, 'generate', [first]),
+            mock.call(user, 'generate', [late], requests=0),
+        ])
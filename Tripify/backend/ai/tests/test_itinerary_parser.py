@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ai.gemini_service import GeminiService
+from ai.itinerary_parser import extract_json_text, parse_itinerary_text, repair_json_text, salvage_itinerary
+
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+# 손상된 Gemini 응답 -> (복구되는 day_number, 전체 복구 여부)
+EXPECTED = {
+    'truncated.txt': ([1, 2], False),
+    'trailing_commas.txt': ([1, 2], True),
+    'comments.txt': ([1, 2], True),
+    'raw_newlines.txt': ([1], True),
+    'missing_day_number.txt': ([1, 2], True),
+}
+
+
+def _day(day_number):
+    return {'day_number': day_number, 'attractions': [], 'meals_info': {}, 'estimated_cost': 0}
+
+
+def _fixture(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+class BrokenResponseTest(SimpleTestCase):
+    """손상된 응답 복구 회귀 테스트 (fixtures/의 응답 코퍼스)"""
+
+    def test_fixtures_do_not_parse_as_is(self):
+        for name in EXPECTED:
+            with self.subTest(name=name), self.assertRaises(json.JSONDecodeError):
+                parse_itinerary_text(_fixture(name))
+
+    def test_salvage_itinerary(self):
+        for name, (day_numbers, complete) in EXPECTED.items():
+            with self.subTest(name=name):
+                data, recovered_all = salvage_itinerary(_fixture(name))
+                self.assertEqual([day['day_number'] for day in data['days']], day_numbers)
+                self.assertEqual(recovered_all, complete)
+
+    def test_repair_json_text(self):
+        for name, (_, complete) in EXPECTED.items():
+            if not complete:
+                continue  # 잘린 응답은 보정만으로는 파싱되지 않음
+            with self.subTest(name=name):
+                data = json.loads(repair_json_text(extract_json_text(_fixture(name))))
+                self.assertIsInstance(data['days'], list)
+
+    def test_repair_keeps_string_contents(self):
+        data = json.loads(repair_json_text(extract_json_text(_fixture('raw_newlines.txt'))))
+        day = data['days'][0]
+        self.assertEqual(day['description'], '전주 한옥마을\n오후에는 "객사길" 카페 거리 산책')
+        self.assertEqual(day['attractions'][0]['description'], '한복 체험\t추천')
+
+        data = json.loads(repair_json_text(_fixture('comments.txt')))
+        self.assertIn('https://example.com/map', data['days'][1]['attractions'][0]['description'])
+
+    def test_service_salvage(self):
+        service = GeminiService(structured_output=False)
+        for name, (day_numbers, _) in EXPECTED.items():
+            with self.subTest(name=name):
+                data = service._salvage(_fixture(name), days=3)
+                self.assertEqual([day['day_number'] for day in data['days']], day_numbers)
+
+    def test_service_salvage_drops_out_of_range_days(self):
+        data = GeminiService(structured_output=False)._salvage(_fixture('truncated.txt'), days=1)
+        self.assertEqual([day['day_number'] for day in data['days']], [1])
+
+    def test_fill_missing_days_normalizes_day_numbers(self):
+        service = GeminiService(structured_output=False)
+        data = {'days': [_day('2'), _day(1), _day('x'), _day(2.0), _day(5), 'day']}
+        with mock.patch.object(GeminiService, '_call_gemini') as call_gemini:
+            service._fill_missing_days(data, 2, {})
+        call_gemini.assert_not_called()
+        self.assertEqual([day['day_number'] for day in data['days']], [1, 2])
+
+    def test_fill_missing_days_regenerates_invalid_days(self):
+        service = GeminiService(structured_output=False)
+        data = {'days': [_day(1), dict(_day(2), attractions='경복궁'), {'day_number': 3}]}
+        response = json.dumps({'days': [_day(2), dict(_day(3), estimated_cost='많음')]})
+        with mock.patch.object(GeminiService, '_call_gemini', return_value=(response, {})) as call_gemini, \
+                mock.patch.object(GeminiService, '_finish_call'), \
+                mock.patch('ai.gemini_service.build_itinerary_prompt', return_value=''):
+            service._fill_missing_days(data, 3, {})
+        self.assertEqual(call_gemini.call_count, 1)
+        # 다시 생성한 일차도 검증에 실패하면 채우지 않음
+        self.assertEqual([day['day_number'] for day in data['days']], [1, 2])
+        self.assertEqual(data['days'][1]['attractions'], [])
@@ -0,0 +1,23 @@
+from django.test import TestCase
+
+from ai.models import TripTemplate
+from ai.trip_templates import find_template
+
+
+class FindTemplateTest(TestCase):
+    """템플릿 검색 조건 (숙박 타입/예산 수준)"""
+
+    def setUp(self):
+        TripTemplate.objects.create(
+            region='부산광역시', travel_style='관광', days=2, accommodation_type='guesthouse',
+            budget=400000, people_count=2, departure_location='서울', itinerary={'days': []},
+        )
+
+    def test_matches_same_accommodation_type(self):
+        self.assertIsNotNone(find_template('부산광역시', '관광', 2, 'guesthouse', 500000, 2))
+
+    def test_other_accommodation_type_falls_through(self):
+        self.assertIsNone(find_template('부산광역시', '관광', 2, 'hotel', 500000, 2))
+
+    def test_budget_out_of_range(self):
+        self.assertIsNone(find_template('부산광역시', '관광', 2, 'guesthouse', 10000000, 2))
@@ -0,0 +1,121 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .models import LLMUsage
+
+
+# 같은 프로세스 안에서 버킷 읽기/쓰기를 원자적으로 처리
+_bucket_lock = threading.Lock()
+# 여러 작업자 프로세스 사이의 버킷 잠금 (cache.add는 공유 캐시 백엔드에서 원자적)
+_CACHE_LOCK_KEY = 'llm-bucket:lock'
+_CACHE_LOCK_SECONDS = 5  # 잠금을 잡은 프로세스가 죽어도 이 시간 뒤 해제
+_CACHE_LOCK_WAIT_SECONDS = 1
+
+
+@contextmanager
+def _bucket_guard():
+    """
+    버킷 읽기-수정-쓰기 구간 잠금
+
+    스레드 잠금은 같은 프로세스 안에서만 유효하므로 공유 캐시(Redis/Memcached/DB)를 쓰는 여러 작업자는
+    cache.add 잠금으로 직렬화합니다. LocMemCache(기본값)는 캐시 자체가 프로세스별이라
+    버킷도 작업자 프로세스마다 따로 계산됩니다. (전체 한도를 서버 전체에 적용하려면 공유 캐시 사용)
+    잠금을 기다리다 시간이 지나면 요청을 막지 않고 잠금 없이 진행합니다.
+    """
+    with _bucket_lock:
+        deadline = time.monotonic() + _CACHE_LOCK_WAIT_SECONDS
+        acquired = cache.add(_CACHE_LOCK_KEY, 1, timeout=_CACHE_LOCK_SECONDS)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.01)
+            acquired = cache.add(_CACHE_LOCK_KEY, 1, timeout=_CACHE_LOCK_SECONDS)
+        if not acquired:
+            print('⚠️ LLM 요청 제한 버킷 잠금 대기 시간 초과 - 잠금 없이 진행')
+        try:
+            yield
+        finally:
+            if acquired:
+                cache.delete(_CACHE_LOCK_KEY)
+
+
+def _refill(key, capacity, refill_per_hour, now):
+    """버킷의 현재 토큰 수 계산 (마지막 갱신 이후 경과 시간만큼 충전)"""
+    tokens, updated = cache.get(key, (capacity, now))
+    return min(capacity, tokens + (now - updated) * refill_per_hour / 3600)
+
+
+def _wait_seconds(tokens, refill_per_hour):
+    """토큰 1개가 충전될 때까지 남은 시간 (초)"""
+    return max(1, int((1 - tokens) * 3600 / refill_per_hour) + 1)
+
+
+def _bucket_enabled(capacity, refill_per_hour):
+    """용량이나 시간당 충전량이 0 이하면 해당 버킷은 사용하지 않음 (일일 한도의 0처럼 무제한)"""
+    return capacity > 0 and refill_per_hour > 0
+
+
+def _seconds_until_tomorrow():
+    now = timezone.localtime()
+    tomorrow = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), dt_time.min))
+    return int((tomorrow - now).total_seconds()) + 1
+
+
+class LLMRateThrottle(BaseThrottle):
+    """
+    LLM 엔드포인트(여행 계획 생성/수정) 요청 제한
+
+    1. 사용자별 일일 한도 (LLMUsage 집계의 Gemini 호출 수/토큰)
+    2. 사용자별 토큰 버킷 (짧은 시간 연속 요청 제한)
+    3. 전체 토큰 버킷 (서비스 전체 호출량 제한)
+    하나라도 초과하면 프롬프트를 만들기 전에 429 + Retry-After로 응답합니다.
+    버킷은 두 단계 모두 토큰이 있을 때만 차감합니다. 용량/충전량이 0인 버킷은 사용하지 않습니다.
+    Gemini를 호출하지 않는 요청(Idempotency-Key 재요청, 검증 오류, 템플릿/추천 계획 재사용, 503)은 제한하지 않도록
+    뷰의 throttle_classes가 아니라 Gemini 호출 직전에 확인합니다. (trips/views.py의 _charge_llm)
+    """
+
+    def allow_request(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return True
+
+        daily_calls, daily_tokens = LLMUsage.today_totals(user)
+        call_limit = settings.LLM_USER_DAILY_CALL_LIMIT
+        token_limit = settings.LLM_USER_DAILY_TOKEN_LIMIT
+        if (call_limit and daily_calls >= call_limit) or (token_limit and daily_tokens >= token_limit):
+            raise Throttled(
+                wait=_seconds_until_tomorrow(),
+                detail='오늘 AI 여행 계획 사용량을 모두 사용했습니다. 내일 다시 시도해주세요.',
+            )
+
+        user_key = f'llm-bucket:user:{user.pk}'
+        global_key = 'llm-bucket:global'
+        user_capacity, user_rate = settings.LLM_USER_BUCKET_CAPACITY, settings.LLM_USER_REFILL_PER_HOUR
+        global_capacity, global_rate = settings.LLM_GLOBAL_BUCKET_CAPACITY, settings.LLM_GLOBAL_REFILL_PER_HOUR
+
+        buckets = [
+            (user_key, user_capacity, user_rate, 'AI 여행 계획 요청이 너무 잦습니다. 잠시 후 다시 시도해주세요.'),
+            (global_key, global_capacity, global_rate, '현재 AI 요청이 많습니다. 잠시 후 다시 시도해주세요.'),
+        ]
+        buckets = [bucket for bucket in buckets if _bucket_enabled(bucket[1], bucket[2])]
+        if not buckets:
+            return True
+
+        with _bucket_guard():
+            now = time.time()
+            remaining = []
+            for key, capacity, rate, detail in buckets:
+                tokens = _refill(key, capacity, rate, now)
+                if tokens < 1:
+                    raise Throttled(wait=_wait_seconds(tokens, rate), detail=detail)
+                remaining.append(tokens)
+            # 버킷 상태는 가득 찰 때까지 걸리는 시간 동안만 보관
+            for (key, capacity, rate, _), tokens in zip(buckets, remaining):
+                cache.set(key, (tokens - 1, now), timeout=int(capacity * 3600 / rate) + 60)
+        return True
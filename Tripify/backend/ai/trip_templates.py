@@ -0,0 +1,89 @@
+import copy
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import TripTemplate
+
+
+def _scale(cost, ratio):
+    """비용을 비율만큼 조정 (100원 단위 반올림)"""
+    if not isinstance(cost, (int, float)) or isinstance(cost, bool):
+        return cost
+    return int(round(cost * ratio, -2))
+
+
+def find_template(region, travel_style, days, accommodation_type, budget, people_count):
+    """
+    요청과 같은 조합의 템플릿 검색 (없으면 None)
+
+    지역/여행 스타일/일수/숙박 타입이 모두 같고 1인당 예산 수준이 허용 범위
+    (TRIP_TEMPLATE_MAX_BUDGET_RATIO배 이내)인 템플릿만 사용합니다.
+    숙박 타입이 다른 템플릿은 숙소/비용이 요청과 달라지므로 사용하지 않습니다 (없으면 Gemini로 생성).
+    """
+    template = TripTemplate.objects.filter(
+        region=region, travel_style=travel_style, days=days, accommodation_type=accommodation_type
+    ).first()
+    if template is None:
+        return None
+
+    max_ratio = settings.TRIP_TEMPLATE_MAX_BUDGET_RATIO
+    level = (budget / people_count) / (template.budget / template.people_count)
+    if not 1 / max_ratio <= level <= max_ratio:
+        return None
+    return template
+
+
+def adapt_itinerary(itinerary_data, budget_ratio, from_departure, to_departure):
+    """
+    기존 일정을 다른 조건에 맞게 변환한 복사본 반환
+
+    - 모든 비용(일차별 예상 비용, 숙박비, 식비)을 예산 비율만큼 조정
+    - 첫날 교통 정보의 출발지를 요청한 출발지로 변경
+    - 축제/행사는 날짜에 따라 달라지므로 제외
+    (날짜는 일정 데이터에 없고 저장 시 day_number로 계산되므로 별도 변환 불필요)
+    """
+    itinerary_data = copy.deepcopy(itinerary_data)
+
+    for day in itinerary_data.get('days', []):
+        day['estimated_cost'] = _scale(day.get('estimated_cost'), budget_ratio)
+
+        accommodation_info = day.get('accommodation_info')
+        if isinstance(accommodation_info, dict):
+            accommodation_info['cost'] = _scale(accommodation_info.get('cost'), budget_ratio)
+
+        meals_info = day.get('meals_info')
+        if isinstance(meals_info, dict):
+            for meal in meals_info.values():
+                if isinstance(meal, dict):
+                    meal['cost'] = _scale(meal.get('cost'), budget_ratio)
+
+        transportation_info = day.get('transportation_info')
+        if day.get('day_number') == 1 and isinstance(transportation_info, dict) and from_departure:
+            for key, value in transportation_info.items():
+                if isinstance(value, str):
+                    transportation_info[key] = value.replace(from_departure, to_departure)
+
+        day['events_info'] = []
+
+    return itinerary_data
+
+
+def adapt_template(template, budget, departure_location):
+    """템플릿 일정을 요청 예산/출발지에 맞게 변환 (사용 횟수 증가)"""
+    itinerary_data = adapt_itinerary(
+        template.itinerary, budget / template.budget, template.departure_location, departure_location
+    )
+    TripTemplate.objects.filter(pk=template.pk).update(use_count=F('use_count') + 1)
+    return itinerary_data
+
+
+def template_itinerary(region, travel_style, days, accommodation_type, budget, people_count, departure_location):
+    """요청과 같은 조합의 템플릿이 있으면 변환한 일정, 없거나 템플릿을 사용하지 않으면 None (Gemini 호출 없음)"""
+    if not settings.TRIP_TEMPLATES_ENABLED:
+        return None
+    template = find_template(region, travel_style, days, accommodation_type, budget, people_count)
+    if template is None:
+        return None
+    print(f'✓ 템플릿 사용: {template}')
+    return adapt_template(template, budget, departure_location)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'ai'
+
+urlpatterns = [
+    path('metrics/', views.llm_metrics, name='llm-metrics'),
+]
@@ -0,0 +1,35 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from . import metrics
+from .hedging import inflight_hedges
+from .concurrency import limiter
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def llm_metrics(request):
+    """LLM 호출 통계 API (관리자 전용)"""
+    # DELETE 요청: 통계 초기화
+    if request.method == 'DELETE':
+        metrics.registry.reset()
+        limiter.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    data = metrics.registry.summary()
+    data['inflight_hedges'] = inflight_hedges()
+    data['admission'] = limiter.stats()
+
+    # ?recent=N 이면 최근 호출 기록 포함
+    recent = request.query_params.get('recent')
+    if recent:
+        try:
+            limit = max(1, min(int(recent), 500))
+        except ValueError:
+            return Response({
+                'error': 'recent는 숫자여야 합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        data['recent'] = metrics.registry.recent(limit)
+
+    return Response(data, status=status.HTTP_200_OK)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
+from utils.catalog_db import catalog_database
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -87,13 +89,39 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite 튜닝 (연결마다 PRAGMA 적용 - utils/sqlite_tuning.py)
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')  # WAL: 읽기와 쓰기가 서로 막지 않음
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # WAL에서는 NORMAL도 손상 없음 (전원 차단 시 마지막 커밋만 잃을 수 있음)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))  # 잠금 대기 시간
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # 메모리 매핑으로 읽을 최대 크기
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))  # 연결별 페이지 캐시
+# 연결 재사용 (요청마다 새로 연결하지 않음, 0이면 요청마다 연결), 재사용 전 연결 상태 확인
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # 쓰기 트랜잭션이 시작할 때 잠금을 잡음 (읽다가 쓰기로 바꿀 때 busy_timeout 없이 바로 실패하는 "database is locked" 방지)
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# 카탈로그 DB 분리 (장소/축제를 별도 SQLite 파일에 두어 대량 적재가 사용자 DB 쓰기를 막지 않도록, 비우면 db.sqlite3 하나 사용)
+# 새로 만들 때: python manage.py migrate --database=catalog 후 load_catalog_snapshot 또는 load_places/load_festivals
+CATALOG_DB_PATH = os.getenv('CATALOG_DB_PATH', '')
+# 서비스 프로세스에서 카탈로그 DB를 읽기 전용(immutable)으로 열기 (카카오 장소 저장 불가, 인기도 카운터는 reload_catalog에서 재계산)
+CATALOG_DB_READONLY = os.getenv('CATALOG_DB_READONLY', 'False').lower() in ('true', '1', 'yes')
+if CATALOG_DB_PATH:
+    DATABASES['catalog'] = {
+        **catalog_database(CATALOG_DB_PATH, readonly=CATALOG_DB_READONLY),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+DATABASE_ROUTERS = ['utils.catalog_db.CatalogRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -185,3 +213,117 @@ PASSWORD_RESET_TIMEOUT = 3600  # 비밀번호 재설정 토큰 유효 시간 (1
 
 # Frontend URL for email links
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
+
+# Gemini (SSAFY GMS) 비용 계산용 단가 (USD / 1M 토큰, gemini-2.5-flash-lite 기준)
+GEMINI_INPUT_COST_PER_1M_TOKENS = float(os.getenv('GEMINI_INPUT_COST_PER_1M_TOKENS', '0.10'))
+GEMINI_OUTPUT_COST_PER_1M_TOKENS = float(os.getenv('GEMINI_OUTPUT_COST_PER_1M_TOKENS', '0.40'))
+
+# Gemini 구조화 출력 (responseMimeType=application/json + responseSchema) 사용 여부
+GEMINI_STRUCTURED_OUTPUT = os.getenv('GEMINI_STRUCTURED_OUTPUT', 'False').lower() in ('true', '1', 'yes')
+
+# 긴 여행 구간 병렬 생성 설정
+GEMINI_CHUNK_MIN_DAYS = int(os.getenv('GEMINI_CHUNK_MIN_DAYS', '7'))  # 이 일수 이상이면 구간으로 나눠 생성
+GEMINI_CHUNK_DAYS = int(os.getenv('GEMINI_CHUNK_DAYS', '3'))  # 구간당 최대 일수
+GEMINI_MAX_PARALLEL_CHUNKS = int(os.getenv('GEMINI_MAX_PARALLEL_CHUNKS', '4'))  # 동시 생성 구간 수
+GEMINI_CHUNK_BUDGET_RETRIES = int(os.getenv('GEMINI_CHUNK_BUDGET_RETRIES', '2'))  # 구간 예산 초과 시 재요청 횟수
+
+# Gemini 엔드포인트 (로컬 스텁 서버로 테스트할 때 변경: python manage.py gemini_stub)
+GEMINI_BASE_URL = os.getenv(
+    'GEMINI_BASE_URL',
+    'https://gms.ssafy.io/gmsapi/generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-lite:generateContent'
+)
+
+# 적응형 타임아웃 (최근 지연시간 p99 기반, 호출별 기본 타임아웃이 상한)
+GEMINI_ADAPTIVE_TIMEOUT = os.getenv('GEMINI_ADAPTIVE_TIMEOUT', 'True').lower() in ('true', '1', 'yes')
+GEMINI_ADAPTIVE_MIN_SAMPLES = int(os.getenv('GEMINI_ADAPTIVE_MIN_SAMPLES', '20'))  # 적용에 필요한 최소 표본 수
+GEMINI_TIMEOUT_P99_MULTIPLIER = float(os.getenv('GEMINI_TIMEOUT_P99_MULTIPLIER', '2.0'))  # 타임아웃 = p99 x 배수
+GEMINI_TIMEOUT_MIN_SECONDS = float(os.getenv('GEMINI_TIMEOUT_MIN_SECONDS', '5'))  # 타임아웃 하한
+
+# 헤지 요청 (p95를 넘기면 같은 요청을 한 번 더 보내 먼저 끝난 응답 사용)
+GEMINI_HEDGE_ENABLED = os.getenv('GEMINI_HEDGE_ENABLED', 'False').lower() in ('true', '1', 'yes')
+GEMINI_HEDGE_PERCENTILE = float(os.getenv('GEMINI_HEDGE_PERCENTILE', '95'))
+GEMINI_MAX_INFLIGHT_HEDGES = int(os.getenv('GEMINI_MAX_INFLIGHT_HEDGES', '4'))  # 프로세스 전체 동시 헤지 상한
+GEMINI_HTTP_POOL_SIZE = int(os.getenv('GEMINI_HTTP_POOL_SIZE', '32'))  # Gemini 호출 스레드 수
+
+# 프롬프트 축약 (후보 짧은 ID, 공통 주소 앞부분 한 번만 표기, 중복 규칙 제거)
+GEMINI_COMPACT_PROMPT = os.getenv('GEMINI_COMPACT_PROMPT', 'True').lower() in ('true', '1', 'yes')
+# 작업별 최대 입력 토큰 수 (추정치, 넘으면 후보 목록을 줄임) - "작업=토큰,..." 형식
+# (누락 일차/재생성 요청은 generate에서 정한 후보 목록을 그대로 사용, 구간 요청도 generate 한도에 맞춤)
+GEMINI_PROMPT_MAX_TOKENS = {
+    operation.strip(): int(limit)
+    for operation, limit in (
+        item.split('=') for item in os.getenv(
+            'GEMINI_PROMPT_MAX_TOKENS',
+            'generate=2500,modify=6000',
+        ).split(',') if item.strip()
+    )
+}
+
+# 프롬프트 후보 장소 선택 (여행 스타일 일치도 + 인기도 + 위치 분산, 지역별 후보 특성 캐시 시간)
+PLACE_RANKING_ENABLED = os.getenv('PLACE_RANKING_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PLACE_RANK_CACHE_SECONDS = int(os.getenv('PLACE_RANK_CACHE_SECONDS', '3600'))
+
+# 생성된 일정 항목 -> 장소 매칭 (이름 유사도 기준 점수 0~1, 지역별 이름 인덱스 캐시 시간)
+PLACE_RESOLVER_MIN_SCORE = float(os.getenv('PLACE_RESOLVER_MIN_SCORE', '0.7'))
+PLACE_RESOLVER_CACHE_SECONDS = int(os.getenv('PLACE_RESOLVER_CACHE_SECONDS', '3600'))
+
+# 장소/축제 이름 자동완성 (데이터 변경 확인 주기, 변경 시 인덱스 재구성)
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', '60'))
+
+# 지도 영역 조회 (/api/places/map/ - 줌 레벨별 격자 클러스터, 타일 단위 캐시)
+MAP_CLUSTER_MAX_ZOOM = int(os.getenv('MAP_CLUSTER_MAX_ZOOM', '13'))  # 이 줌까지 클러스터, 더 확대하면 개별 장소
+MAP_MAX_PLACES_PER_TILE = int(os.getenv('MAP_MAX_PLACES_PER_TILE', '300'))  # 개별 장소 타일당 최대 수 (인기순)
+MAP_MAX_TILES = int(os.getenv('MAP_MAX_TILES', '64'))  # 요청 한 번에 조회할 수 있는 타일 수
+MAP_TILE_CACHE_SECONDS = int(os.getenv('MAP_TILE_CACHE_SECONDS', '600'))
+MAP_INDEX_REFRESH_SECONDS = int(os.getenv('MAP_INDEX_REFRESH_SECONDS', '60'))  # 데이터 변경 확인 주기
+
+# 공유 카탈로그 파일 (build_place_catalog로 만든 장소/축제 고정 폭 파일 - 작업자 프로세스들이 mmap으로 함께 사용, 비우면 사용 안 함)
+PLACE_CATALOG_PATH = os.getenv('PLACE_CATALOG_PATH', str(BASE_DIR / 'place_catalog.bin'))
+
+# 카탈로그 스냅샷 (build_catalog_snapshot으로 만든 장소/축제 SQLite 파일, load_catalog_snapshot으로 적재)
+CATALOG_SNAPSHOT_PATH = os.getenv('CATALOG_SNAPSHOT_PATH', str(BASE_DIR / 'catalog_snapshot.sqlite3'))
+
+# LLM 요청(여행 계획 생성/수정) 동시 실행 제한
+LLM_MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', '4'))  # 동시에 실행할 LLM 요청 수
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '8'))  # 슬롯을 기다릴 수 있는 요청 수 (초과 시 즉시 503)
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv('LLM_QUEUE_TIMEOUT_SECONDS', '10'))  # 대기 최대 시간
+LLM_RETRY_AFTER_SECONDS = int(os.getenv('LLM_RETRY_AFTER_SECONDS', '15'))  # 503 응답의 Retry-After
+# 'process': 워커 프로세스별 제한, 'file': 슬롯 파일 잠금으로 같은 서버의 모든 워커가 한도 공유 (Linux/macOS)
+LLM_CONCURRENCY_BACKEND = os.getenv('LLM_CONCURRENCY_BACKEND', 'process')
+LLM_CONCURRENCY_LOCK_DIR = os.getenv('LLM_CONCURRENCY_LOCK_DIR', '')
+
+# 캐시 (Idempotency-Key 결과 보관 등) - 여러 워커 프로세스가 공유하려면 파일/Redis 캐시 지정
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'tripify'),
+    }
+}
+
+# Idempotency-Key 설정 (여행 계획 생성/수정)
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '3600'))  # 완료된 결과 재사용 기간
+IDEMPOTENCY_WAIT_SECONDS = int(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '120'))  # 처리 중인 동일 요청 대기 최대 시간
+# 다른 프로세스의 중복 처리를 막는 잠금 유지 시간 - 구간 생성/헤지/재요청을 포함한 최악의 생성 시간보다 길게
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '600'))
+
+# 프론트엔드에서 보내는 Idempotency-Key 헤더 허용
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Retry-After', 'Idempotent-Replayed']
+
+# LLM 사용량 제한 (사용자별/전체 토큰 버킷 + 사용자별 일일 한도)
+LLM_USER_BUCKET_CAPACITY = int(os.getenv('LLM_USER_BUCKET_CAPACITY', '3'))  # 사용자별 연속 요청 허용 수
+LLM_USER_REFILL_PER_HOUR = float(os.getenv('LLM_USER_REFILL_PER_HOUR', '20'))  # 사용자별 시간당 충전량
+LLM_GLOBAL_BUCKET_CAPACITY = int(os.getenv('LLM_GLOBAL_BUCKET_CAPACITY', '20'))  # 전체 연속 요청 허용 수
+LLM_GLOBAL_REFILL_PER_HOUR = float(os.getenv('LLM_GLOBAL_REFILL_PER_HOUR', '600'))  # 전체 시간당 충전량
+LLM_USER_DAILY_CALL_LIMIT = int(os.getenv('LLM_USER_DAILY_CALL_LIMIT', '100'))  # 사용자별 일일 Gemini 호출 수 (0: 무제한)
+LLM_USER_DAILY_TOKEN_LIMIT = int(os.getenv('LLM_USER_DAILY_TOKEN_LIMIT', '0'))  # 사용자별 일일 토큰 수 (0: 무제한)
+
+# 여행 일정 템플릿 (python manage.py build_trip_templates 로 미리 생성)
+TRIP_TEMPLATES_ENABLED = os.getenv('TRIP_TEMPLATES_ENABLED', 'True').lower() in ('true', '1', 'yes')
+TRIP_TEMPLATE_MAX_BUDGET_RATIO = float(os.getenv('TRIP_TEMPLATE_MAX_BUDGET_RATIO', '1.5'))  # 1인당 예산 수준 허용 배율
+
+# 유사 여행 계획 검색 (추천된 계획 대상 최근접 이웃 인덱스)
+SIMILAR_PLAN_REFRESH_SECONDS = int(os.getenv('SIMILAR_PLAN_REFRESH_SECONDS', '30'))  # 변경분 반영 주기
+SIMILAR_PLAN_FULL_REBUILD_SECONDS = int(os.getenv('SIMILAR_PLAN_FULL_REBUILD_SECONDS', '3600'))  # 전체 재구성 주기
+SIMILAR_PLAN_REUSE_MAX_DISTANCE = float(os.getenv('SIMILAR_PLAN_REUSE_MAX_DISTANCE', '0.6'))  # 재사용 허용 거리
+SIMILAR_PLAN_REUSE_MIN_RATING = int(os.getenv('SIMILAR_PLAN_REUSE_MIN_RATING', '4'))  # 재사용 최소 평점
@@ -23,4 +23,5 @@ urlpatterns = [
     path('api/travel/', include('trips.urls')),
     path('api/', include('places.urls')),
     path('api/festivals/', include('festivals.urls')),
+    path('api/ai/', include('ai.urls')),
 ]
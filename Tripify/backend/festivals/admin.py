@@ -4,7 +4,7 @@ from .models import Festival
 
 @admin.register(Festival)
 class FestivalAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'region', 'start_month', 'event_start_date', 'is_active', 'created_at']
+    list_display = ['title', 'category', 'region', 'start_month', 'event_start_date', 'itinerary_count', 'is_active', 'created_at']
     list_filter = ['region', 'start_month', 'category', 'is_active']
     search_fields = ['title', 'address', 'category']
     list_editable = ['is_active']
@@ -1,7 +1,66 @@
-import json
 import os
 from django.core.management.base import BaseCommand
 from festivals.models import Festival
+from places.autocomplete import refresh_shared_catalog
+from places.models import DataFileManifest
+from utils.geocoder import get_geocoder, region_of
+from utils.tourism_ingest import IngestPipeline, IngestTask, default_workers
+
+
+FOLDER_NAME = '축제공연행사'
+
+
+def _month(date_text):
+    """YYYYMMDD 형식 날짜의 월 (형식이 다르면 None)"""
+    if date_text and len(date_text) >= 6:
+        try:
+            return int(date_text[4:6])
+        except ValueError:
+            pass
+    return None
+
+
+def festival_row(item, category):
+    """원본 JSON 항목 -> Festival 필드 값"""
+    address = item.get('address', '')
+    # 날짜에서 월 추출 (YYYYMMDD 형식)
+    event_start_date = item.get('eventstartdate', '')
+    event_end_date = item.get('eventenddate', '')
+    return {
+        'title': item.get('title', ''),
+        'category': category,
+        'address': address,
+        'phone': item.get('phone', ''),
+        'latitude': item.get('latitude'),
+        'longitude': item.get('longitude'),
+        'image_url': item.get('image', ''),
+        'event_start_date': event_start_date,
+        'event_end_date': event_end_date,
+        'start_month': _month(event_start_date),
+        'end_month': _month(event_end_date),
+        # 주소에서 지역 추출 (시도 정식 명칭)
+        'region': region_of(address),
+        'content_id': item.get('id', ''),
+    }
+
+
+def festival_tasks(tourism_data_dir):
+    """축제 JSON 파일 적재 작업 목록 - (작업 목록, 읽은 폴더, 없는 폴더) (파일명이 카테고리)"""
+    folder_path = os.path.join(tourism_data_dir, FOLDER_NAME)
+    if not os.path.exists(folder_path):
+        return [], set(), [FOLDER_NAME]
+
+    tasks = []
+    for json_file in sorted(f for f in os.listdir(folder_path) if f.endswith('.json')):
+        category = json_file.replace('.json', '')
+        tasks.append(IngestTask(
+            file_key=f'{FOLDER_NAME}/{json_file}',
+            path=os.path.join(folder_path, json_file),
+            builder=festival_row,
+            args=(category,),
+            scope={'category': category},
+        ))
+    return tasks, {FOLDER_NAME}, []
 
 
 class Command(BaseCommand):
@@ -13,103 +72,43 @@ class Command(BaseCommand):
             action='store_true',
             help='기존 데이터를 삭제하고 새로 로드합니다',
         )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='증분 동기화: 바뀐 파일만 읽어 새 행 생성/바뀐 행 갱신, 원본에서 사라진 축제는 비활성화',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='JSON 파싱/정규화 작업자 프로세스 수 (기본: CPU 코어 수, 1이면 현재 프로세스에서 처리)',
+        )
 
     def handle(self, *args, **options):
         # 기존 데이터 삭제 옵션
         if options['clear']:
             self.stdout.write('기존 Festival 데이터를 삭제하는 중...')
             Festival.objects.all().delete()
+            DataFileManifest.objects.filter(dataset='festivals').delete()  # 다음 --sync에서 모든 파일을 다시 읽도록
             self.stdout.write(self.style.SUCCESS('기존 데이터 삭제 완료'))
 
         # tourism_data 폴더 경로
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        tourism_data_dir = os.path.join(base_dir, 'tourism_data', '축제공연행사')
+        tourism_data_dir = os.path.join(base_dir, 'tourism_data')
 
-        if not os.path.exists(tourism_data_dir):
-            self.stdout.write(self.style.ERROR(f'축제공연행사 폴더를 찾을 수 없습니다: {tourism_data_dir}'))
+        if not os.path.exists(os.path.join(tourism_data_dir, FOLDER_NAME)):
+            self.stdout.write(self.style.ERROR(
+                f'축제공연행사 폴더를 찾을 수 없습니다: {os.path.join(tourism_data_dir, FOLDER_NAME)}'))
             return
 
-        total_created = 0
-        total_skipped = 0
-
-        self.stdout.write('\n[축제공연행사] 폴더 처리 중...')
-
-        # 폴더 내 모든 JSON 파일 처리
-        json_files = [f for f in os.listdir(tourism_data_dir) if f.endswith('.json')]
-
-        for json_file in json_files:
-            file_path = os.path.join(tourism_data_dir, json_file)
-            category = json_file.replace('.json', '')  # 파일명이 카테고리
-
-            self.stdout.write(f'  - {json_file} 읽는 중...')
-
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data_list = json.load(f)
-
-                created_count = 0
-                skipped_count = 0
-
-                for item in data_list:
-                    # content_id는 id 필드를 사용
-                    content_id = item.get('id', '')
-
-                    # 이미 존재하는 데이터는 스킵
-                    if Festival.objects.filter(content_id=content_id).exists():
-                        skipped_count += 1
-                        continue
-
-                    # 주소에서 지역 추출 (첫 번째 공백 전까지)
-                    address = item.get('address', '')
-                    region = address.split()[0] if address else ''
-
-                    # 날짜에서 월 추출 (YYYYMMDD 형식)
-                    event_start_date = item.get('eventstartdate', '')
-                    event_end_date = item.get('eventenddate', '')
-
-                    start_month = None
-                    end_month = None
-
-                    if event_start_date and len(event_start_date) >= 6:
-                        try:
-                            start_month = int(event_start_date[4:6])
-                        except ValueError:
-                            pass
-
-                    if event_end_date and len(event_end_date) >= 6:
-                        try:
-                            end_month = int(event_end_date[4:6])
-                        except ValueError:
-                            pass
-
-                    # Festival 객체 생성
-                    Festival.objects.create(
-                        title=item.get('title', ''),
-                        category=category,
-                        address=address,
-                        phone=item.get('phone', ''),
-                        latitude=item.get('latitude'),
-                        longitude=item.get('longitude'),
-                        image_url=item.get('image', ''),
-                        event_start_date=event_start_date,
-                        event_end_date=event_end_date,
-                        start_month=start_month,
-                        end_month=end_month,
-                        region=region,
-                        content_id=content_id
-                    )
-                    created_count += 1
-
-                total_created += created_count
-                total_skipped += skipped_count
-
-                self.stdout.write(f'    OK 생성: {created_count}개, 스킵: {skipped_count}개')
-
-            except json.JSONDecodeError as e:
-                self.stdout.write(self.style.ERROR(f'    ERROR JSON 파싱 오류: {e}'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'    ERROR 오류: {e}'))
-
-        self.stdout.write('\n' + '='*60)
-        self.stdout.write(self.style.SUCCESS(f'완료! 총 {total_created}개 생성, {total_skipped}개 스킵'))
-        self.stdout.write('='*60)
+        self.stdout.write(f'\n[{FOLDER_NAME}] 폴더 처리 중...')
+        tasks, _, _ = festival_tasks(tourism_data_dir)
+
+        get_geocoder()  # 작업자 프로세스가 fork 시 물려받도록 미리 구성
+        pipeline = IngestPipeline(Festival, 'festivals', self.stdout, self.style,
+                                  sync=options['sync'], workers=options['workers'])
+        pipeline.run(tasks, {FOLDER_NAME})
+
+        refreshed = refresh_shared_catalog()
+        if refreshed is not None:
+            self.stdout.write(self.style.SUCCESS(f'공유 카탈로그 파일 갱신: {refreshed}개'))
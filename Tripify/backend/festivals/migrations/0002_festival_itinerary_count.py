@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festivals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='festival',
+            name='itinerary_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='일정 포함 횟수'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festivals', '0002_festival_itinerary_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='festival',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=40, verbose_name='원본 데이터 해시'),
+        ),
+    ]
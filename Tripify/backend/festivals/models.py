@@ -23,6 +23,12 @@ class Festival(models.Model):
     # 외부 API ID
     content_id = models.CharField(max_length=50, unique=True, help_text="외부 API Content ID")
 
+    # 인기도 카운터 (일정의 축제/행사 정보에 포함된 횟수, 시그널로 갱신)
+    itinerary_count = models.PositiveIntegerField(default=0, db_index=True, verbose_name='일정 포함 횟수')
+
+    # 원본 데이터 해시 (load_festivals --sync에서 값이 바뀌었는지 비교)
+    content_hash = models.CharField(max_length=40, blank=True, verbose_name='원본 데이터 해시')
+
     # 메타 정보
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
@@ -22,7 +22,7 @@ class FestivalListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'category', 'address', 'region',
             'event_start_date', 'event_end_date', 'start_month', 'end_month',
-            'image_url', 'phone'
+            'image_url', 'phone', 'itinerary_count'
         ]
 
 
@@ -47,5 +47,5 @@ class FestivalDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'category', 'address', 'region', 'phone',
             'latitude', 'longitude', 'image_url',
             'event_start_date', 'event_end_date', 'start_month', 'end_month',
-            'content_id', 'is_active', 'created_at', 'updated_at'
+            'content_id', 'is_active', 'itinerary_count', 'created_at', 'updated_at'
         ]
@@ -9,7 +9,7 @@ class FestivalViewSet(viewsets.ReadOnlyModelViewSet):
     """
     축제 ViewSet (읽기 전용)
 
-    list: 축제 목록 조회 (필터링 가능 - start_month, end_month, region, category)
+    list: 축제 목록 조회 (필터링 가능 - start_month, end_month, region, category, 인기순: ?ordering=-itinerary_count)
     retrieve: 축제 상세 정보 조회
     """
     queryset = Festival.objects.filter(is_active=True)
@@ -17,7 +17,7 @@ class FestivalViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['start_month', 'end_month', 'region', 'category']
     search_fields = ['title', 'address', 'category']
-    ordering_fields = ['start_month', 'title', 'created_at']
+    ordering_fields = ['start_month', 'title', 'created_at', 'itinerary_count']  # -itinerary_count: 인기순
     ordering = ['start_month', 'title']
 
     def get_serializer_class(self):
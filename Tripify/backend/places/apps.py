@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PlacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'places'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (인기도 카운터 시그널 등록)
+        from utils import catalog_db  # noqa: F401 (카탈로그 DB 파일 교체 감지 시그널 등록)
+        from utils import sqlite_tuning  # noqa: F401 (SQLite 연결 PRAGMA 훅 등록)
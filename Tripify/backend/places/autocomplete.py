@@ -0,0 +1,283 @@
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from festivals.models import Festival
+from .models import Place
+from .shared_catalog import shared_catalog, write_catalog
+
+
+# 한글 자모 (호환 자모)
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+            'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 입력 중간 상태와 비교할 수 있도록 겹모음/겹받침은 두 자모로 분리 (예: "고" 입력 중에도 "과"가 검색됨)
+COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+}
+_CHOSUNG_SET = set(CHOSUNG)
+_SEPARATORS = re.compile(r'[\s\W_]+')
+
+ITINERARY_COUNT_WEIGHT = 0.5  # 인기도: 북마크 수 + 일정 포함 횟수 x 0.5 (후보 장소 선택과 같은 기준)
+# 인기도가 같으면 관광지/축제, 숙박, 음식점 순
+TYPE_PRIORITY = {'tourist': 0, 'festival': 0, 'accommodation': 1, 'cafe': 2, 'restaurant': 2}
+MAX_LIMIT = 30
+CACHE_SIZE = 2048  # 최근 검색 결과 보관 수 (인덱스가 바뀌면 비움)
+
+
+def _is_syllable(char):
+    return '가' <= char <= '힣'
+
+
+def decompose(text):
+    """한글 음절을 자모로 분해한 비교용 문자열 (공백/문장부호 제거, 영문 소문자)"""
+    result = []
+    for char in text.lower():
+        if _is_syllable(char):
+            code = ord(char) - 0xAC00
+            result.append(CHOSUNG[code // 588])
+            jung = JUNGSUNG[(code % 588) // 28]
+            result.append(COMPOUND_JAMO.get(jung, jung))
+            jong = JONGSUNG[code % 28]
+            result.append(COMPOUND_JAMO.get(jong, jong))
+        elif char.isalnum():
+            result.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(result)
+
+
+def chosung(text):
+    """초성 문자열 (예: "경복궁" -> "ㄱㅂㄱ", 한글 외 문자는 소문자 그대로)"""
+    result = []
+    for char in text.lower():
+        if _is_syllable(char):
+            result.append(CHOSUNG[(ord(char) - 0xAC00) // 588])
+        elif char.isalnum():
+            result.append(char)
+    return ''.join(result)
+
+
+def is_chosung_query(text):
+    """초성만으로 된 검색어인지 (예: "ㄱㅂㄱ")"""
+    letters = [char for char in text if not char.isspace()]
+    return bool(letters) and all(char in _CHOSUNG_SET for char in letters)
+
+
+def _word_starts(title):
+    """제목과 제목 안 단어로 시작하는 부분 문자열 (예: "서울 경복궁" -> ["서울 경복궁", "경복궁"])"""
+    starts = [title]
+    for match in _SEPARATORS.finditer(title):
+        rest = title[match.end():]
+        if rest:
+            starts.append(rest)
+    return starts
+
+
+class AutocompleteIndex:
+    """
+    장소/축제 제목 자동완성 인덱스
+
+    제목(과 제목 안 각 단어부터의 부분)을 자모 분해 키와 초성 키로 만들어 정렬해 두고,
+    검색어 키로 시작하는 구간을 이진 탐색으로 찾습니다 (정렬 배열 기반 접두사 트리).
+    제목 맨 앞부터 일치하는 항목, 인기도 높은 항목, 장소 타입(TYPE_PRIORITY), 짧은 제목 순으로 정렬합니다.
+    """
+
+    def __init__(self, entries):
+        # entries: [(source, id, title, type, region, latitude, longitude, popularity), ...]
+        self.entries = entries
+        jamo_keys, chosung_keys = [], []
+        for number, entry in enumerate(entries):
+            for position, text in enumerate(_word_starts(entry[2])):
+                flag = 0 if position == 0 else 1  # 0: 제목 맨 앞부터 일치
+                jamo_keys.append((decompose(text), flag, number))
+                chosung_keys.append((chosung(text), flag, number))
+        jamo_keys.sort()
+        chosung_keys.sort()
+        self._jamo = ([key for key, _, _ in jamo_keys], [(flag, number) for _, flag, number in jamo_keys])
+        self._chosung = ([key for key, _, _ in chosung_keys], [(flag, number) for _, flag, number in chosung_keys])
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, query, place_type='', region='', limit=10):
+        """검색어로 시작하는 장소/축제 목록 (초성만 입력하면 초성으로 검색)"""
+        query = (query or '').strip()
+        if not query:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        if is_chosung_query(query):
+            keys, refs = self._chosung
+            key = chosung(query)
+        else:
+            keys, refs = self._jamo
+            key = decompose(query)
+        if not key:
+            return []
+
+        cache_key = (keys is self._chosung[0], key, place_type, region, limit)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        lo = bisect_left(keys, key)
+        hi = bisect_left(keys, key + '\uffff', lo)
+        best = {}  # 항목 번호 -> 일치 위치 (0: 제목 맨 앞)
+        for flag, number in refs[lo:hi]:
+            if best.get(number, 1) > flag:
+                best[number] = flag
+
+        def matches(number):
+            entry = self.entries[number]
+            if place_type and entry[3] != place_type:
+                return False
+            return not region or region in entry[4]
+
+        ranked = heapq.nsmallest(
+            limit * 2,  # 장소/축제 중복 제거 여유분
+            (number for number in best if matches(number)),
+            key=lambda number: (best[number], -self.entries[number][7],
+                                TYPE_PRIORITY.get(self.entries[number][3], 3), len(self.entries[number][2])),
+        )
+
+        results = []
+        seen = set()
+        for number in ranked:
+            source, pk, title, entry_type, entry_region, latitude, longitude, _ = self.entries[number]
+            if (title, entry_type, entry_region) in seen:
+                continue
+            seen.add((title, entry_type, entry_region))
+            results.append({
+                'id': pk,
+                'source': source,
+                'title': title,
+                'type': entry_type,
+                'region': entry_region,
+                'latitude': latitude,
+                'longitude': longitude,
+            })
+            if len(results) >= limit:
+                break
+
+        with self._lock:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[cache_key] = results
+        return results
+
+
+def _load_entries():
+    """인덱스 항목 (같은 축제가 장소에도 있으면 축제 테이블 쪽만 사용)"""
+    entries = []
+    festival_ids = set()
+    festivals = Festival.objects.filter(is_active=True).values_list(
+        'id', 'title', 'region', 'latitude', 'longitude', 'itinerary_count', 'content_id'
+    )
+    for pk, title, region, latitude, longitude, itinerary_count, content_id in festivals.iterator():
+        festival_ids.add(content_id)
+        entries.append(('festival', pk, title, 'festival', region or '',
+                        float(latitude) if latitude is not None else None,
+                        float(longitude) if longitude is not None else None,
+                        math.log1p(itinerary_count * ITINERARY_COUNT_WEIGHT)))
+
+    places = Place.objects.filter(is_active=True).values_list(
+        'id', 'title', 'place_type', 'region', 'latitude', 'longitude', 'bookmark_count', 'itinerary_count',
+        'content_id'
+    )
+    for (pk, title, place_type, region, latitude, longitude, bookmark_count, itinerary_count,
+         content_id) in places.iterator():
+        if place_type == 'festival' and content_id in festival_ids:
+            continue
+        entries.append(('place', pk, title, place_type, region or '',
+                        float(latitude) if latitude is not None else None,
+                        float(longitude) if longitude is not None else None,
+                        math.log1p(bookmark_count + itinerary_count * ITINERARY_COUNT_WEIGHT)))
+    return entries
+
+
+def data_version():
+    """장소/축제 데이터 버전 (행 수와 마지막 수정 시각 - 데이터 적재/수정 시 바뀜)"""
+    place = Place.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    festival = Festival.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return place['count'], place['updated'], festival['count'], festival['updated']
+
+
+def write_shared_catalog(path=None):
+    """
+    현재 장소/축제 데이터로 공유 카탈로그 파일(PLACE_CATALOG_PATH)을 만들어 교체 (반환값: 항목 수)
+
+    데이터 버전을 먼저 읽으므로, 만드는 도중 데이터가 바뀌면 파일 버전이 DB보다 오래된 것으로 보고 쓰지 않습니다.
+    """
+    version = data_version()
+    return write_catalog(path or settings.PLACE_CATALOG_PATH, _load_entries(), version)
+
+
+def refresh_shared_catalog():
+    """공유 카탈로그 파일을 쓰는 환경(파일이 이미 있음)이면 다시 만듦 - 데이터 적재 명령 끝에서 호출 (반환값: 항목 수 또는 None)"""
+    if settings.PLACE_CATALOG_PATH and os.path.exists(settings.PLACE_CATALOG_PATH):
+        return write_shared_catalog()
+    return None
+
+
+class PlaceAutocomplete:
+    """
+    자동완성 인덱스 관리 (프로세스 단위, 스레드 안전)
+
+    첫 요청 시 인덱스를 만들고, AUTOCOMPLETE_REFRESH_SECONDS마다 데이터 버전을 확인하여
+    load_places/load_festivals 등으로 데이터가 바뀌었으면 다시 만듭니다.
+    다시 만드는 동안에는 이전 인덱스로 응답합니다.
+    공유 카탈로그 파일이 있으면 DB 대신 파일에서 항목을 읽습니다. (버전이 다르면 한 프로세스가 파일을 다시 씀)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._checked_at = None
+
+    def index(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < settings.AUTOCOMPLETE_REFRESH_SECONDS:
+            return self._index
+
+        if self._index is not None and not self._lock.acquire(blocking=False):
+            return self._index  # 다른 스레드가 확인/재구성 중
+        if self._index is None:
+            self._lock.acquire()
+        try:
+            if self._index is None or time.monotonic() - self._checked_at >= settings.AUTOCOMPLETE_REFRESH_SECONDS:
+                version = data_version()
+                if self._index is None or version != self._version:
+                    started = time.monotonic()
+                    catalog = shared_catalog.get(version, rebuild=write_shared_catalog)
+                    self._index = AutocompleteIndex(catalog.entries() if catalog is not None else _load_entries())
+                    self._version = version
+                    source = '공유 카탈로그 파일' if catalog is not None else 'DB'
+                    print(f'✓ 자동완성 인덱스 구성 ({source}): {len(self._index)}개 ({time.monotonic() - started:.2f}초)')
+                self._checked_at = time.monotonic()
+            return self._index
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._version = None
+
+    def search(self, query, place_type='', region='', limit=10):
+        return self.index().search(query, place_type=place_type, region=region, limit=limit)
+
+
+place_autocomplete = PlaceAutocomplete()
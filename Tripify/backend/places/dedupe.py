@@ -0,0 +1,328 @@
+import math
+import re
+from collections import defaultdict
+
+from django.utils import timezone
+
+from trips.models import ItineraryPlace
+from trips.place_resolver import normalize_name
+from utils.catalog_db import atomic_all
+from .models import Bookmark, Place
+
+
+GEOHASH_PRECISION = 7  # 약 150m x 150m 칸 (후보는 같은 칸 + 주변 8칸에서만 비교)
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# 같은 장소 판정 기준
+NAME_WEIGHT = 0.6
+DISTANCE_WEIGHT = 0.3
+PHONE_WEIGHT = 0.1
+DISTANCE_SCALE_M = 100  # exp(-거리 / 100m)
+MAX_DISTANCE_M = 300  # 이보다 멀면 같은 장소로 보지 않음
+SAME_NAME_MAX_DISTANCE_M = 1000  # 이름이 정확히 같으면 허용 거리 (좌표 오차가 큰 카카오 장소 등)
+MIN_NAME_SIMILARITY = 0.5
+DEFAULT_THRESHOLD = 0.8
+
+_PHONE_DIGITS = re.compile(r'\D')
+_NUMBERS = re.compile(r'\d+')
+_QUALIFIERS = re.compile(r'[(\[{（]([^)\]}）]*)[)\]}）]')  # 괄호 안 구분자 (예: "온정여관(사랑채)")
+
+
+def geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """위경도 -> geohash 문자열"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, bit_count, even, result = 0, 0, True, []
+    while len(result) < precision:
+        target, value = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (target[0] + target[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            target[0] = middle
+        else:
+            bits = bits * 2
+            target[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            result.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(result)
+
+
+def _cell_size(precision=GEOHASH_PRECISION):
+    """geohash 칸 크기 (위도 도, 경도 도)"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def neighbor_cells(latitude, longitude, precision=GEOHASH_PRECISION):
+    """자신과 주변 8칸의 geohash"""
+    lat_size, lng_size = _cell_size(precision)
+    return {
+        geohash(latitude + d_lat * lat_size, longitude + d_lng * lng_size, precision)
+        for d_lat in (-1, 0, 1) for d_lng in (-1, 0, 1)
+    }
+
+
+def _distance_m(a, b):
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 6371000 * 2 * math.asin(math.sqrt(h))
+
+
+def _bigrams(text):
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def name_similarity(a, b):
+    """
+    정규화한 이름의 유사도 (2-gram Dice 계수)
+
+    일정 매칭과 달리 포함 관계는 보정하지 않습니다 ("한국민속촌"과 "한국민속촌 눈썰매장"은 다른 장소).
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    grams_a, grams_b = _bigrams(a), _bigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def distinct_names(a, b):
+    """
+    이름이 비슷해도 다른 시설로 봐야 하는지 (정규화한 이름 기준)
+
+    앞뒤 공통 부분을 뺀 나머지가 한쪽에만 있으면 한 이름이 다른 이름을 늘인 것
+    ("울주해양레포츠센터" / "울주해양레포츠센터 야영장", "팔공산금화자연휴양림" / "...캠핑장"),
+    어느 한쪽이라도 두 글자 이상이면 서로 다른 구분어 ("랜딩관 제주신화월드" / "메리어트관 제주신화월드"),
+    첫 글자나 끝 글자부터 다르면 다른 지명/시설 ("도동 해안산책로" / "저동 해안산책로", "인사동 옥정" / "인사동 촌")으로 봅니다.
+    이름 중간의 한 글자 차이(오타, 표기 차이)만 유사도로 판단합니다.
+    """
+    if a == b:
+        return False
+    prefix = 0
+    while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(a), len(b)) - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    rest_a, rest_b = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+    return not rest_a or not rest_b or prefix == 0 or suffix == 0 or max(len(rest_a), len(rest_b)) >= 2
+
+
+class _Candidate:
+    __slots__ = ('id', 'name', 'qualifiers', 'grams', 'numbers', 'coords', 'phone', 'place_type', 'region',
+                 'content_id')
+
+    def __init__(self, row):
+        pk, title, latitude, longitude, tel, place_type, region, content_id = row
+        self.id = pk
+        self.name = normalize_name(title)
+        self.qualifiers = tuple(normalize_name(part) for part in _QUALIFIERS.findall(title or ''))
+        self.grams = _bigrams(self.name)
+        self.numbers = _NUMBERS.findall(self.name)
+        self.coords = (float(latitude), float(longitude)) if latitude is not None and longitude is not None else None
+        self.phone = _PHONE_DIGITS.sub('', tel or '')
+        self.place_type = place_type
+        self.region = region
+        self.content_id = content_id
+
+
+def pair_score(a, b):
+    """
+    두 장소가 같은 장소일 점수 (0~1, 같은 장소로 볼 수 없으면 0)
+
+    이름 유사도, 거리, 전화번호 일치를 가중합합니다. 이름이 정확히 같고 출처가 다르거나
+    (TourAPI / 카카오) 전화번호가 같으면 좌표 오차를 감안해 SAME_NAME_MAX_DISTANCE_M까지 같은 장소로 봅니다.
+    """
+    cross_source = a.content_id.startswith('kakao_') != b.content_id.startswith('kakao_')
+    # 카카오 장소의 타입은 카테고리명으로 추정한 값이므로 출처가 다를 때만 타입이 달라도 비교
+    if a.place_type != b.place_type and not cross_source:
+        return 0.0
+    # 이름 속 숫자가 다르면 다른 시설 (예: "OO하우스1" / "OO하우스2", "2호점" / "3호점")
+    if a.numbers != b.numbers:
+        return 0.0
+    # 괄호 안 구분자가 다르면 다른 건물/시설 (예: "온정여관(사랑채)" / "온정여관(안채, 별채)")
+    if a.qualifiers and b.qualifiers and a.qualifiers != b.qualifiers:
+        return 0.0
+    if distinct_names(a.name, b.name):
+        return 0.0
+    similarity = name_similarity(a.name, b.name)
+    if similarity < MIN_NAME_SIMILARITY or not a.coords or not b.coords:
+        return 0.0
+
+    distance = _distance_m(a.coords, b.coords)
+    same_phone = bool(a.phone) and a.phone == b.phone
+    if similarity == 1.0 and (cross_source or same_phone):
+        return 1.0 if distance <= SAME_NAME_MAX_DISTANCE_M else 0.0
+    if distance > MAX_DISTANCE_M:
+        return 0.0
+
+    return (similarity * NAME_WEIGHT
+            + math.exp(-distance / DISTANCE_SCALE_M) * DISTANCE_WEIGHT
+            + (PHONE_WEIGHT if same_phone else 0))
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def find_duplicates(queryset=None, threshold=DEFAULT_THRESHOLD):
+    """
+    중복 장소 그룹 목록 [[장소 id, ...], ...] (그룹마다 2개 이상)
+
+    축제/행사는 제외하며, 전체 쌍을 비교하지 않고 블로킹으로 후보 쌍만 만듭니다.
+    - 좌표가 있는 장소: geohash 칸별로 모은 뒤 같은 칸/주변 칸 중 이름 2-gram을 공유하는 장소만 비교
+    - 이름이 정확히 같은 장소: 같은 지역 안에서 비교 (좌표 차이가 큰 카카오 장소 등)
+    점수가 threshold 이상인 쌍을 union-find로 묶습니다.
+    """
+    # 축제/행사는 같은 장소에서 열리는 다른 행사가 많으므로 제외 (비활성화된 장소도 제외)
+    queryset = queryset if queryset is not None else Place.objects.all()
+    queryset = queryset.filter(is_active=True).exclude(place_type='festival')
+    candidates = [
+        _Candidate(row) for row in queryset.values_list(
+            'id', 'title', 'latitude', 'longitude', 'tel', 'place_type', 'region', 'content_id').iterator()
+    ]
+
+    # 블로킹 키: geohash 칸 -> 칸 안의 2-gram 역색인, (지역, 정규화한 이름) -> 장소
+    cells = defaultdict(lambda: defaultdict(list))
+    by_name = defaultdict(list)
+    for index, candidate in enumerate(candidates):
+        if candidate.coords:
+            cell = cells[geohash(*candidate.coords)]
+            for gram in candidate.grams:
+                cell[gram].append(index)
+        if candidate.name:
+            by_name[(candidate.region, candidate.name)].append(index)
+
+    compared = set()
+    groups = _UnionFind()
+    comparisons = 0
+
+    def compare(i, j):
+        nonlocal comparisons
+        key = (i, j) if i < j else (j, i)
+        if i == j or key in compared:
+            return
+        compared.add(key)
+        comparisons += 1
+        if pair_score(candidates[i], candidates[j]) >= threshold:
+            groups.union(candidates[i].id, candidates[j].id)
+
+    for index, candidate in enumerate(candidates):
+        if not candidate.coords:
+            continue
+        for cell_key in neighbor_cells(*candidate.coords):
+            cell = cells.get(cell_key)
+            if not cell:
+                continue
+            for gram in candidate.grams:
+                for other in cell.get(gram, ()):
+                    if other > index:
+                        compare(index, other)
+
+    for indexes in by_name.values():
+        # 같은 이름 체인점이 많은 경우를 위해 블록 크기 제한 (좌표 블로킹에서 이미 비교됨)
+        if 1 < len(indexes) <= 50:
+            for position, i in enumerate(indexes):
+                for j in indexes[position + 1:]:
+                    compare(i, j)
+
+    clusters = defaultdict(list)
+    for candidate in candidates:
+        if candidate.id in groups.parent:
+            clusters[groups.find(candidate.id)].append(candidate.id)
+    print(f'✓ 중복 후보 비교 {comparisons}회 (장소 {len(candidates)}개)')
+    return [sorted(ids) for ids in clusters.values() if len(ids) > 1]
+
+
+def _canonical_key(place):
+    """남길 장소 우선순위 (TourAPI 데이터, 정보가 많은 장소, 북마크/일정이 많은 장소, 먼저 생성된 장소)"""
+    return (
+        place.content_id.startswith('kakao_'),
+        not place.image_url,
+        not place.description,
+        -(place.bookmark_count + place.itinerary_count),
+        place.id,
+    )
+
+
+@atomic_all(Place, Bookmark, ItineraryPlace)  # 카탈로그 DB를 분리했으면 두 DB 모두 트랜잭션
+def merge_places(place_ids):
+    """
+    중복 장소를 하나로 병합하고 남긴 장소를 반환
+
+    북마크/일정별 장소를 남길 장소로 옮기고 (같은 사용자의 중복 북마크는 삭제),
+    남길 장소의 빈 정보(이미지, 설명, 전화번호, 좌표)를 채운 뒤 나머지 장소는 삭제하지 않고
+    비활성화하며 merged_into에 남길 장소를 기록합니다 (다음 load_places가 같은 content_id를 다시 만들지 않도록).
+    카운터는 옮긴 뒤 다시 계산합니다.
+    """
+    places = sorted(Place.objects.select_for_update().filter(pk__in=place_ids), key=_canonical_key)
+    if len(places) < 2:
+        return places[0] if places else None
+    canonical, duplicates = places[0], places[1:]
+    duplicate_ids = [place.id for place in duplicates]
+
+    # 북마크: 이미 남길 장소를 북마크한 사용자의 북마크는 삭제, 나머지는 옮김
+    bookmarked = Bookmark.objects.filter(place=canonical).values_list('user_id', flat=True)
+    Bookmark.objects.filter(place_id__in=duplicate_ids, user_id__in=bookmarked).delete()
+    moved = Bookmark.objects.filter(place_id__in=duplicate_ids).order_by('user_id', 'id')
+    seen_users = set()
+    for bookmark in moved:
+        if bookmark.user_id in seen_users:
+            bookmark.delete()
+        else:
+            seen_users.add(bookmark.user_id)
+    Bookmark.objects.filter(place_id__in=duplicate_ids).update(place=canonical)
+
+    ItineraryPlace.objects.filter(place_id__in=duplicate_ids).update(place=canonical)
+
+    changed = []
+    for field in ('image_url', 'description', 'tel', 'category'):
+        if not getattr(canonical, field):
+            value = next((getattr(place, field) for place in duplicates if getattr(place, field)), '')
+            if value:
+                setattr(canonical, field, value)
+                changed.append(field)
+    if canonical.latitude is None or canonical.longitude is None:
+        source = next((place for place in duplicates if place.latitude is not None and place.longitude is not None), None)
+        if source is not None:
+            canonical.latitude, canonical.longitude = source.latitude, source.longitude
+            changed += ['latitude', 'longitude']
+
+    # 이전에 병합된 장소도 새로 남길 장소를 가리키도록
+    Place.objects.filter(merged_into_id__in=duplicate_ids).update(merged_into=canonical)
+    Place.objects.filter(pk__in=duplicate_ids).update(
+        is_active=False, merged_into=canonical, bookmark_count=0, itinerary_count=0, updated_at=timezone.now())
+
+    canonical.bookmark_count = Bookmark.objects.filter(place=canonical).count()
+    canonical.itinerary_count = ItineraryPlace.objects.filter(place=canonical).count()
+    canonical.save(update_fields=[*changed, 'bookmark_count', 'itinerary_count', 'updated_at'])
+    return canonical
+
+
+def duplicate_summary(groups):
+    """그룹별 (남길 장소, 병합될 장소 목록) - 실행 전 확인용"""
+    places = Place.objects.in_bulk([place_id for group in groups for place_id in group])
+    summary = []
+    for group in groups:
+        members = sorted((places[place_id] for place_id in group if place_id in places), key=_canonical_key)
+        if len(members) > 1:
+            summary.append((members[0], members[1:]))
+    return summary
+
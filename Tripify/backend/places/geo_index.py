@@ -0,0 +1,223 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from festivals.models import Festival
+from .autocomplete import ITINERARY_COUNT_WEIGHT, data_version, write_shared_catalog
+from .models import Place
+from .shared_catalog import shared_catalog, version_key
+
+
+# 지도 마커 타입 (축제는 Festival 테이블 기준, 같은 content_id의 장소 축제 행은 제외)
+MAP_TYPES = ['tourist', 'restaurant', 'cafe', 'accommodation', 'festival']
+GRID_PER_TILE = 4  # 클러스터 격자: 타일 하나를 4 x 4 칸으로 나눔
+MIN_ZOOM = 1
+MAX_ZOOM = 20
+
+
+def tile_size(zoom):
+    """줌 레벨의 타일 크기 (위경도 도 단위, 줌이 1 오를 때마다 절반)"""
+    return 360.0 / (2 ** zoom)
+
+
+def tiles_for_bbox(min_lng, min_lat, max_lng, max_lat, zoom):
+    """영역을 덮는 타일 좌표 [(x, y), ...]"""
+    size = tile_size(zoom)
+    x0, x1 = int(math.floor((min_lng + 180) / size)), int(math.floor((max_lng + 180) / size))
+    y0, y1 = int(math.floor((min_lat + 90) / size)), int(math.floor((max_lat + 90) / size))
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+class GeoIndex:
+    """
+    장소/축제 좌표 격자 인덱스
+
+    좌표, 타입, 인기도를 NumPy 배열로 보관하고, 줌 레벨별 타일(360 / 2^zoom 도)을
+    GRID_PER_TILE x GRID_PER_TILE 칸으로 나누어 칸별 개수/중심 좌표를 집계합니다.
+    """
+
+    def __init__(self, rows):
+        # rows: [(source, id, title, type, latitude, longitude, popularity), ...]
+        self.sources = [row[0] for row in rows]
+        self.ids = [row[1] for row in rows]
+        self.titles = [row[2] for row in rows]
+        self.types = np.array([MAP_TYPES.index(row[3]) for row in rows], dtype=np.int8)
+        self.lat = np.array([row[4] for row in rows], dtype=np.float64)
+        self.lng = np.array([row[5] for row in rows], dtype=np.float64)
+        self.popularity = np.array([row[6] for row in rows], dtype=np.float32)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """공유 카탈로그 파일의 좌표가 있는 항목으로 구성 (좌표/인기도 배열은 파일 매핑을 그대로 사용)"""
+        count = catalog.geo_count
+        codes = np.array([MAP_TYPES.index(name) if name in MAP_TYPES else -1 for name in catalog.meta['types']],
+                         dtype=np.int8)
+        index = cls.__new__(cls)
+        index.sources = catalog.sources(count)
+        index.ids = catalog.columns['id'][:count]
+        index.titles = catalog.titles(count)
+        index.types = codes[catalog.columns['type'][:count]]
+        index.lat = catalog.columns['latitude'][:count]
+        index.lng = catalog.columns['longitude'][:count]
+        index.popularity = catalog.columns['popularity'][:count]
+        if (index.types < 0).any():
+            # 지도 마커 타입이 아닌 항목은 좌표를 NaN으로 두어 어느 타일에도 들어가지 않게 함 (이때만 복사)
+            index.lat = np.where(index.types >= 0, index.lat, np.nan)
+            index.types = np.maximum(index.types, 0)
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _place(self, row):
+        return {
+            'id': int(self.ids[row]),
+            'source': self.sources[row],
+            'title': self.titles[row],
+            'type': MAP_TYPES[self.types[row]],
+            'latitude': round(float(self.lat[row]), 7),
+            'longitude': round(float(self.lng[row]), 7),
+        }
+
+    def tile(self, zoom, x, y, type_codes):
+        """
+        타일 하나의 마커 {'clusters': [...], 'places': [...]}
+
+        MAP_CLUSTER_MAX_ZOOM 이하면 격자 칸별 클러스터 (한 개뿐인 칸은 장소로),
+        그보다 확대하면 개별 장소 (인기순 MAP_MAX_PLACES_PER_TILE개까지)를 반환합니다.
+        """
+        size = tile_size(zoom)
+        west, south = x * size - 180, y * size - 90
+        mask = (self.lng >= west) & (self.lng < west + size) & (self.lat >= south) & (self.lat < south + size)
+        if len(type_codes) < len(MAP_TYPES):
+            mask &= np.isin(self.types, type_codes)
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return {'clusters': [], 'places': []}
+
+        if zoom > settings.MAP_CLUSTER_MAX_ZOOM:
+            if rows.size > settings.MAP_MAX_PLACES_PER_TILE:
+                rows = rows[np.argsort(-self.popularity[rows], kind='stable')[:settings.MAP_MAX_PLACES_PER_TILE]]
+            return {'clusters': [], 'places': [self._place(row) for row in rows]}
+
+        cell = size / GRID_PER_TILE
+        cx = np.minimum(((self.lng[rows] - west) / cell).astype(np.int64), GRID_PER_TILE - 1)
+        cy = np.minimum(((self.lat[rows] - south) / cell).astype(np.int64), GRID_PER_TILE - 1)
+        cells = cy * GRID_PER_TILE + cx
+        cell_count = GRID_PER_TILE * GRID_PER_TILE
+        counts = np.bincount(cells, minlength=cell_count)
+        lat_sums = np.bincount(cells, weights=self.lat[rows], minlength=cell_count)
+        lng_sums = np.bincount(cells, weights=self.lng[rows], minlength=cell_count)
+        type_counts = np.bincount(cells * len(MAP_TYPES) + self.types[rows],
+                                  minlength=cell_count * len(MAP_TYPES)).reshape(cell_count, len(MAP_TYPES))
+
+        clusters, places = [], []
+        for index in np.flatnonzero(counts):
+            if counts[index] == 1:
+                places.append(self._place(rows[cells == index][0]))
+                continue
+            clusters.append({
+                'latitude': round(float(lat_sums[index] / counts[index]), 6),
+                'longitude': round(float(lng_sums[index] / counts[index]), 6),
+                'count': int(counts[index]),
+                'types': {MAP_TYPES[code]: int(n) for code, n in enumerate(type_counts[index]) if n},
+            })
+        return {'clusters': clusters, 'places': places}
+
+
+def _load_rows():
+    rows = []
+    festival_ids = set()
+    festivals = Festival.objects.filter(is_active=True, latitude__isnull=False, longitude__isnull=False)
+    for pk, title, latitude, longitude, content_id, itinerary_count in festivals.values_list(
+            'id', 'title', 'latitude', 'longitude', 'content_id', 'itinerary_count').iterator():
+        festival_ids.add(content_id)
+        rows.append(('festival', pk, title, 'festival', float(latitude), float(longitude),
+                     math.log1p(itinerary_count * ITINERARY_COUNT_WEIGHT)))
+
+    places = Place.objects.filter(is_active=True, latitude__isnull=False, longitude__isnull=False)
+    for pk, title, place_type, latitude, longitude, content_id, bookmark_count, itinerary_count in places.values_list(
+            'id', 'title', 'place_type', 'latitude', 'longitude', 'content_id',
+            'bookmark_count', 'itinerary_count').iterator():
+        if place_type not in MAP_TYPES or (place_type == 'festival' and content_id in festival_ids):
+            continue
+        rows.append(('place', pk, title, place_type, float(latitude), float(longitude),
+                     math.log1p(bookmark_count + itinerary_count * ITINERARY_COUNT_WEIGHT)))
+    return rows
+
+
+class PlaceMap:
+    """
+    지도 영역 조회 (프로세스 단위 격자 인덱스 + 타일 캐시)
+
+    인덱스는 MAP_INDEX_REFRESH_SECONDS마다 데이터 버전을 확인하여 바뀌었으면 다시 만들고,
+    타일 결과는 데이터 버전을 포함한 키로 Django 캐시에 MAP_TILE_CACHE_SECONDS 동안 보관합니다.
+    (같은 영역을 다시 보거나 지도를 조금 움직이면 대부분 캐시된 타일로 응답)
+    공유 카탈로그 파일이 있으면 DB를 읽지 않고 파일 매핑으로 인덱스를 구성합니다. (버전이 다르면 한 프로세스가 파일을 다시 씀)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version_key = None
+        self._checked_at = None
+
+    def index(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < settings.MAP_INDEX_REFRESH_SECONDS:
+            return self._index, self._version_key
+
+        with self._lock:
+            if self._index is None or time.monotonic() - self._checked_at >= settings.MAP_INDEX_REFRESH_SECONDS:
+                version = data_version()
+                if version_key(version) != self._version_key:
+                    started = time.monotonic()
+                    catalog = shared_catalog.get(version, rebuild=write_shared_catalog)
+                    self._index = GeoIndex.from_catalog(catalog) if catalog is not None else GeoIndex(_load_rows())
+                    self._version_key = version_key(version)
+                    source = '공유 카탈로그 파일' if catalog is not None else 'DB'
+                    print(f'✓ 지도 격자 인덱스 구성 ({source}): {len(self._index)}개 ({time.monotonic() - started:.2f}초)')
+                self._checked_at = time.monotonic()
+            return self._index, self._version_key
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._version_key = None
+
+    def query(self, min_lng, min_lat, max_lng, max_lat, zoom, types):
+        """영역 안 클러스터/장소 목록 (영역을 덮는 타일 결과를 합침)"""
+        index, version_key = self.index()
+        type_codes = sorted(MAP_TYPES.index(place_type) for place_type in types)
+        types_key = ''.join(str(code) for code in type_codes)
+
+        tiles = tiles_for_bbox(min_lng, min_lat, max_lng, max_lat, zoom)
+        keys = {f'map_tile:{version_key}:{types_key}:{zoom}:{x}:{y}': (x, y) for x, y in tiles}
+        cached = cache.get_many(list(keys))
+        missing = {}
+        for key, (x, y) in keys.items():
+            if key not in cached:
+                missing[key] = index.tile(zoom, x, y, type_codes)
+        if missing:
+            cache.set_many(missing, settings.MAP_TILE_CACHE_SECONDS)
+
+        clusters, places = [], []
+        for key in keys:
+            tile = cached.get(key) or missing[key]
+            clusters.extend(tile['clusters'])
+            places.extend(tile['places'])
+        return {
+            'zoom': zoom,
+            'clustered': zoom <= settings.MAP_CLUSTER_MAX_ZOOM,
+            'tiles': len(tiles),
+            'cached_tiles': len(cached),
+            'clusters': clusters,
+            'places': places,
+        }
+
+
+place_map = PlaceMap()
@@ -0,0 +1,47 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from festivals.management.commands.load_festivals import festival_tasks
+from festivals.models import Festival
+from places.management.commands.load_places import place_tasks
+from places.models import Place
+from utils.catalog_snapshot import SnapshotError, build_snapshot
+from utils.geocoder import get_geocoder
+from utils.tourism_ingest import default_workers
+
+
+class Command(BaseCommand):
+    help = 'tourism_data를 카탈로그 스냅샷(인덱스 포함 SQLite 파일)으로 만듭니다 (load_catalog_snapshot으로 빠르게 적재)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=settings.CATALOG_SNAPSHOT_PATH,
+                            help='스냅샷 파일 경로 (기본: CATALOG_SNAPSHOT_PATH)')
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='JSON 파싱/정규화 작업자 프로세스 수 (기본: CPU 코어 수)')
+
+    def handle(self, *args, **options):
+        tourism_data_dir = os.path.join(settings.BASE_DIR, 'tourism_data')
+        if not os.path.exists(tourism_data_dir):
+            raise CommandError(f'tourism_data 폴더를 찾을 수 없습니다: {tourism_data_dir}')
+
+        place_file_tasks, _, missing = place_tasks(tourism_data_dir)
+        festival_file_tasks, _, missing_festivals = festival_tasks(tourism_data_dir)
+        for folder_name in missing + missing_festivals:
+            self.stdout.write(self.style.WARNING(f'폴더를 찾을 수 없습니다: {folder_name}'))
+
+        get_geocoder()  # 작업자 프로세스가 fork 시 물려받도록 미리 구성
+        self.stdout.write(f"스냅샷 만드는 중... ({options['output']})")
+        try:
+            meta = build_snapshot(options['output'], [
+                ('places', Place, place_file_tasks),
+                ('festivals', Festival, festival_file_tasks),
+            ], workers=options['workers'], log=self.stdout.write)
+        except SnapshotError as e:
+            raise CommandError(str(e))
+
+        size = os.path.getsize(options['output']) / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f"스냅샷 완료! 버전 {meta['version']}, {size:.1f}MB, {meta['seconds']}초"
+        ))
@@ -0,0 +1,29 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from places.autocomplete import write_shared_catalog
+from places.shared_catalog import CatalogFile
+
+
+class Command(BaseCommand):
+    help = '장소/축제 공유 카탈로그 파일(PLACE_CATALOG_PATH)을 만듭니다 (작업자 프로세스들이 mmap으로 함께 읽는 자동완성/지도 인덱스 원본)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=settings.PLACE_CATALOG_PATH,
+                            help='카탈로그 파일 경로 (기본: PLACE_CATALOG_PATH)')
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('PLACE_CATALOG_PATH가 비어 있습니다. --output으로 경로를 지정해주세요.')
+
+        started = time.monotonic()
+        count = write_shared_catalog(options['output'])
+        catalog = CatalogFile(options['output'])
+        size = os.path.getsize(options['output']) / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f'공유 카탈로그 파일 완료! {count}개 (좌표 {catalog.geo_count}개), 버전 {catalog.version}, '
+            f'{size:.1f}MB, {time.monotonic() - started:.2f}초'
+        ))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from places.autocomplete import refresh_shared_catalog
+from places.dedupe import DEFAULT_THRESHOLD, duplicate_summary, find_duplicates, merge_places
+from places.models import Place
+
+
+class Command(BaseCommand):
+    help = '중복 장소(카카오 장소와 TourAPI 장소 등)를 찾아 하나로 병합합니다 (북마크/일정 장소는 남길 장소로 옮김)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='병합하지 않고 중복 후보만 출력')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help=f'같은 장소로 판정할 점수 (0~1, 기본 {DEFAULT_THRESHOLD})')
+        parser.add_argument('--region', type=str, default='', help='지역 제한 (예: 제주)')
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        if not 0 < threshold <= 1:
+            self.stderr.write(self.style.ERROR('--threshold는 0보다 크고 1 이하여야 합니다'))
+            return
+
+        queryset = Place.objects.all()
+        if options['region']:
+            queryset = queryset.filter(region__icontains=options['region'])
+
+        started = time.monotonic()
+        groups = find_duplicates(queryset, threshold=threshold)
+        summary = duplicate_summary(groups)
+        self.stdout.write(f'중복 그룹 {len(summary)}개 ({time.monotonic() - started:.1f}초)')
+
+        for canonical, duplicates in summary:
+            names = ', '.join(f'{place.title}(#{place.id})' for place in duplicates)
+            self.stdout.write(f'  {canonical.title}(#{canonical.id}) <= {names}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('--dry-run: 병합하지 않았습니다'))
+            return
+
+        merged = 0
+        for canonical, duplicates in summary:
+            merge_places([canonical.id, *(place.id for place in duplicates)])
+            merged += len(duplicates)
+        self.stdout.write(self.style.SUCCESS(f'중복 장소 병합 완료: {len(summary)}개 그룹, {merged}개 장소 비활성화'))
+
+        refreshed = refresh_shared_catalog()
+        if refreshed is not None:
+            self.stdout.write(self.style.SUCCESS(f'공유 카탈로그 파일 갱신: {refreshed}개'))
@@ -0,0 +1,47 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from festivals.models import Festival
+from places.autocomplete import refresh_shared_catalog
+from places.models import DataFileManifest, Place
+from utils.catalog_snapshot import SnapshotError, import_snapshot, read_meta
+
+
+class Command(BaseCommand):
+    help = '카탈로그 스냅샷(build_catalog_snapshot)을 DB로 한 번에 가져옵니다 (JSON 파싱/ORM 없이 SQLite에서 직접 복사)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=settings.CATALOG_SNAPSHOT_PATH,
+                            help='스냅샷 파일 경로 (기본: CATALOG_SNAPSHOT_PATH)')
+        parser.add_argument('--clear', action='store_true', help='기존 장소/축제 데이터를 삭제하고 가져옵니다')
+
+    def handle(self, *args, **options):
+        try:
+            meta = read_meta(options['path'])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(f"스냅샷 버전 {meta['version']} ({meta['created_at']}), {json.loads(meta['counts'])}")
+
+        if options['clear']:
+            self.stdout.write('기존 장소/축제 데이터를 삭제하는 중...')
+            Place.objects.all().delete()
+            Festival.objects.all().delete()
+            DataFileManifest.objects.filter(dataset__in=['places', 'festivals']).delete()
+            self.stdout.write(self.style.SUCCESS('기존 데이터 삭제 완료'))
+
+        started = time.monotonic()
+        try:
+            imported = import_snapshot(options['path'])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"가져오기 완료! 장소 {imported['places']}개, 축제 {imported['festivals']}개 추가 "
+            f"({time.monotonic() - started:.2f}초)"
+        ))
+
+        refreshed = refresh_shared_catalog()
+        if refreshed is not None:
+            self.stdout.write(self.style.SUCCESS(f'공유 카탈로그 파일 갱신: {refreshed}개'))
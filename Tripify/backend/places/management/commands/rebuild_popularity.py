@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from festivals.models import Festival
+from places.models import Bookmark, Place
+from trips.models import Itinerary, ItineraryPlace, RegionStats, TravelPlan
+from trips.signals import event_titles
+from utils.catalog_db import atomic_all, same_database
+from utils.data_sync import bulk_update_rows
+
+
+def _count_subquery(queryset, field):
+    """OuterRef('pk')별 행 수 서브쿼리 (없으면 0)"""
+    counts = queryset.filter(**{field: OuterRef('pk')}).values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _update_place_counters_across_databases():
+    """카탈로그 DB를 분리한 경우: 북마크/일정 장소 수를 default DB에서 집계하여 바뀐 장소만 갱신 (갱신 수)"""
+    bookmarks = dict(Bookmark.objects.values('place').annotate(count=Count('pk')).values_list('place', 'count'))
+    itineraries = dict(ItineraryPlace.objects.values('place').annotate(count=Count('pk')).values_list('place', 'count'))
+    rows = []
+    for pk, bookmark_count, itinerary_count in Place.objects.values_list('pk', 'bookmark_count', 'itinerary_count'):
+        counts = {'bookmark_count': bookmarks.get(pk, 0), 'itinerary_count': itineraries.get(pk, 0)}
+        if (bookmark_count, itinerary_count) != (counts['bookmark_count'], counts['itinerary_count']):
+            rows.append((pk, counts))
+    return bulk_update_rows(Place, rows, ['bookmark_count', 'itinerary_count'])
+
+
+class Command(BaseCommand):
+    help = '장소/축제/지역 인기도 카운터를 원본 데이터(북마크, 일정, 여행 계획)로 다시 계산합니다'
+
+    def handle(self, *args, **options):
+        with atomic_all(Place, Festival, Bookmark, ItineraryPlace, RegionStats):
+            # 장소: 북마크 수, 일정 포함 횟수 (같은 DB면 UPDATE 한 번)
+            if same_database(Place, Bookmark, ItineraryPlace):
+                places = Place.objects.update(
+                    bookmark_count=_count_subquery(Bookmark.objects.all(), 'place'),
+                    itinerary_count=_count_subquery(ItineraryPlace.objects.all(), 'place'),
+                )
+            else:
+                places = _update_place_counters_across_databases()
+            self.stdout.write(f'장소 {places}개 카운터 갱신')
+
+            # 축제: 일정의 축제/행사 정보에 포함된 횟수 (시그널과 같은 기준 - 같은 이름, 여행 지역 포함)
+            mentions = Counter()
+            for events_info, region in Itinerary.objects.values_list('events_info', 'travel_plan__region').iterator():
+                for title in event_titles(events_info):
+                    mentions[(title, region)] += 1
+
+            festivals = list(Festival.objects.only('id', 'title', 'region', 'itinerary_count'))
+            by_title = {}
+            for festival in festivals:
+                by_title.setdefault(festival.title, []).append(festival)
+            new_counts = {}
+            for (title, region), count in mentions.items():
+                for festival in by_title.get(title, []):
+                    if not region or region in festival.region:
+                        new_counts[festival.id] = new_counts.get(festival.id, 0) + count
+
+            changed = []
+            for festival in festivals:
+                count = new_counts.get(festival.id, 0)
+                if festival.itinerary_count != count:
+                    festival.itinerary_count = count
+                    changed.append(festival)
+            Festival.objects.bulk_update(changed, ['itinerary_count'], batch_size=500)
+            self.stdout.write(f'축제 {len(festivals)}개 중 {len(changed)}개 카운터 갱신')
+
+            # 지역: 여행 계획 수, 추천 계획 수
+            stats = (
+                TravelPlan.objects.values('region')
+                .annotate(plan_count=Count('id'), recommended_count=Count('id', filter=Q(is_recommended=True)))
+            )
+            RegionStats.objects.all().delete()
+            RegionStats.objects.bulk_create([
+                RegionStats(region=row['region'], plan_count=row['plan_count'], recommended_count=row['recommended_count'])
+                for row in stats if row['region']
+            ])
+            self.stdout.write(f'지역 통계 {RegionStats.objects.count()}개 재생성')
+
+        self.stdout.write(self.style.SUCCESS('인기도 카운터 재계산 완료'))
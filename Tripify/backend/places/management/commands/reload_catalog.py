@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from places.autocomplete import refresh_shared_catalog
+from utils.catalog_db import CATALOG_DB, catalog_target, copy_database
+from utils.tourism_ingest import default_workers
+
+
+RELOAD_DB = 'catalog_reload'
+
+
+class Command(BaseCommand):
+    help = ('카탈로그 DB 복사본에 tourism_data 변경(--sync)과 인기도 카운터를 반영한 뒤 파일을 원자적으로 교체합니다 '
+            '(서비스 프로세스가 카탈로그 DB를 읽기 전용으로 열 때 사용 - 복사 이후 원본에 쓴 내용은 반영되지 않음)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='JSON 파싱/정규화 작업자 프로세스 수 (기본: CPU 코어 수)')
+
+    def handle(self, *args, **options):
+        if CATALOG_DB not in settings.DATABASES:
+            raise CommandError('CATALOG_DB_PATH가 설정되지 않았습니다 (카탈로그 DB를 분리한 경우에만 사용).')
+        path = settings.CATALOG_DB_PATH
+        if not os.path.exists(path):
+            raise CommandError(f'카탈로그 DB 파일이 없습니다: {path} (python manage.py migrate --database=catalog)')
+
+        started = time.monotonic()
+        temp_path = f'{path}.reload'
+        copy_database(path, temp_path)
+        self.stdout.write(f'카탈로그 DB 복사 완료 ({time.monotonic() - started:.2f}초)')
+
+        connections.settings[RELOAD_DB] = {**connections.settings[CATALOG_DB], 'NAME': temp_path}
+        try:
+            with catalog_target(RELOAD_DB):
+                call_command('load_places', sync=True, workers=options['workers'], stdout=self.stdout)
+                call_command('load_festivals', sync=True, workers=options['workers'], stdout=self.stdout)
+                call_command('rebuild_popularity', stdout=self.stdout)
+                refresh_shared_catalog()  # 다시 계산한 인기도 반영
+        except BaseException:
+            connections[RELOAD_DB].close()
+            os.remove(temp_path)
+            raise
+        connections[RELOAD_DB].close()
+
+        # 서비스 프로세스는 다음 요청에서 파일 교체를 감지하고 다시 연결 (utils/catalog_db.py)
+        os.replace(temp_path, path)
+        self.stdout.write(self.style.SUCCESS(f'카탈로그 DB 교체 완료 ({time.monotonic() - started:.2f}초)'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0002_place_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='북마크 수'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='itinerary_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, help_text='여행 일정에 포함된 횟수'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+def _yyyymmdd(value):
+    return value.strftime('%Y%m%d') if value else ''
+
+
+def move_festivals(apps, schema_editor):
+    """
+    Place(place_type='festival') 행을 Festival 테이블로 통합
+
+    Festival에 없는 축제는 Festival로 옮기고, 북마크/일정 장소가 연결되지 않은 축제 장소 행은 삭제합니다.
+    (사용자 데이터가 연결된 행은 남겨 두며, 축제 목록/지도/자동완성은 Festival 테이블만 사용)
+    """
+    Place = apps.get_model('places', 'Place')
+    Festival = apps.get_model('festivals', 'Festival')
+
+    festival_places = Place.objects.filter(place_type='festival').exclude(content_id__startswith='kakao_')
+    if not festival_places.exists():
+        return  # 새로 만든 DB (카탈로그 DB를 분리한 경우 북마크 테이블이 없으므로 아래 JOIN을 실행하지 않음)
+    existing = set(Festival.objects.values_list('content_id', flat=True))
+    Festival.objects.bulk_create([
+        Festival(
+            title=place.title,
+            category=place.category,
+            address=place.address,
+            phone=place.tel,
+            latitude=place.latitude,
+            longitude=place.longitude,
+            image_url=place.image_url,
+            event_start_date=_yyyymmdd(place.event_start_date),
+            event_end_date=_yyyymmdd(place.event_end_date),
+            start_month=place.event_start_date.month if place.event_start_date else None,
+            end_month=place.event_end_date.month if place.event_end_date else None,
+            region=place.region,
+            content_id=place.content_id,
+        )
+        for place in festival_places.iterator() if place.content_id not in existing
+    ], batch_size=500)
+
+    festival_places.filter(bookmarks__isnull=True, itinerary_places__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0003_place_bookmark_count_place_itinerary_count'),
+        ('festivals', '0002_festival_itinerary_count'),
+        ('trips', '0007_regionstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_festivals, migrations.RunPython.noop, hints={'model_name': 'place'}),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0004_move_festivals_to_festival_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='원본 데이터 해시', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='is_active',
+            field=models.BooleanField(db_index=True, default=True, help_text='활성화 여부'),
+        ),
+        migrations.CreateModel(
+            name='DataFileManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(help_text='places / festivals', max_length=20)),
+                ('file_key', models.CharField(help_text='tourism_data 기준 상대 경로', max_length=255)),
+                ('checksum', models.CharField(help_text='파일 SHA-256', max_length=64)),
+                ('scope', models.JSONField(default=dict, help_text='이 파일에서 적재한 행의 조건 (예: place_type, category)')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'data_file_manifests',
+                'unique_together': {('dataset', 'file_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:13
+
+import utils.catalog_db
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0005_place_content_hash_place_is_active_datafilemanifest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookmark',
+            name='place',
+            field=models.ForeignKey(db_constraint=False, on_delete=utils.catalog_db.cross_db_cascade, related_name='bookmarks', to='places.place'),
+        ),
+    ]
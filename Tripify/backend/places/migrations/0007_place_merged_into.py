@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0006_alter_bookmark_place'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, help_text='병합 후 남긴 장소', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_places', to='places.place'),
+        ),
+    ]
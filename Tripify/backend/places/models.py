@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
 
+from utils.catalog_db import cross_db_cascade
+
+
 class Place(models.Model):
     """여행지 모델"""
     PLACE_TYPE_CHOICES = [
@@ -24,6 +27,15 @@ class Place(models.Model):
     region = models.CharField(max_length=100, help_text="지역")
     event_start_date = models.DateField(null=True, blank=True, help_text="행사 시작일")
     event_end_date = models.DateField(null=True, blank=True, help_text="행사 종료일")
+    # 인기도 카운터 (시그널로 갱신, python manage.py rebuild_popularity로 재계산)
+    bookmark_count = models.PositiveIntegerField(default=0, db_index=True, help_text="북마크 수")
+    itinerary_count = models.PositiveIntegerField(default=0, db_index=True, help_text="여행 일정에 포함된 횟수")
+    # 원본 데이터 동기화 (load_places --sync: 원본에서 사라지면 비활성화, 값이 바뀌었는지는 해시로 비교)
+    content_hash = models.CharField(max_length=40, blank=True, help_text="원본 데이터 해시")
+    is_active = models.BooleanField(default=True, db_index=True, help_text="활성화 여부")
+    # 중복 병합(dedupe_places)으로 비활성화된 장소면 남긴 장소 - 재적재해도 다시 만들거나 활성화하지 않음
+    merged_into = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='merged_places', help_text="병합 후 남긴 장소")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -34,11 +46,40 @@ class Place(models.Model):
     def __str__(self):
         return self.title
 
+    def canonical(self):
+        """병합된 장소면 남긴 장소, 아니면 자신"""
+        place = self
+        while place.merged_into_id is not None:
+            place = place.merged_into
+        return place
+
+
+class DataFileManifest(models.Model):
+    """
+    원본 데이터 파일 동기화 기록 (load_places/load_festivals --sync)
+
+    파일 체크섬이 같으면 다음 동기화 때 파일을 건너뛰고, 파일이 사라지면 scope에 해당하는 행을 비활성화합니다.
+    """
+    dataset = models.CharField(max_length=20, help_text="places / festivals")
+    file_key = models.CharField(max_length=255, help_text="tourism_data 기준 상대 경로")
+    checksum = models.CharField(max_length=64, help_text="파일 SHA-256")
+    scope = models.JSONField(default=dict, help_text="이 파일에서 적재한 행의 조건 (예: place_type, category)")
+    row_count = models.PositiveIntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'data_file_manifests'
+        unique_together = ['dataset', 'file_key']
+
+    def __str__(self):
+        return f"{self.dataset}:{self.file_key}"
+
 
 class Bookmark(models.Model):
     """북마크 모델"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookmarks')
-    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='bookmarks')
+    # 장소는 카탈로그 DB에 있을 수 있으므로 DB 외래 키 제약 없이 ORM에서 CASCADE (utils/catalog_db.py)
+    place = models.ForeignKey(Place, on_delete=cross_db_cascade, db_constraint=False, related_name='bookmarks')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -1,5 +1,9 @@
+from datetime import datetime
+
 from rest_framework import serializers
+from festivals.models import Festival
 from .models import Place, Bookmark
+from utils.geocoder import region_of
 import uuid
 
 class PlaceSerializer(serializers.ModelSerializer):
@@ -8,8 +12,49 @@ class PlaceSerializer(serializers.ModelSerializer):
         model = Place
         fields = ['id', 'title', 'place_type', 'address', 'latitude', 'longitude',
                   'description', 'image_url', 'tel', 'content_id', 'region',
-                  'event_start_date', 'event_end_date', 'created_at']
-        read_only_fields = ['id', 'created_at']
+                  'event_start_date', 'event_end_date', 'bookmark_count', 'itinerary_count', 'created_at']
+        read_only_fields = ['id', 'bookmark_count', 'itinerary_count', 'created_at']
+
+
+class FestivalAsPlaceSerializer(serializers.ModelSerializer):
+    """
+    축제를 장소 형식으로 반환하는 Serializer (/api/places/festivals/ 호환용)
+
+    축제 데이터는 Festival 테이블이 기준이며, 기존 장소 응답과 같은 필드/날짜 형식(YYYY-MM-DD)으로 변환합니다.
+    """
+    place_type = serializers.SerializerMethodField()
+    description = serializers.SerializerMethodField()
+    tel = serializers.CharField(source='phone')
+    event_start_date = serializers.SerializerMethodField()
+    event_end_date = serializers.SerializerMethodField()
+    bookmark_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Festival
+        fields = PlaceSerializer.Meta.fields
+
+    def get_place_type(self, obj):
+        return 'festival'
+
+    def get_description(self, obj):
+        return ''
+
+    def get_bookmark_count(self, obj):
+        return 0
+
+    @staticmethod
+    def _iso_date(value):
+        """YYYYMMDD -> YYYY-MM-DD (형식이 다르면 None)"""
+        try:
+            return datetime.strptime(value, '%Y%m%d').date().isoformat()
+        except (TypeError, ValueError):
+            return None
+
+    def get_event_start_date(self, obj):
+        return self._iso_date(obj.event_start_date)
+
+    def get_event_end_date(self, obj):
+        return self._iso_date(obj.event_end_date)
 
 
 class KakaoPlaceCreateSerializer(serializers.Serializer):
@@ -43,18 +88,13 @@ class KakaoPlaceCreateSerializer(serializers.Serializer):
                 'description': f"카카오맵에서 저장된 장소: {validated_data.get('category_name', '')}",
             }
         )
-        return place
+        # 중복 병합된 카카오 장소면 남긴 장소 반환
+        return place.canonical()
     
     def _extract_region(self, address):
-        """주소에서 지역 추출"""
-        # 주소에서 첫 번째 공백 전까지가 지역 (예: "서울특별시 강남구" -> "서울특별시")
-        parts = address.split()
-        if parts:
-            region = parts[0]
-            # "특별시", "광역시", "시", "도" 제거
-            region = region.replace('특별시', '').replace('광역시', '').replace('시', '').replace('도', '')
-            return region
-        return "기타"
+        """주소에서 지역 추출 (시도 정식 명칭, 예: "서울 강남구 ..." -> "서울특별시")"""
+        # 카카오 주소는 "서울", "전북" 등 축약 표기를 쓰므로 적재 데이터와 같은 정식 명칭으로 정규화
+        return region_of(address) or "기타"
     
     def _determine_place_type(self, category_name):
         """카테고리명으로 장소 타입 결정"""
@@ -84,7 +124,7 @@ class BookmarkSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         place_id = validated_data.pop('place_id')
         try:
-            place = Place.objects.get(id=place_id)
+            place = Place.objects.get(id=place_id).canonical()  # 병합된 장소면 남긴 장소를 북마크
         except Place.DoesNotExist:
             raise serializers.ValidationError({'place_id': '존재하지 않는 장소입니다.'})
         
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows - 파일 잠금 없이 각 프로세스가 다시 만듦
+    fcntl = None
+
+
+MAGIC = b'TRIPCAT1'
+HEADER = struct.Struct('<8sI4x')  # 매직, 메타 JSON 길이
+ALIGN = 8
+SOURCES = ['place', 'festival']
+
+# 고정 폭 열 (행 순서: 좌표가 있는 항목 먼저 - 지도 인덱스는 앞쪽 geo_count개를 그대로 사용)
+COLUMNS = [
+    ('source', '<u1'),  # SOURCES 번호
+    ('id', '<i8'),
+    ('type', '<u1'),  # 메타의 types 번호
+    ('region', '<u2'),  # 메타의 regions 번호
+    ('latitude', '<f8'),  # 좌표가 없으면 NaN
+    ('longitude', '<f8'),
+    ('popularity', '<f4'),
+    ('title_offset', '<u4'),  # 제목 바이트 위치 (행 수 + 1개, i번째 제목 = titles[offset[i]:offset[i + 1]])
+]
+
+
+class CatalogFileError(Exception):
+    """카탈로그 파일 형식이 맞지 않음"""
+
+
+def version_key(version):
+    """데이터 버전(data_version 반환값) -> 짧은 문자열 키 (프로세스가 달라도 같은 값)"""
+    return hashlib.md5(repr(version).encode()).hexdigest()[:12]
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_catalog(path, entries, version):
+    """
+    장소/축제 항목 -> 공유 카탈로그 파일 (같은 폴더의 임시 파일에 쓴 뒤 os.replace로 교체)
+
+    entries: [(source, id, title, type, region, latitude, longitude, popularity), ...]
+    교체 전 파일을 매핑한 프로세스는 다음 확인 때까지 이전 파일을 그대로 읽습니다.
+    반환값: 항목 수
+    """
+    entries = sorted(entries, key=lambda entry: entry[5] is None or entry[6] is None)
+    types = sorted({entry[3] for entry in entries})
+    regions = sorted({entry[4] for entry in entries})
+    type_codes = {name: code for code, name in enumerate(types)}
+    region_codes = {name: code for code, name in enumerate(regions)}
+
+    titles = [entry[2].encode('utf-8') for entry in entries]
+    title_offsets = np.zeros(len(entries) + 1, dtype='<u4')
+    np.cumsum([len(title) for title in titles], out=title_offsets[1:])
+    nan = float('nan')
+    arrays = {
+        'source': np.array([SOURCES.index(entry[0]) for entry in entries], dtype='<u1'),
+        'id': np.array([entry[1] for entry in entries], dtype='<i8'),
+        'type': np.array([type_codes[entry[3]] for entry in entries], dtype='<u1'),
+        'region': np.array([region_codes[entry[4]] for entry in entries], dtype='<u2'),
+        'latitude': np.array([nan if entry[5] is None else entry[5] for entry in entries], dtype='<f8'),
+        'longitude': np.array([nan if entry[6] is None else entry[6] for entry in entries], dtype='<f8'),
+        'popularity': np.array([entry[7] for entry in entries], dtype='<f4'),
+        'title_offset': title_offsets,
+    }
+    sections = [(name, arrays[name].tobytes()) for name, _ in COLUMNS] + [('titles', b''.join(titles))]
+
+    # 메타 JSON 길이에 따라 열 위치가 바뀌므로 위치를 정한 뒤 길이가 같아질 때까지 다시 계산
+    meta = {
+        'version': version_key(version),
+        'created_at': timezone.now().isoformat(),
+        'count': len(entries),
+        'geo_count': sum(1 for entry in entries if entry[5] is not None and entry[6] is not None),
+        'types': types,
+        'regions': regions,
+        'sections': {},
+    }
+    meta_bytes = b''
+    while True:
+        offset = _aligned(HEADER.size + len(meta_bytes))
+        for name, data in sections:
+            meta['sections'][name] = [offset, len(data)]
+            offset = _aligned(offset + len(data))
+        encoded = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        if len(encoded) == len(meta_bytes):
+            break
+        meta_bytes = encoded
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.place_catalog.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(meta_bytes)))
+            f.write(meta_bytes)
+            for name, data in sections:
+                f.seek(meta['sections'][name][0])
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(entries)
+
+
+class _LazyColumn:
+    """행 번호 -> 값 (문자열은 읽을 때만 만듦)"""
+
+    def __init__(self, getter, length):
+        self._getter = getter
+        self._length = length
+
+    def __getitem__(self, row):
+        return self._getter(int(row))
+
+    def __len__(self):
+        return self._length
+
+
+class CatalogFile:
+    """
+    읽기 전용 공유 카탈로그 파일 (mmap)
+
+    열은 파일을 그대로 가리키는 NumPy 배열이라 여러 작업자 프로세스가 같은 파일을 매핑하면
+    운영체제 페이지 캐시 한 벌을 함께 사용합니다. 제목/지역/타입 문자열은 필요한 행만 변환합니다.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise CatalogFileError(f'카탈로그 파일이 너무 짧습니다: {path}')
+        magic, meta_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise CatalogFileError(f'카탈로그 파일 형식이 아닙니다: {path}')
+        self.meta = json.loads(self._mmap[HEADER.size:HEADER.size + meta_length].decode('utf-8'))
+
+        count = self.meta['count']
+        self.columns = {}
+        for name, dtype in COLUMNS:
+            offset, length = self.meta['sections'][name]
+            self.columns[name] = np.frombuffer(self._mmap, dtype=dtype, offset=offset,
+                                               count=length // np.dtype(dtype).itemsize)
+        self._titles_offset = self.meta['sections']['titles'][0]
+        if len(self.columns['title_offset']) != count + 1:
+            raise CatalogFileError(f'카탈로그 파일이 손상되었습니다: {path}')
+
+    def __len__(self):
+        return self.meta['count']
+
+    @property
+    def version(self):
+        return self.meta['version']
+
+    @property
+    def geo_count(self):
+        return self.meta['geo_count']
+
+    def title(self, row):
+        offsets = self.columns['title_offset']
+        start = self._titles_offset + int(offsets[row])
+        return self._mmap[start:self._titles_offset + int(offsets[row + 1])].decode('utf-8')
+
+    def source(self, row):
+        return SOURCES[self.columns['source'][row]]
+
+    def titles(self, length=None):
+        return _LazyColumn(self.title, len(self) if length is None else length)
+
+    def sources(self, length=None):
+        return _LazyColumn(self.source, len(self) if length is None else length)
+
+    def entries(self):
+        """autocomplete 항목 형식 [(source, id, title, type, region, latitude, longitude, popularity), ...]"""
+        types, regions = self.meta['types'], self.meta['regions']
+        columns = {name: self.columns[name].tolist() for name, _ in COLUMNS}
+        offsets = columns['title_offset']
+        titles = self._mmap[self._titles_offset:self._titles_offset + offsets[-1]]
+        return [
+            (SOURCES[columns['source'][row]], columns['id'][row], titles[offsets[row]:offsets[row + 1]].decode('utf-8'),
+             types[columns['type'][row]], regions[columns['region'][row]],
+             None if row >= self.geo_count else columns['latitude'][row],
+             None if row >= self.geo_count else columns['longitude'][row],
+             columns['popularity'][row])
+            for row in range(len(self))
+        ]
+
+
+class SharedCatalog:
+    """
+    공유 카탈로그 파일 매핑 관리 (프로세스 단위, 스레드 안전)
+
+    PLACE_CATALOG_PATH 파일이 교체되면(inode/수정 시각 변경) 새 파일을 다시 매핑합니다.
+    파일의 데이터 버전이 DB와 다르면(카카오 장소 저장, 북마크 등) rebuild로 파일을 다시 씁니다.
+    파일 잠금(<경로>.lock)을 잡은 한 프로세스만 다시 쓰고, 나머지는 기다렸다가 새 파일을 매핑하므로
+    작업자마다 DB에서 인덱스를 따로 만들지 않습니다.
+    다시 쓴 뒤에도 버전이 다르면(그 사이 데이터 변경) None을 반환하므로 인덱스는 DB에서 직접 만듭니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._stat = None
+
+    def get(self, version, rebuild=None):
+        """
+        데이터 버전이 같은 카탈로그 파일 (없으면 None)
+
+        rebuild: 파일을 현재 데이터로 다시 쓰는 함수 (파일이 이미 있을 때만 사용 - 없으면 공유 카탈로그를 쓰지 않는 환경)
+        """
+        path = settings.PLACE_CATALOG_PATH
+        if not path:
+            return None
+        catalog = self._open(path)
+        if catalog is not None and catalog.version == version_key(version):
+            return catalog
+        if rebuild is None or not os.path.exists(path):
+            return None
+
+        try:
+            self._rebuild(path, version, rebuild)
+        except OSError as e:
+            print(f'⚠️ 공유 카탈로그 파일을 다시 쓸 수 없습니다: {e}')
+            return None
+        catalog = self._open(path)
+        if catalog is None or catalog.version != version_key(version):
+            return None
+        return catalog
+
+    def _rebuild(self, path, version, rebuild):
+        """파일 잠금을 잡고 아직 버전이 다르면 다시 씀 (다른 프로세스가 쓰는 중이면 끝날 때까지 대기)"""
+        with open(f'{path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                catalog = self._open(path)
+                if catalog is not None and catalog.version == version_key(version):
+                    return  # 기다리는 동안 다른 프로세스가 다시 씀
+                started = time.monotonic()
+                count = rebuild()
+                print(f'✓ 공유 카탈로그 파일 다시 생성: {count}개 ({time.monotonic() - started:.2f}초)')
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _open(self, path):
+        """현재 파일 매핑 (파일이 바뀌었으면 다시 매핑, 없거나 읽을 수 없으면 None)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if file_key != self._stat:
+                try:
+                    self._catalog = CatalogFile(path)
+                except (OSError, ValueError, KeyError, CatalogFileError) as e:
+                    print(f'⚠️ 공유 카탈로그 파일을 열 수 없습니다: {e}')
+                    self._catalog = None
+                self._stat = file_key
+            return self._catalog
+
+
+shared_catalog = SharedCatalog()
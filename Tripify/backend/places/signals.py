@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.counters import bump
+from .models import Bookmark, Place
+
+
+@receiver(post_save, sender=Bookmark)
+def bookmark_created(sender, instance, created, raw=False, **kwargs):
+    """북마크 추가 시 장소의 북마크 수 증가"""
+    if created and not raw:
+        bump(Place.objects.filter(pk=instance.place_id), bookmark_count=1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def bookmark_deleted(sender, instance, **kwargs):
+    """북마크 삭제 시 장소의 북마크 수 감소"""
+    bump(Place.objects.filter(pk=instance.place_id), bookmark_count=-1)
@@ -1,3 +1,212 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.test import TestCase, override_settings
+
+from utils.data_sync import IncrementalSync
+from utils.tourism_ingest import IngestPipeline, _CreateMissingWriter
+from .autocomplete import data_version, write_shared_catalog
+from .dedupe import find_duplicates, merge_places
+from .management.commands.load_places import place_tasks
+from .models import Bookmark, DataFileManifest, Place
+from .shared_catalog import SharedCatalog
+
+
+class BookmarkSessionAuthTest(TestCase):
+    """세션 인증 북마크 생성 (request.user가 SimpleLazyObject일 때 DB 라우터 allow_relation)"""
+    databases = '__all__'  # CATALOG_DB_PATH를 설정했으면 장소는 카탈로그 DB에 저장
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='tester', password='pass1234')
+        self.place = Place.objects.create(title='경복궁', address='서울 종로구', content_id='test-1', region='서울특별시')
+
+    def test_create_bookmark_with_session(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/api/bookmarks/', {'place_id': self.place.id},
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Bookmark.objects.filter(user=self.user, place=self.place).exists())
+
+
+class ReverseGeocodeTest(TestCase):
+    """좌표 -> 행정구역 입력 검증"""
+
+    def test_rejects_non_finite_and_out_of_range(self):
+        for query in ['lat=nan&lng=127', 'lat=37.5&lng=inf', 'lat=91&lng=127', 'lat=37.5&lng=-181', 'lat=abc&lng=127']:
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/places/reverse-geocode/?{query}').status_code, 400)
+
+
+class DedupeTest(TestCase):
+    """중복 장소 탐지/병합 (places/dedupe.py)"""
+    databases = '__all__'
+
+    def _place(self, title, content_id, latitude=37.5665, longitude=126.9780, **fields):
+        return Place.objects.create(title=title, address='주소', content_id=content_id, region='서울특별시',
+                                    latitude=latitude, longitude=longitude, **fields)
+
+    def test_same_name_across_sources_is_duplicate(self):
+        tour = self._place('장생포 고래박물관', '100')
+        kakao = self._place('장생포고래박물관', 'kakao_1', latitude=37.5668)
+        self.assertEqual(find_duplicates(), [sorted([tour.id, kakao.id])])
+
+    def test_distinct_venues_are_not_merged(self):
+        pairs = [
+            ('랜딩관 제주신화월드 호텔 앤 리조트', '메리어트관 제주신화월드 호텔 앤 리조트'),
+            ('더블트리 바이 힐튼 서울 판교', '더블트리 바이 힐튼 서울 판교 레지던스'),
+            ('팔공산금화자연휴양림', '팔공산금화자연휴양림캠핑장'),
+            ('울주해양레포츠센터 야영장', '울주해양레포츠센터'),
+            ('온정여관(사랑채)', '온정여관(안채, 별채)'),
+            ('도동 해안산책로', '저동 해안산책로'),
+        ]
+        for index, (a, b) in enumerate(pairs):
+            with self.subTest(a=a, b=b):
+                Place.objects.all().delete()
+                self._place(a, f'a{index}', tel='064-000-0000')
+                self._place(b, f'kakao_b{index}', tel='064-000-0000')
+                self.assertEqual(find_duplicates(), [])
+
+    def test_merge_deactivates_duplicates_and_moves_bookmarks(self):
+        user = get_user_model().objects.create_user(username='tester', password='pass1234')
+        canonical = self._place('경복궁', '200', image_url='https://example.com/a.jpg')
+        duplicate = self._place('경복궁', 'kakao_2', tel='02-000-0000')
+        Bookmark.objects.create(user=user, place=duplicate)
+
+        kept = merge_places([canonical.id, duplicate.id])
+
+        duplicate.refresh_from_db()
+        self.assertEqual(kept.id, canonical.id)
+        self.assertEqual(kept.tel, '02-000-0000')
+        self.assertEqual(kept.bookmark_count, 1)
+        self.assertFalse(duplicate.is_active)
+        self.assertEqual(duplicate.merged_into_id, canonical.id)
+        self.assertTrue(Bookmark.objects.filter(user=user, place=canonical).exists())
+        self.assertEqual(duplicate.canonical().id, canonical.id)
+
+    def test_reload_keeps_merged_duplicates_inactive(self):
+        canonical = self._place('경복궁', '300')
+        duplicate = self._place('경복궁', '301')
+        merge_places([canonical.id, duplicate.id])
+        row = {'content_id': '301', 'title': '경복궁', 'address': '주소', 'region': '서울특별시'}
+
+        writer = _CreateMissingWriter(Place)
+        writer.write(SimpleNamespace(file_key='places/a.json'), [row])
+        self.assertEqual(writer.files['places/a.json']['created'], 0)
+        self.assertEqual(writer.files['places/a.json']['skipped'], 1)
+
+        sync = IncrementalSync(Place, 'places')
+        self.assertEqual(sync.apply_batch('places/a.json', [row]), (0, 0))
+        duplicate.refresh_from_db()
+        self.assertFalse(duplicate.is_active)
+        self.assertEqual(find_duplicates(), [])
+
+
+class SharedCatalogTest(TestCase):
+    """공유 카탈로그 파일 버전이 DB와 다르면 파일을 다시 써서 계속 사용"""
+    databases = '__all__'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'place_catalog.bin')
+        Place.objects.create(title='경복궁', address='서울 종로구', content_id='400', region='서울특별시',
+                             latitude=37.5796, longitude=126.9770)
+
+    def test_rebuilds_stale_file(self):
+        with override_settings(PLACE_CATALOG_PATH=self.path):
+            write_shared_catalog()
+            catalog = SharedCatalog()
+            self.assertEqual(len(catalog.get(data_version())), 1)
+
+            Place.objects.create(title='kakao 장소', address='서울', content_id='kakao_400', region='서울특별시')
+            version = data_version()
+            self.assertIsNone(catalog.get(version))
+            rebuilt = catalog.get(version, rebuild=write_shared_catalog)
+            self.assertEqual(len(rebuilt), 2)
+            self.assertEqual(len(SharedCatalog().get(version)), 2)  # 다른 작업자는 다시 쓴 파일을 그대로 사용
+
+    def test_missing_file_is_not_created(self):
+        with override_settings(PLACE_CATALOG_PATH=self.path):
+            self.assertIsNone(SharedCatalog().get(data_version(), rebuild=write_shared_catalog))
+            self.assertFalse(os.path.exists(self.path))
+
+
+class IncrementalSyncTest(TestCase):
+    """tourism_data 증분 동기화 (load_places --sync)"""
+    databases = '__all__'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        os.makedirs(os.path.join(self.root, '관광지'))
+
+    def _write(self, name, items):
+        with open(os.path.join(self.root, '관광지', name), 'w', encoding='utf-8') as f:
+            json.dump([
+                {'id': content_id, 'title': title, 'address': '서울특별시 종로구', 'latitude': '37.57',
+                 'longitude': '126.97'}
+                for content_id, title in items
+            ], f, ensure_ascii=False)
+
+    def _sync(self):
+        tasks, folders, _ = place_tasks(self.root)
+        pipeline = IngestPipeline(Place, 'places', StringIO(), no_style(), sync=True)
+        pipeline.run(tasks, folders)
+        return pipeline.writer.sync.stats
+
+    def _active(self):
+        return dict(Place.objects.filter(is_active=True).values_list('content_id', 'title'))
+
+    def test_changed_file_updates_and_deactivates_missing_rows(self):
+        self._write('강.json', [('1', '한강'), ('2', '낙동강')])
+        self.assertEqual(self._sync()['created'], 2)
+        before = Place.objects.get(content_id='1').updated_at
+
+        self._write('강.json', [('1', '한강공원')])
+        stats = self._sync()
+        self.assertEqual((stats['updated'], stats['deactivated']), (1, 1))
+        self.assertEqual(self._active(), {'1': '한강공원'})
+        updated = Place.objects.get(content_id='1')
+        self.assertGreater(updated.updated_at, before)  # 직접 UPDATE에서도 데이터 버전 갱신
+        self.assertEqual(float(updated.latitude), 37.57)
+        self.assertEqual(DataFileManifest.objects.get(file_key='관광지/강.json').row_count, 1)
+
+        self.assertEqual(self._sync()['skipped_files'], 1)
+
+    def test_removed_file_deactivates_its_rows(self):
+        self._write('강.json', [('1', '한강')])
+        self._write('계곡.json', [('2', '백운계곡')])
+        self._sync()
+        kakao = Place.objects.create(title='카카오 계곡', address='서울', content_id='kakao_9', region='서울특별시',
+                                     place_type='tourist', category='계곡')
+
+        os.remove(os.path.join(self.root, '관광지', '계곡.json'))
+        self.assertEqual(self._sync()['removed_files'], 1)
+        self.assertEqual(self._active(), {'1': '한강', 'kakao_9': '카카오 계곡'})
+        self.assertFalse(DataFileManifest.objects.filter(file_key='관광지/계곡.json').exists())
+        kakao.refresh_from_db()
+        self.assertTrue(kakao.is_active)
+
+    def test_failed_file_keeps_previous_manifest(self):
+        self._write('강.json', [('1', '한강'), ('2', '낙동강')])
+        self._sync()
+        checksum = DataFileManifest.objects.get(file_key='관광지/강.json').checksum
+
+        self._write('강.json', [('1', '한강공원')])
+        with mock.patch('utils.data_sync.bulk_update_rows', side_effect=RuntimeError('쓰기 실패')):
+            stats = self._sync()
+        self.assertEqual(stats['deactivated'], 0)
+        self.assertEqual(DataFileManifest.objects.get(file_key='관광지/강.json').checksum, checksum)
+        self.assertEqual(self._active(), {'1': '한강', '2': '낙동강'})
+
+        # 다음 동기화 때 다시 읽음
+        self.assertEqual(self._sync()['updated'], 1)
+        self.assertEqual(self._active(), {'1': '한강공원'})
@@ -1,20 +1,41 @@
+import math
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from .autocomplete import place_autocomplete
+from .geo_index import MAP_TYPES, MAX_ZOOM, MIN_ZOOM, place_map, tiles_for_bbox
+from utils.geocoder import reverse_geocode
 from .models import Place, Bookmark
-from .serializers import PlaceSerializer, BookmarkSerializer, KakaoPlaceCreateSerializer
+from .serializers import PlaceSerializer, BookmarkSerializer, KakaoPlaceCreateSerializer, FestivalAsPlaceSerializer
+from festivals.models import Festival
+from django.conf import settings
+from django.db import router
 from django.db.models import Q
+from utils.catalog_db import is_readonly
+
+
+# ?ordering=popular 정렬 기준 (미리 집계된 카운터 사용)
+POPULAR_ORDERING = ['-bookmark_count', '-itinerary_count', '-created_at']
+
+
+def _apply_ordering(queryset, request):
+    """?ordering=popular면 인기순(북마크 수, 일정 포함 횟수)으로 정렬"""
+    if request.query_params.get('ordering') == 'popular':
+        return queryset.order_by(*POPULAR_ORDERING)
+    return queryset
 
 
 class PlaceViewSet(viewsets.ReadOnlyModelViewSet):
     """장소 ViewSet"""
-    queryset = Place.objects.all()
+    queryset = Place.objects.filter(is_active=True)
     serializer_class = PlaceSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        queryset = Place.objects.all()
+        # 원본 데이터에서 사라진 장소(load_places --sync로 비활성화)는 제외 (북마크/일정에서는 계속 조회됨)
+        queryset = Place.objects.filter(is_active=True)
 
         # 검색어 필터링
         search = self.request.query_params.get('search', None)
@@ -35,28 +56,112 @@ class PlaceViewSet(viewsets.ReadOnlyModelViewSet):
         if place_type:
             queryset = queryset.filter(place_type=place_type)
 
-        return queryset
+        return _apply_ordering(queryset, self.request)
 
     @action(detail=False, methods=['get'], url_path='festivals')
     def festivals(self, request):
-        """축제/행사 목록 조회"""
+        """
+        축제/행사 목록 조회 (호환용 - Festival 테이블을 장소 형식으로 반환)
+
+        새 화면은 /api/festivals/를 사용합니다.
+        """
         month = request.query_params.get('month', None)
         region = request.query_params.get('region', None)
 
-        queryset = Place.objects.filter(place_type='festival')
+        queryset = Festival.objects.filter(is_active=True)
 
         if month:
-            queryset = queryset.filter(
-                Q(event_start_date__month=month) |
-                Q(event_end_date__month=month)
-            )
+            try:
+                month = int(month)
+            except ValueError:
+                return Response({'error': 'month는 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(Q(start_month=month) | Q(end_month=month))
 
         if region:
             queryset = queryset.filter(region__icontains=region)
 
-        serializer = self.get_serializer(queryset, many=True)
+        if request.query_params.get('ordering') == 'popular':
+            queryset = queryset.order_by('-itinerary_count', 'start_month', 'title')
+        serializer = FestivalAsPlaceSerializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        """
+        장소/축제 이름 자동완성 (메모리 인덱스)
+
+        ?q=경복 또는 초성 ?q=ㄱㅂㄱ, ?type=tourist|restaurant|accommodation|festival, ?region=, ?limit= (최대 30)
+        """
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit은 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = place_autocomplete.search(
+            request.query_params.get('q', ''),
+            place_type=request.query_params.get('type', ''),
+            region=request.query_params.get('region', ''),
+            limit=limit,
+        )
+        return Response(results)
+
+    @action(detail=False, methods=['get'], url_path='map')
+    def map(self, request):
+        """
+        지도 영역 마커 (서버 집계 클러스터)
+
+        ?bbox=최소경도,최소위도,최대경도,최대위도&zoom=(1~20, 클수록 확대)&type=tourist,festival
+        zoom이 MAP_CLUSTER_MAX_ZOOM 이하면 클러스터, 그보다 크면 개별 장소를 반환합니다.
+        zoom은 웹 지도 타일 줌(타일 한 변 = 360 / 2^zoom 도)으로, 카카오맵 level(작을수록 확대)과 방향이 반대입니다.
+        level을 그대로 넘기면 클러스터 단위가 뒤바뀌거나 타일 수 초과(400)가 되므로
+        bbox 경도 폭에 맞춰 계산하세요 (예: zoom = floor(log2(360 / 경도 폭)) + 1).
+        """
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(value) for value in request.query_params.get('bbox', '').split(','))
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({'error': 'bbox(최소경도,최소위도,최대경도,최대위도)와 zoom을 올바르게 입력해주세요.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            return Response({'error': 'bbox 범위가 올바르지 않습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            return Response({'error': f'zoom은 {MIN_ZOOM}~{MAX_ZOOM} 사이여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = [value for value in request.query_params.get('type', '').split(',') if value] or MAP_TYPES
+        invalid = [value for value in types if value not in MAP_TYPES]
+        if invalid:
+            return Response({'error': f'지원하지 않는 type입니다: {", ".join(invalid)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(tiles_for_bbox(min_lng, min_lat, max_lng, max_lat, zoom)) > settings.MAP_MAX_TILES:
+            return Response({'error': '조회 영역이 너무 넓습니다. 지도를 확대하거나 zoom을 낮춰주세요.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(place_map.query(min_lng, min_lat, max_lng, max_lat, zoom, types))
+
+    @action(detail=False, methods=['get'], url_path='reverse-geocode')
+    def reverse_geocode(self, request):
+        """좌표 -> 행정구역 (?lat=&lng=, 외부 API 호출 없이 오프라인 조회)"""
+        try:
+            latitude = float(request.query_params.get('lat', ''))
+            longitude = float(request.query_params.get('lng', ''))
+        except ValueError:
+            return Response({'error': 'lat, lng를 숫자로 입력해주세요.'}, status=status.HTTP_400_BAD_REQUEST)
+        # float()는 nan/inf도 받으므로 범위까지 확인 (NaN은 비교가 항상 False)
+        if not (math.isfinite(latitude) and math.isfinite(longitude)
+                and -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({'error': 'lat은 -90~90, lng는 -180~180 사이여야 합니다.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        area = reverse_geocode(latitude, longitude)
+        if area is None:
+            return Response({'error': '해당 좌표의 행정구역을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'sido': area.sido,
+            'sigungu': area.sigungu,
+            'address': f'{area.sido} {area.sigungu}'.strip(),
+        })
+
 
 class BookmarkViewSet(viewsets.ModelViewSet):
     """북마크 ViewSet"""
@@ -78,6 +183,13 @@ class BookmarkViewSet(viewsets.ModelViewSet):
 @permission_classes([IsAuthenticated])
 def create_place_from_kakao(request):
     """카카오맵 장소를 Place로 저장"""
+    if is_readonly(router.db_for_write(Place)):
+        # 카탈로그 DB를 읽기 전용으로 연 서비스 프로세스: 이미 저장된 장소만 반환
+        existing = Place.objects.filter(content_id=f"kakao_{request.data.get('id', '')}").first()
+        if existing is not None:
+            return Response(PlaceSerializer(existing.canonical()).data, status=status.HTTP_200_OK)
+        return Response({'error': '지금은 새 장소를 저장할 수 없습니다. 잠시 후 다시 시도해주세요.'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
     try:
         serializer = KakaoPlaceCreateSerializer(data=request.data)
         if serializer.is_valid():
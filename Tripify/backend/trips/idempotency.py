@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class _Flight:
+    """처리 중인 요청 1건 (같은 키의 후속 요청은 done 이벤트를 기다림)"""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result = None  # (status_code, data)
+
+
+# 이 프로세스에서 처리 중인 요청 (캐시 키 -> _Flight)
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _fingerprint(data):
+    """요청 본문 지문 (같은 키로 다른 내용을 보내는 경우 구분)"""
+    body = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def _replay(result):
+    """저장된 결과로 응답 생성"""
+    status_code, data = result
+    response = Response(data, status=status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _mismatch_response():
+    return Response({
+        'error': '같은 Idempotency-Key로 다른 내용의 요청을 보낼 수 없습니다.'
+    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+def _in_progress_response():
+    response = Response({
+        'error': '같은 요청이 아직 처리 중입니다. 잠시 후 다시 시도해주세요.'
+    }, status=status.HTTP_409_CONFLICT)
+    response['Retry-After'] = str(settings.LLM_RETRY_AFTER_SECONDS)
+    return response
+
+
+def idempotent(request, scope, handler):
+    """
+    Idempotency-Key 헤더가 있는 요청을 한 번만 처리
+
+    - 같은 키의 요청이 처리 중이면 (같은 프로세스) 끝날 때까지 기다렸다가 같은 결과 반환
+    - 완료된 결과(2xx)는 IDEMPOTENCY_TTL_SECONDS 동안 캐시에 보관하여 재요청 시 그대로 반환
+    - 다른 프로세스에서 처리 중이면 409, 같은 키에 다른 본문이면 422
+    헤더가 없으면 handler()를 그대로 실행합니다. (scope: 'generate', 'modify:<id>' 등 엔드포인트 구분)
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        return Response({
+            'error': f'Idempotency-Key는 {MAX_KEY_LENGTH}자 이하여야 합니다.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    cache_key = f'idempotency:{request.user.pk}:{scope}:{key}'
+    lock_key = f'{cache_key}:lock'
+    fingerprint = _fingerprint(request.data)
+
+    # 완료된 요청이면 저장된 결과 반환
+    stored = cache.get(cache_key)
+    if stored is not None:
+        if stored['fingerprint'] != fingerprint:
+            return _mismatch_response()
+        return _replay(stored['result'])
+
+    # 같은 프로세스에서 처리 중이면 합류
+    with _flights_lock:
+        flight = _flights.get(cache_key)
+        leader = flight is None
+        if leader:
+            flight = _flights[cache_key] = _Flight(fingerprint)
+
+    if not leader:
+        if flight.fingerprint != fingerprint:
+            return _mismatch_response()
+        print(f'⏳ 처리 중인 동일 요청 대기 (Idempotency-Key: {key})')
+        if not flight.done.wait(settings.IDEMPOTENCY_WAIT_SECONDS) or flight.result is None:
+            return _in_progress_response()
+        return _replay(flight.result)
+
+    try:
+        # 다른 프로세스에서 처리 중인지 확인 (공유 캐시를 사용하는 경우)
+        # 잠금은 대기 시간이 아니라 생성이 끝날 때까지 유지 (끝나면 finally에서 삭제, 프로세스가 죽으면 만료)
+        if not cache.add(lock_key, True, timeout=settings.IDEMPOTENCY_LOCK_SECONDS):
+            return _in_progress_response()
+        try:
+            response = handler()
+            flight.result = (response.status_code, response.data)
+            if status.is_success(response.status_code):
+                cache.set(cache_key, {
+                    'fingerprint': fingerprint,
+                    'result': flight.result,
+                }, timeout=settings.IDEMPOTENCY_TTL_SECONDS)
+            return response
+        finally:
+            cache.delete(lock_key)
+    finally:
+        with _flights_lock:
+            _flights.pop(cache_key, None)
+        flight.done.set()
+
@@ -0,0 +1,143 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.sqlite_tuning import pragma_statements
+
+
+SCHEMA = [
+    'CREATE TABLE plans (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, region TEXT NOT NULL, '
+    'itinerary TEXT NOT NULL, created_at REAL NOT NULL)',
+    'CREATE INDEX plans_user ON plans (user_id)',
+    'CREATE TABLE region_stats (region TEXT PRIMARY KEY, plan_count INTEGER NOT NULL)',
+]
+REGIONS = ['서울특별시', '부산광역시', '제주특별자치도', '강원특별자치도', '전라남도']
+USERS = 200
+
+# 비교할 설정 - default: 지금까지의 Django 기본값 (요청마다 새 연결, 롤백 저널, DEFERRED 트랜잭션)
+PROFILES = {
+    'default': {'persistent': False, 'begin': 'BEGIN', 'pragmas': []},
+    'tuned': {'persistent': True, 'begin': 'BEGIN IMMEDIATE', 'pragmas': None},  # None: settings의 SQLITE_* 사용
+}
+
+
+def _connect(path, profile):
+    # Django SQLite 백엔드처럼 Python sqlite3 기본 timeout(5초)으로 연결하고 트랜잭션은 직접 시작
+    conn = sqlite3.connect(path, isolation_level=None)
+    for statement in profile['pragmas']:
+        conn.execute(statement)
+    return conn
+
+
+def _request(conn, profile, rng, write, payload):
+    """요청 하나 - 쓰기: 생성/수정 API처럼 조회 후 일정 저장 + 지역 통계 갱신, 읽기: 사용자 계획 목록"""
+    user_id = rng.randrange(USERS)
+    if not write:
+        conn.execute('SELECT id, region, created_at FROM plans WHERE user_id = ? ORDER BY id DESC LIMIT 20',
+                      (user_id,)).fetchall()
+        return
+    region = rng.choice(REGIONS)
+    conn.execute(profile['begin'])
+    try:
+        conn.execute('SELECT COUNT(*) FROM plans WHERE user_id = ?', (user_id,)).fetchone()
+        conn.execute('INSERT INTO plans (user_id, region, itinerary, created_at) VALUES (?, ?, ?, ?)',
+                     (user_id, region, payload, time.time()))
+        conn.execute('UPDATE region_stats SET plan_count = plan_count + 1 WHERE region = ?', (region,))
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+
+
+def _worker(args):
+    path, profile, requests, write_ratio, payload, seed = args
+    rng = random.Random(seed)
+    results = []  # (쓰기 여부, 초, 오류)
+    conn = _connect(path, profile) if profile['persistent'] else None
+    for _ in range(requests):
+        write = rng.random() < write_ratio
+        started = time.perf_counter()
+        error = ''
+        try:
+            if conn is None:
+                request_conn = _connect(path, profile)
+                try:
+                    _request(request_conn, profile, rng, write, payload)
+                finally:
+                    request_conn.close()
+            else:
+                _request(conn, profile, rng, write, payload)
+        except sqlite3.OperationalError as e:
+            error = str(e)
+        results.append((write, time.perf_counter() - started, error))
+    if conn is not None:
+        conn.close()
+    return results
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = ('SQLite 동시 요청 벤치마크: 기본 설정과 튜닝 설정(WAL, synchronous, busy_timeout, mmap/cache, '
+            'IMMEDIATE 트랜잭션, 연결 재사용)을 임시 DB에서 비교합니다 (실제 DB는 건드리지 않음)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='동시 작업자 프로세스 수 (기본: 4)')
+        parser.add_argument('--requests', type=int, default=300, help='작업자별 요청 수 (기본: 300)')
+        parser.add_argument('--write-ratio', type=float, default=0.3, help='쓰기 요청 비율 (기본: 0.3)')
+        parser.add_argument('--payload-kb', type=int, default=8, help='저장하는 일정 JSON 크기 KB (기본: 8)')
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES),
+                            help='비교할 설정')
+
+    def handle(self, *args, **options):
+        payload = json.dumps({'days': ['x' * 1024] * options['payload_kb']})
+        self.stdout.write(
+            f"작업자 {options['processes']}개 x 요청 {options['requests']}개, 쓰기 {options['write_ratio']:.0%}, "
+            f"일정 {len(payload) // 1024}KB"
+        )
+        self.stdout.write(f"{'설정':<8} {'처리량':>10} {'쓰기 p50':>9} {'p95':>8} {'p99':>8} "
+                          f"{'읽기 p95':>9} {'잠금 오류':>9}")
+
+        for name in options['profiles']:
+            profile = dict(PROFILES[name])
+            if profile['pragmas'] is None:
+                profile['pragmas'] = pragma_statements()
+            with tempfile.TemporaryDirectory(prefix='tripify-bench-') as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                setup = _connect(path, profile)
+                for statement in SCHEMA:
+                    setup.execute(statement)
+                setup.executemany('INSERT INTO region_stats (region, plan_count) VALUES (?, 0)',
+                                  [(region,) for region in REGIONS])
+                setup.close()
+
+                jobs = [(path, profile, options['requests'], options['write_ratio'], payload, seed)
+                        for seed in range(options['processes'])]
+                started = time.perf_counter()
+                with multiprocessing.Pool(options['processes']) as pool:
+                    results = [row for rows in pool.map(_worker, jobs) for row in rows]
+                elapsed = time.perf_counter() - started
+
+            writes = [seconds * 1000 for write, seconds, error in results if write and not error]
+            reads = [seconds * 1000 for write, seconds, error in results if not write and not error]
+            errors = [error for _, _, error in results if error]
+            self.stdout.write(
+                f'{name:<8} {len(results) / elapsed:>8.0f}/s {statistics.median(writes or [0]):>7.2f}ms '
+                f'{_percentile(writes, 95):>6.2f}ms {_percentile(writes, 99):>6.2f}ms '
+                f'{_percentile(reads, 95):>7.2f}ms {len(errors):>9}'
+            )
+            for error in sorted(set(errors)):
+                self.stdout.write(self.style.WARNING(f'  - {error}: {errors.count(error)}회'))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0006_wishlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(help_text='여행 지역', max_length=100, unique=True)),
+                ('plan_count', models.PositiveIntegerField(default=0, help_text='여행 계획 수')),
+                ('recommended_count', models.PositiveIntegerField(default=0, help_text='추천된 여행 계획 수')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'region_stats',
+                'ordering': ['-recommended_count', '-plan_count'],
+            },
+        ),
+    ]
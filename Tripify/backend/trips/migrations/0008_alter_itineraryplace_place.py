@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:13
+
+import utils.catalog_db
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0006_alter_bookmark_place'),
+        ('trips', '0007_regionstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='itineraryplace',
+            name='place',
+            field=models.ForeignKey(db_constraint=False, on_delete=utils.catalog_db.cross_db_cascade, related_name='itinerary_places', to='places.place'),
+        ),
+    ]
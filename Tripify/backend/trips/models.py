@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from places.models import Place
+from utils.catalog_db import cross_db_cascade
 
 class TravelPlan(models.Model):
     """여행 계획 모델"""
@@ -37,6 +38,21 @@ class TravelPlan(models.Model):
         return f"{self.title} ({self.user.username})"
 
 
+class RegionStats(models.Model):
+    """지역별 여행 계획 통계 (시그널로 갱신, python manage.py rebuild_popularity로 재계산)"""
+    region = models.CharField(max_length=100, unique=True, help_text="여행 지역")
+    plan_count = models.PositiveIntegerField(default=0, help_text="여행 계획 수")
+    recommended_count = models.PositiveIntegerField(default=0, help_text="추천된 여행 계획 수")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'region_stats'
+        ordering = ['-recommended_count', '-plan_count']
+
+    def __str__(self):
+        return f"{self.region} (계획 {self.plan_count}, 추천 {self.recommended_count})"
+
+
 class Itinerary(models.Model):
     """여행 일정 모델 (일차별 계획)"""
     travel_plan = models.ForeignKey(TravelPlan, on_delete=models.CASCADE, related_name='itineraries')
@@ -66,7 +82,8 @@ class Itinerary(models.Model):
 class ItineraryPlace(models.Model):
     """일정별 장소 모델"""
     itinerary = models.ForeignKey(Itinerary, on_delete=models.CASCADE, related_name='places')
-    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='itinerary_places')
+    # 장소는 카탈로그 DB에 있을 수 있으므로 DB 외래 키 제약 없이 ORM에서 CASCADE (utils/catalog_db.py)
+    place = models.ForeignKey(Place, on_delete=cross_db_cascade, db_constraint=False, related_name='itinerary_places')
     order = models.IntegerField(help_text="방문 순서")
     visit_time = models.TimeField(null=True, blank=True, help_text="방문 시간")
     duration = models.IntegerField(null=True, blank=True, help_text="체류 시간 (분)")
@@ -0,0 +1,245 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import time as dt_time
+
+from django.conf import settings
+
+from places.models import Place
+from utils.counters import bump
+from .models import ItineraryPlace
+
+
+# 일정 항목 종류별 매칭할 장소 타입 (앞쪽 타입 우선)
+KIND_PLACE_TYPES = {
+    'attraction': ('tourist', 'festival'),
+    'meal': ('restaurant',),
+    'accommodation': ('accommodation',),
+}
+MEAL_ORDER = ['아침', '점심', '저녁']
+
+CONTAINMENT_MIN_LENGTH = 3  # 이름이 이 길이 이상일 때만 포함 관계를 일치로 인정
+
+_PARENTHESES = re.compile(r'\([^)]*\)|\[[^\]]*\]|\{[^}]*\}|（[^）]*）')
+_NON_WORD = re.compile(r'[^0-9a-z가-힣]')
+_TIME = re.compile(r'(\d{1,2}):(\d{2})')
+_HOURS = re.compile(r'(\d+(?:\.\d+)?)\s*시간')
+_MINUTES = re.compile(r'(\d+)\s*분')
+
+
+def normalize_name(name):
+    """비교용 장소명 (괄호 안 내용, 공백, 문장부호 제거 + 소문자)"""
+    if not isinstance(name, str):
+        return ''
+    return _NON_WORD.sub('', _PARENTHESES.sub('', name).lower())
+
+
+def _bigrams(text):
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def parse_visit_time(value):
+    """"09:00" 형식 방문 시간 (형식이 다르면 None)"""
+    match = _TIME.search(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return dt_time(hour, minute)
+
+
+def parse_duration(value):
+    """"2시간", "1.5시간", "1시간 30분", "30분" 형식 체류 시간 (분, 형식이 다르면 None)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    hours = _HOURS.search(value)
+    minutes = _MINUTES.search(value)
+    if not hours and not minutes:
+        return None
+    total = float(hours.group(1)) * 60 if hours else 0
+    total += int(minutes.group(1)) if minutes else 0
+    return int(round(total))
+
+
+class RegionPlaceIndex:
+    """
+    한 지역 장소의 이름 검색 인덱스
+
+    정규화한 이름 -> 장소 사전(정확히 일치)과 이름 2-gram 역색인(비슷한 이름)을 보관합니다.
+    비슷한 이름은 2-gram Dice 계수와 포함 관계 중 높은 점수로 비교합니다.
+    """
+
+    def __init__(self, region):
+        self.region = region
+        rows = list(
+            Place.objects.filter(region__icontains=region, is_active=True)
+            .values_list('id', 'title', 'place_type', 'latitude', 'longitude')
+        )
+        self.ids = [row[0] for row in rows]
+        self.types = [row[2] for row in rows]
+        self.names = [normalize_name(row[1]) for row in rows]
+        self.has_coords = [row[3] is not None and row[4] is not None for row in rows]
+
+        self.exact = defaultdict(list)  # 정규화한 이름 -> 행 번호 목록
+        self.postings = defaultdict(list)  # 2-gram -> 행 번호 목록
+        self.gram_counts = []
+        for index, name in enumerate(self.names):
+            if not name:
+                self.gram_counts.append(0)
+                continue
+            self.exact[name].append(index)
+            grams = _bigrams(name)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(index)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _type_rank(self, index, place_types):
+        return place_types.index(self.types[index]) if self.types[index] in place_types else None
+
+    def match(self, name, place_types, min_score):
+        """이름이 가장 비슷한 장소 (장소 id, 점수) - 기준 점수 미만이면 (None, 0)"""
+        query = normalize_name(name)
+        if not query:
+            return None, 0
+
+        exact = [index for index in self.exact.get(query, []) if self._type_rank(index, place_types) is not None]
+        if exact:
+            best = min(exact, key=lambda index: (self._type_rank(index, place_types), not self.has_coords[index]))
+            return self.ids[best], 1.0
+
+        grams = _bigrams(query)
+        overlaps = Counter()
+        for gram in grams:
+            overlaps.update(self.postings.get(gram, ()))
+
+        best_key, best_index, best_score = None, None, 0
+        for index, overlap in overlaps.items():
+            type_rank = self._type_rank(index, place_types)
+            if type_rank is None:
+                continue
+            score = 2 * overlap / (len(grams) + self.gram_counts[index])
+            candidate = self.names[index]
+            shorter, longer = sorted((query, candidate), key=len)
+            if len(shorter) >= CONTAINMENT_MIN_LENGTH and shorter in longer:
+                score = max(score, 0.5 + 0.5 * len(shorter) / len(longer))
+            key = (score, -type_rank, self.has_coords[index])
+            if best_key is None or key > best_key:
+                best_key, best_index, best_score = key, index, score
+
+        if best_index is None or best_score < min_score:
+            return None, 0
+        return self.ids[best_index], round(best_score, 3)
+
+
+class PlaceResolver:
+    """
+    일정 항목(관광지/식당/숙소) 이름 -> Place 매칭 (프로세스 단위, 스레드 안전)
+
+    지역별 인덱스는 PLACE_RESOLVER_CACHE_SECONDS 동안 재사용합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._regions = {}  # 지역 -> (구성 시각, RegionPlaceIndex)
+
+    def index(self, region):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._regions.get(region)
+        if cached is not None and now - cached[0] < settings.PLACE_RESOLVER_CACHE_SECONDS:
+            return cached[1]
+
+        index = RegionPlaceIndex(region)
+        with self._lock:
+            self._regions[region] = (now, index)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._regions = {}
+
+    def resolve(self, region, name, kind):
+        """지역 내에서 이름이 일치하는 장소 id (없으면 None)"""
+        if not region or not name:
+            return None
+        place_id, _ = self.index(region).match(name, KIND_PLACE_TYPES[kind], settings.PLACE_RESOLVER_MIN_SCORE)
+        return place_id
+
+
+place_resolver = PlaceResolver()
+
+
+def _day_items(itinerary):
+    """
+    일정 하루의 장소 항목 [(종류, 이름, 방문 시간, 체류 시간, 메모), ...]
+
+    관광지(일정 순서), 식사(아침/점심/저녁), 숙소 순서입니다.
+    """
+    items = []
+    for attraction in itinerary.attractions or []:
+        if isinstance(attraction, dict):
+            items.append(('attraction', attraction.get('name'), parse_visit_time(attraction.get('time')),
+                          parse_duration(attraction.get('duration')), attraction.get('description') or ''))
+        elif isinstance(attraction, str):
+            items.append(('attraction', attraction, None, None, ''))
+
+    meals_info = itinerary.meals_info
+    if isinstance(meals_info, dict):
+        meals = sorted(meals_info.items(), key=lambda item: MEAL_ORDER.index(item[0]) if item[0] in MEAL_ORDER else len(MEAL_ORDER))
+        for meal_name, meal in meals:
+            if isinstance(meal, dict):
+                items.append(('meal', meal.get('restaurant'), parse_visit_time(meal.get('time')), None, f'{meal_name} 식사'))
+
+    accommodation_info = itinerary.accommodation_info
+    if isinstance(accommodation_info, dict):
+        items.append(('accommodation', accommodation_info.get('name'),
+                      parse_visit_time(accommodation_info.get('check_in')), None, '숙박'))
+    return items
+
+
+def create_itinerary_places(region, itineraries):
+    """
+    일정별 장소(ItineraryPlace) 일괄 생성
+
+    저장된 일정의 관광지/식사/숙소 정보로 매칭하며, 장소와 매칭되지 않은 항목은 건너뜁니다.
+    bulk_create는 시그널을 보내지 않으므로 장소의 일정 포함 횟수는 여기서 한 번에 반영합니다.
+    생성한 ItineraryPlace 수를 반환합니다.
+    """
+    if not region or not itineraries:
+        return 0
+
+    places = []
+    unresolved = 0
+    for itinerary in itineraries:
+        order = 0
+        for kind, name, visit_time, duration, notes in _day_items(itinerary):
+            place_id = place_resolver.resolve(region, name, kind)
+            if place_id is None:
+                unresolved += 1
+                continue
+            order += 1
+            places.append(ItineraryPlace(
+                itinerary=itinerary, place_id=place_id, order=order,
+                visit_time=visit_time, duration=duration, notes=notes,
+            ))
+
+    ItineraryPlace.objects.bulk_create(places, batch_size=500)
+
+    # 장소별 일정 포함 횟수 (같은 증가량끼리 UPDATE 한 번)
+    by_delta = defaultdict(list)
+    for place_id, count in Counter(place.place_id for place in places).items():
+        by_delta[count].append(place_id)
+    for count, place_ids in by_delta.items():
+        bump(Place.objects.filter(pk__in=place_ids), itinerary_count=count)
+
+    print(f'✓ 일정 장소 매칭: {len(places)}개 저장, {unresolved}개 매칭 실패')
+    return len(places)
@@ -72,6 +72,8 @@ class TravelPlanCreateSerializer(serializers.Serializer):
         choices=['hotel', 'motel', 'pension', 'guesthouse'],
         required=True
     )
+    # 조건이 거의 같은 평점 높은 추천 계획이 있으면 AI 생성 대신 그 일정을 사용
+    reuse_recommended = serializers.BooleanField(required=False, default=False)
 
     def validate(self, attrs):
         if attrs['start_date'] >= attrs['end_date']:
@@ -79,6 +81,21 @@ class TravelPlanCreateSerializer(serializers.Serializer):
         return attrs
 
 
+class SimilarPlanQuerySerializer(serializers.Serializer):
+    """유사 여행 계획 검색 조건 Serializer"""
+    region = serializers.CharField(required=True, max_length=100)
+    travel_style = serializers.CharField(required=True, max_length=100)
+    days = serializers.IntegerField(required=True, min_value=1)
+    budget = serializers.IntegerField(required=True, min_value=1)
+    people_count = serializers.IntegerField(required=False, min_value=1, default=2)
+    accommodation_type = serializers.ChoiceField(
+        choices=['hotel', 'motel', 'pension', 'guesthouse'],
+        required=False,
+        default='motel'
+    )
+    k = serializers.IntegerField(required=False, min_value=1, max_value=20, default=5)
+
+
 class WishlistSerializer(serializers.ModelSerializer):
     """여행 위시리스트 Serializer"""
     
@@ -0,0 +1,111 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from festivals.models import Festival
+from places.models import Place
+from utils.counters import bump
+from .models import Itinerary, ItineraryPlace, RegionStats, TravelPlan
+
+
+def event_titles(events_info):
+    """일정의 축제/행사 정보에 포함된 축제명 집합"""
+    if not isinstance(events_info, list):
+        return set()
+    return {event['name'] for event in events_info if isinstance(event, dict) and event.get('name')}
+
+
+def _bump_festivals(travel_plan_id, titles, delta):
+    """여행 지역의 같은 이름 축제 일정 포함 횟수 증감"""
+    if not titles:
+        return
+    festivals = Festival.objects.filter(title__in=titles)
+    region = TravelPlan.objects.filter(pk=travel_plan_id).values_list('region', flat=True).first()
+    if region:
+        festivals = festivals.filter(region__icontains=region)
+    bump(festivals, itinerary_count=delta)
+
+
+def _bump_region(region, **deltas):
+    """지역 통계 증감 (통계 행이 없으면 생성)"""
+    if not region or not any(deltas.values()):
+        return
+    RegionStats.objects.get_or_create(region=region)
+    bump(RegionStats.objects.filter(region=region), **deltas)
+
+
+@receiver(post_save, sender=ItineraryPlace)
+def itinerary_place_created(sender, instance, created, raw=False, **kwargs):
+    """일정에 장소 추가 시 장소의 일정 포함 횟수 증가"""
+    if created and not raw:
+        bump(Place.objects.filter(pk=instance.place_id), itinerary_count=1)
+
+
+@receiver(post_delete, sender=ItineraryPlace)
+def itinerary_place_deleted(sender, instance, **kwargs):
+    bump(Place.objects.filter(pk=instance.place_id), itinerary_count=-1)
+
+
+@receiver(pre_save, sender=Itinerary)
+def itinerary_saving(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    # 수정할 때만 저장 전 DB의 축제명 조회 (불러올 때마다 계산하지 않음, 축제 정보를 저장하지 않으면 None)
+    instance._event_titles = None
+    if raw or instance._state.adding or (update_fields is not None and 'events_info' not in update_fields):
+        return
+    events_info = sender._default_manager.using(using).filter(pk=instance.pk).values_list('events_info', flat=True).first()
+    instance._event_titles = event_titles(events_info)
+
+
+@receiver(post_save, sender=Itinerary)
+def itinerary_saved(sender, instance, created, raw=False, **kwargs):
+    """일정 생성/수정 시 추가되거나 빠진 축제의 일정 포함 횟수 반영"""
+    if raw:
+        return
+    previous = set() if created else getattr(instance, '_event_titles', None)
+    if previous is None:
+        return
+    current = event_titles(instance.events_info)
+    _bump_festivals(instance.travel_plan_id, current - previous, 1)
+    _bump_festivals(instance.travel_plan_id, previous - current, -1)
+
+
+@receiver(post_delete, sender=Itinerary)
+def itinerary_deleted(sender, instance, **kwargs):
+    _bump_festivals(instance.travel_plan_id, event_titles(instance.events_info), -1)
+
+
+@receiver(pre_save, sender=TravelPlan)
+def travel_plan_saving(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    # 수정할 때만 저장 전 DB의 지역/추천 여부 조회 (둘 다 저장하지 않으면 None)
+    instance._stats_state = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'region', 'is_recommended'} & set(update_fields):
+        return
+    instance._stats_state = sender._default_manager.using(using).filter(pk=instance.pk).values_list(
+        'region', 'is_recommended').first()
+
+
+@receiver(post_save, sender=TravelPlan)
+def travel_plan_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """여행 계획 생성, 지역 변경, 추천/추천 취소 시 지역 통계 반영"""
+    if raw:
+        return
+    if created:
+        _bump_region(instance.region, plan_count=1, recommended_count=int(instance.is_recommended))
+        return
+    previous = getattr(instance, '_stats_state', None)
+    if previous is None:
+        return
+    # update_fields로 한쪽만 저장했으면 다른 값은 DB 그대로
+    current = (
+        instance.region if update_fields is None or 'region' in update_fields else previous[0],
+        instance.is_recommended if update_fields is None or 'is_recommended' in update_fields else previous[1],
+    )
+    if previous != current:
+        _bump_region(previous[0], plan_count=-1, recommended_count=-int(previous[1]))
+        _bump_region(current[0], plan_count=1, recommended_count=int(current[1]))
+
+
+@receiver(post_delete, sender=TravelPlan)
+def travel_plan_deleted(sender, instance, **kwargs):
+    _bump_region(instance.region, plan_count=-1, recommended_count=-int(instance.is_recommended))
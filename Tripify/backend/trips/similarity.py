@@ -0,0 +1,219 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from ai.trip_templates import adapt_itinerary
+from .models import TravelPlan
+
+
+# 특성 벡터의 범주형 값 목록 (목록에 없는 값은 '기타' 칸으로)
+TRAVEL_STYLES = ['관광', '힐링', '맛집투어', '문화체험', '자연탐방', '쇼핑']
+ACCOMMODATION_TYPES = [choice for choice, _ in TravelPlan.ACCOMMODATION_CHOICES]
+
+# 특성별 가중치 (거리 1 ≈ 스타일이 다르거나, 1인 1일 예산이 약 2.7배 차이)
+STYLE_WEIGHT = 0.7
+ACCOMMODATION_WEIGHT = 0.35
+DAYS_WEIGHT = 0.5           # 1일 차이당
+BUDGET_WEIGHT = 1.0         # 1인 1일 예산의 로그 차이
+PEOPLE_WEIGHT = 0.3         # 인원수의 로그 차이
+RATING_PENALTY = 0.1        # 평점 1점 낮을 때마다 더하는 거리
+
+
+def _category_index(value, vocab):
+    return vocab.index(value) if value in vocab else len(vocab)
+
+
+def plan_features(travel_style, days, budget, people_count, accommodation_type):
+    """여행 조건의 특성 벡터 (지역은 검색 시 같은 지역만 비교하므로 제외)"""
+    vector = np.zeros(len(TRAVEL_STYLES) + len(ACCOMMODATION_TYPES) + 5, dtype=np.float32)
+    vector[_category_index(travel_style, TRAVEL_STYLES)] = STYLE_WEIGHT
+    offset = len(TRAVEL_STYLES) + 1
+    vector[offset + _category_index(accommodation_type, ACCOMMODATION_TYPES)] = ACCOMMODATION_WEIGHT
+    offset += len(ACCOMMODATION_TYPES) + 1
+    people_count = max(people_count, 1)
+    vector[offset] = days * DAYS_WEIGHT
+    vector[offset + 1] = math.log(max(budget, 1) / people_count / max(days, 1)) * BUDGET_WEIGHT
+    vector[offset + 2] = math.log(people_count) * PEOPLE_WEIGHT
+    return vector
+
+
+FEATURE_SIZE = len(plan_features('', 1, 1, 1, ''))
+
+
+def _plan_vector(plan):
+    days = (plan.end_date - plan.start_date).days + 1
+    return plan_features(plan.travel_style, days, plan.budget, plan.people_count, plan.accommodation_type)
+
+
+class PlanIndex:
+    """
+    추천된 여행 계획의 최근접 이웃 검색 인덱스 (프로세스 단위, 스레드 안전)
+
+    계획별 특성 벡터를 NumPy 행렬로 보관하고, 검색 시 같은 지역의 계획만 골라
+    유클리드 거리 + 평점 보정으로 정렬합니다.
+    updated_at 기준으로 변경된 계획만 주기적으로 반영하며 (추천 취소된 계획은 비활성화),
+    삭제된 계획은 전체 재구성 주기에 정리됩니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors = np.zeros((0, FEATURE_SIZE), dtype=np.float32)
+        self._regions = np.zeros(0, dtype=np.int16)
+        self._days = np.zeros(0, dtype=np.int16)
+        self._ratings = np.zeros(0, dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._rows = {}  # plan id -> 행 번호
+        self._region_codes = {}  # 지역명 -> 지역 코드 (검색 시 같은 지역만 비교)
+        self._watermark = None
+        self._refreshed_at = None
+        self._rebuilt_at = None
+
+    def __len__(self):
+        return int(self._active.sum())
+
+    def _region_code(self, region):
+        return self._region_codes.setdefault(region, len(self._region_codes))
+
+    def refresh(self, force=False):
+        """변경된 계획 반영 (SIMILAR_PLAN_REFRESH_SECONDS 이내에 다시 호출하면 건너뜀)"""
+        now = time.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < settings.SIMILAR_PLAN_REFRESH_SECONDS:
+            return
+        with self._lock:
+            if force or self._rebuilt_at is None or now - self._rebuilt_at >= settings.SIMILAR_PLAN_FULL_REBUILD_SECONDS:
+                self._rebuild()
+                self._rebuilt_at = now
+            else:
+                self._apply_changes()
+            self._refreshed_at = now
+
+    def _rebuild(self):
+        """추천된 계획 전체로 인덱스 재구성"""
+        plans = list(TravelPlan.objects.filter(is_recommended=True))
+        self._region_codes = {}
+        self._ids = np.array([plan.id for plan in plans], dtype=np.int64)
+        self._vectors = np.array([_plan_vector(plan) for plan in plans], dtype=np.float32).reshape(len(plans), FEATURE_SIZE)
+        self._regions = np.array([self._region_code(plan.region) for plan in plans], dtype=np.int16)
+        self._days = np.array([(plan.end_date - plan.start_date).days + 1 for plan in plans], dtype=np.int16)
+        self._ratings = np.array([plan.rating or 0 for plan in plans], dtype=np.float32)
+        self._active = np.ones(len(plans), dtype=bool)
+        self._rows = {plan.id: row for row, plan in enumerate(plans)}
+        self._watermark = max((plan.updated_at for plan in plans), default=None)
+        print(f'✓ 유사 여행 계획 인덱스 구성: {len(plans)}개')
+
+    def _apply_changes(self):
+        """마지막 반영 이후 수정된 계획만 갱신/추가/비활성화"""
+        queryset = TravelPlan.objects.all()
+        if self._watermark is not None:
+            queryset = queryset.filter(updated_at__gt=self._watermark)
+        changed = list(queryset)
+        if not changed:
+            return
+
+        new_plans = []
+        for plan in changed:
+            row = self._rows.get(plan.id)
+            if row is None:
+                if plan.is_recommended:
+                    new_plans.append(plan)
+                continue
+            self._active[row] = plan.is_recommended
+            self._vectors[row] = _plan_vector(plan)
+            self._regions[row] = self._region_code(plan.region)
+            self._days[row] = (plan.end_date - plan.start_date).days + 1
+            self._ratings[row] = plan.rating or 0
+
+        if new_plans:
+            start = len(self._ids)
+            self._ids = np.concatenate([self._ids, [plan.id for plan in new_plans]]).astype(np.int64)
+            self._vectors = np.vstack([self._vectors, [_plan_vector(plan) for plan in new_plans]]).astype(np.float32)
+            self._regions = np.concatenate([self._regions, [self._region_code(p.region) for p in new_plans]]).astype(np.int16)
+            self._days = np.concatenate([self._days, [(p.end_date - p.start_date).days + 1 for p in new_plans]]).astype(np.int16)
+            self._ratings = np.concatenate([self._ratings, [p.rating or 0 for p in new_plans]]).astype(np.float32)
+            self._active = np.concatenate([self._active, np.ones(len(new_plans), dtype=bool)])
+            for offset, plan in enumerate(new_plans):
+                self._rows[plan.id] = start + offset
+
+        self._watermark = max(plan.updated_at for plan in changed)
+
+    def search(self, region, travel_style, days, budget, people_count, accommodation_type,
+               k=5, exclude_ids=(), same_days=False, min_rating=0):
+        """
+        조건과 가장 가까운 추천 계획 [(plan_id, 거리), ...] (가까운 순)
+
+        same_days=True면 일수가 같은 계획만, min_rating 이상 평점의 계획만 검색합니다.
+        """
+        self.refresh()
+        query = plan_features(travel_style, days, budget, people_count, accommodation_type)
+
+        with self._lock:
+            if region not in self._region_codes:
+                return []
+            mask = self._active & (self._regions == self._region_codes[region])
+            if same_days:
+                mask &= self._days == days
+            if min_rating:
+                mask &= self._ratings >= min_rating
+            if exclude_ids:
+                mask &= ~np.isin(self._ids, list(exclude_ids))
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            distances = np.sqrt(((self._vectors[rows] - query) ** 2).sum(axis=1))
+            distances += (5 - self._ratings[rows]).clip(0) * RATING_PENALTY
+            ids = self._ids[rows]
+
+        order = np.argsort(distances)[:k]
+        return [(int(ids[i]), round(float(distances[i]), 4)) for i in order]
+
+
+plan_index = PlanIndex()
+
+
+def similar_plans(region, travel_style, days, budget, people_count, accommodation_type, k=5, exclude_ids=()):
+    """가까운 추천 계획 목록 [(TravelPlan, 거리), ...] (가까운 순, 삭제된 계획 제외)"""
+    results = plan_index.search(region, travel_style, days, budget, people_count, accommodation_type,
+                                k=k, exclude_ids=exclude_ids)
+    plans = TravelPlan.objects.filter(id__in=[plan_id for plan_id, _ in results], is_recommended=True).in_bulk()
+    return [(plans[plan_id], distance) for plan_id, distance in results if plan_id in plans]
+
+
+def find_reusable_plan(region, travel_style, days, budget, people_count, accommodation_type):
+    """
+    요청 대신 그대로 재사용할 수 있는 추천 계획 (없으면 None)
+
+    일수가 같고 평점이 SIMILAR_PLAN_REUSE_MIN_RATING 이상이며,
+    거리가 SIMILAR_PLAN_REUSE_MAX_DISTANCE 이하인 가장 가까운 계획을 반환합니다.
+    """
+    results = plan_index.search(region, travel_style, days, budget, people_count, accommodation_type,
+                                k=3, same_days=True, min_rating=settings.SIMILAR_PLAN_REUSE_MIN_RATING)
+    for plan_id, distance in results:
+        if distance > settings.SIMILAR_PLAN_REUSE_MAX_DISTANCE:
+            break
+        plan = TravelPlan.objects.filter(pk=plan_id, is_recommended=True).first()
+        if plan is not None and plan.itineraries.exists():
+            return plan
+    return None
+
+
+def reuse_plan_itinerary(plan, budget, departure_location):
+    """추천 계획의 일정을 요청 예산/출발지에 맞게 변환한 일정 데이터"""
+    days = [
+        {
+            'day_number': itinerary.day_number,
+            'description': itinerary.description,
+            'attractions': itinerary.attractions or [],
+            'transportation_info': itinerary.transportation_info or {},
+            'accommodation_info': itinerary.accommodation_info or {},
+            'meals_info': itinerary.meals_info or {},
+            'events_info': itinerary.events_info or [],
+            'estimated_cost': itinerary.estimated_cost or 0,
+        }
+        for itinerary in plan.itineraries.all().order_by('day_number')
+    ]
+    return adapt_itinerary({'days': days}, budget / plan.budget if plan.budget else 1,
+                           plan.departure_location, departure_location)
@@ -1,3 +1,126 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ai.gemini_service import GeminiService
+from ai.models import TripTemplate
+from festivals.models import Festival
+from .models import Itinerary, RegionStats, TravelPlan
+
+
+GENERATE_URL = '/api/travel/plans/generate/'
+
+
+def _body(region='서울특별시', **fields):
+    return {
+        'budget': 500000, 'people_count': 2, 'start_date': '2026-05-01', 'end_date': '2026-05-02',
+        'departure_location': '서울', 'region': region, 'travel_style': '관광', 'accommodation_type': 'hotel',
+        **fields,
+    }
+
+
+@override_settings(LLM_USER_BUCKET_CAPACITY=1, LLM_USER_REFILL_PER_HOUR=1)
+class IdempotentThrottleTest(TestCase):
+    """Gemini를 호출하지 않는 요청(재요청, 본문 불일치, 검증 오류, 템플릿 사용)은 LLM 요청 제한 토큰을 쓰지 않음"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username='tester', password='pass1234'))
+        patcher = mock.patch.object(GeminiService, 'generate_itinerary', return_value={'days': []})
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, key, body):
+        return self.client.post(GENERATE_URL, body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_and_mismatch_do_not_consume_tokens(self):
+        self.assertEqual(self._post('key-1', _body()).status_code, 201)
+
+        replay = self._post('key-1', _body())
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(self._post('key-1', _body('부산광역시')).status_code, 422)
+        self.assertEqual(self.generate.call_count, 1)
+
+        # 버킷 용량 1 - 새 요청만 제한됨
+        throttled = self._post('key-2', _body('부산광역시'))
+        self.assertEqual(throttled.status_code, 429)
+        self.assertIn('Retry-After', throttled)
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_invalid_body_and_template_do_not_consume_tokens(self):
+        self.assertEqual(self._post('key-1', {'region': '서울특별시'}).status_code, 400)
+
+        TripTemplate.objects.create(
+            region='부산광역시', travel_style='관광', days=2, accommodation_type='hotel',
+            budget=500000, people_count=2, departure_location='서울', itinerary={'days': []},
+        )
+        self.assertEqual(self._post('key-2', _body('부산광역시')).status_code, 201)
+        self.assertEqual(self.generate.call_count, 0)
+
+        # 토큰은 Gemini를 호출하는 첫 요청에서 차감
+        self.assertEqual(self._post('key-3', _body()).status_code, 201)
+        self.assertEqual(self.generate.call_count, 1)
+        self.assertEqual(self._post('key-4', _body()).status_code, 429)
+
+    @override_settings(LLM_USER_REFILL_PER_HOUR=0, LLM_GLOBAL_REFILL_PER_HOUR=0)
+    def test_zero_refill_disables_bucket(self):
+        for key in ['key-1', 'key-2']:
+            self.assertEqual(self._post(key, _body()).status_code, 201)
+        self.assertEqual(self.generate.call_count, 2)
+
+
+class StatsSignalTest(TestCase):
+    """여행 계획/일정 저장 시 지역 통계와 축제 일정 포함 횟수 (저장 전 값은 수정할 때만 조회)"""
+    databases = '__all__'  # CATALOG_DB_PATH를 설정했으면 축제는 카탈로그 DB에 저장
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='tester', password='pass1234')
+        self.plan = TravelPlan.objects.create(
+            user=user, title='부산 여행', budget=500000, people_count=2, start_date='2026-05-01',
+            end_date='2026-05-02', departure_location='서울', region='부산광역시', travel_style='관광',
+            accommodation_type='hotel',
+        )
+        self.festival = Festival.objects.create(title='해운대 모래축제', region='부산광역시')
+
+    def _stats(self, region):
+        return RegionStats.objects.filter(region=region).values_list('plan_count', 'recommended_count').first()
+
+    def test_travel_plan_region_and_recommendation(self):
+        self.assertEqual(self._stats('부산광역시'), (1, 0))
+
+        plan = TravelPlan.objects.get(pk=self.plan.pk)
+        plan.is_recommended = True
+        plan.save(update_fields=['is_recommended'])
+        self.assertEqual(self._stats('부산광역시'), (1, 1))
+
+        plan.region = '제주특별자치도'
+        plan.save()
+        self.assertEqual(self._stats('부산광역시'), (0, 0))
+        self.assertEqual(self._stats('제주특별자치도'), (1, 1))
+
+        plan.title = '제주 여행'
+        plan.save(update_fields=['title'])
+        self.assertEqual(self._stats('제주특별자치도'), (1, 1))
+
+    def test_itinerary_festival_count(self):
+        itinerary = Itinerary.objects.create(travel_plan=self.plan, day_number=1, date='2026-05-01',
+                                             events_info=[{'name': '해운대 모래축제'}])
+        self.festival.refresh_from_db()
+        self.assertEqual(self.festival.itinerary_count, 1)
+
+        with self.assertNumQueries(1):
+            itinerary = Itinerary.objects.get(pk=itinerary.pk)  # 불러올 때는 추가 계산/조회 없음
+        itinerary.description = '해변 산책'
+        itinerary.save()
+        self.festival.refresh_from_db()
+        self.assertEqual(self.festival.itinerary_count, 1)
+
+        itinerary.events_info = []
+        itinerary.save()
+        self.festival.refresh_from_db()
+        self.assertEqual(self.festival.itinerary_count, 0)
@@ -2,10 +2,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import TravelPlan, Itinerary, ItineraryPlace, Wishlist
-from .serializers import TravelPlanSerializer, TravelPlanCreateSerializer, ItinerarySerializer, WishlistSerializer
+from rest_framework.exceptions import Throttled
+from .models import TravelPlan, Itinerary, ItineraryPlace, RegionStats, Wishlist
+from .serializers import TravelPlanSerializer, TravelPlanCreateSerializer, ItinerarySerializer, WishlistSerializer, SimilarPlanQuerySerializer
 from ai.gemini_service import GeminiService
+from ai.concurrency import LLMOverloaded, limiter, overloaded_response
+from ai.throttles import LLMRateThrottle
+from ai.trip_templates import template_itinerary
+from .idempotency import idempotent
+from .place_resolver import create_itinerary_places
+from .similarity import find_reusable_plan, reuse_plan_itinerary, similar_plans
 from datetime import timedelta
+from django.db.models import IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
 
 class TravelPlanViewSet(viewsets.ModelViewSet):
@@ -37,28 +46,79 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                 from rest_framework.exceptions import NotFound
                 raise NotFound('여행 계획을 찾을 수 없습니다.')
 
+    def _charge_llm(self, request):
+        """
+        LLM 요청 제한(LLMRateThrottle) 토큰 차감 - 초과 시 Throttled (429 + Retry-After)
+
+        Gemini를 실제로 호출하기 직전(입력 검증, 권한 확인, 동시 실행 슬롯 확보 후)에만 호출합니다.
+        (저장된 결과 재전송, 본문 불일치 422, 처리 중 409, 검증 오류 400, 403, 추천 계획 재사용,
+        템플릿 사용, 대기열 초과 503은 Gemini를 호출하지 않으므로 제한에 포함하지 않음)
+        """
+        LLMRateThrottle().allow_request(request, self)
+
     @action(detail=False, methods=['post'], url_path='generate')
     def generate_itinerary(self, request):
-        """AI 여행 코스 생성 API"""
+        """AI 여행 코스 생성 API (Idempotency-Key 헤더로 중복 생성 방지)"""
+        return idempotent(request, 'generate', lambda: self._generate_itinerary(request))
+
+    def _generate_itinerary(self, request):
         serializer = TravelPlanCreateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         data = serializer.validated_data
 
+        days = (data['end_date'] - data['start_date']).days + 1
+        search_args = {
+            'region': data['region'],
+            'travel_style': data['travel_style'],
+            'days': days,
+            'budget': data['budget'],
+            'people_count': data['people_count'],
+            'accommodation_type': data['accommodation_type'],
+        }
+
         # AI 서비스를 통해 여행 계획 생성
         try:
-            gemini_service = GeminiService()
-            itinerary_data = gemini_service.generate_itinerary(
-                budget=data['budget'],
-                people_count=data['people_count'],
-                start_date=data['start_date'],
-                end_date=data['end_date'],
-                departure_location=data['departure_location'],
-                region=data['region'],
-                travel_style=data['travel_style'],
-                accommodation_type=data['accommodation_type']
-            )
+            itinerary_data = None
+            reused_plan = None
+            # 조건이 거의 같은 평점 높은 추천 계획이 있으면 AI 생성 대신 그 일정을 사용
+            if data['reuse_recommended']:
+                reused_plan = find_reusable_plan(**search_args)
+                if reused_plan is not None:
+                    print(f'✓ 추천 계획 재사용: {reused_plan.title} (ID: {reused_plan.id})')
+                    itinerary_data = reuse_plan_itinerary(reused_plan, data['budget'], data['departure_location'])
+
+            # 자주 요청되는 조합은 미리 생성된 템플릿 사용 (Gemini 호출 없음)
+            if itinerary_data is None:
+                itinerary_data = template_itinerary(
+                    data['region'], data['travel_style'], days, data['accommodation_type'],
+                    data['budget'], data['people_count'], data['departure_location']
+                )
+
+            if itinerary_data is None:
+                gemini_service = GeminiService()
+                # 동시 실행 한도 초과 시 대기, 대기열도 가득 차면 503
+                try:
+                    with limiter.slot('generate'):
+                        self._charge_llm(request)
+                        try:
+                            itinerary_data = gemini_service.generate_itinerary(
+                                budget=data['budget'],
+                                people_count=data['people_count'],
+                                start_date=data['start_date'],
+                                end_date=data['end_date'],
+                                departure_location=data['departure_location'],
+                                region=data['region'],
+                                travel_style=data['travel_style'],
+                                accommodation_type=data['accommodation_type'],
+                                use_template=False
+                            )
+                        finally:
+                            # 사용량 일일 집계 (Gemini 호출 수/토큰/재시도)
+                            gemini_service.record_usage(request.user, 'generate')
+                except LLMOverloaded as e:
+                    return overloaded_response(e)
 
             # TravelPlan 생성
             travel_plan = TravelPlan.objects.create(
@@ -87,6 +147,7 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                     print(f'days 개수: {len(itinerary_data["days"])}')
             
             if itinerary_data and isinstance(itinerary_data, dict) and 'days' in itinerary_data:
+                saved_days = []
                 for day_data in itinerary_data['days']:
                     try:
                         day_num = day_data.get('day_number', '?')
@@ -100,7 +161,7 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                         else:
                             print(f'⚠️ Day {day_num} - meals_info가 비어있습니다!')
                         
-                        Itinerary.objects.create(
+                        itinerary = Itinerary.objects.create(
                             travel_plan=travel_plan,
                             day_number=day_data['day_number'],
                             date=data['start_date'] + timedelta(days=day_data['day_number'] - 1),
@@ -112,11 +173,15 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                             events_info=day_data.get('events_info', []),
                             estimated_cost=day_data.get('estimated_cost', None)
                         )
+                        saved_days.append(itinerary)
                         created_count += 1
                     except Exception as e:
                         print(f'✗ 일정 생성 오류 (day {day_data.get("day_number", "?")}): {e}')
                         import traceback
                         traceback.print_exc()
+
+                # 관광지/식당/숙소를 장소 데이터와 매칭하여 좌표가 있는 일정별 장소로 저장
+                create_itinerary_places(travel_plan.region, saved_days)
             else:
                 print(f'⚠️ 일정 데이터가 없거나 형식이 올바르지 않습니다.')
                 print(f'itinerary_data: {itinerary_data}')
@@ -133,13 +198,73 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
             if 'itineraries' in response_serializer.data:
                 print(f'✓ Serialized itineraries 개수: {len(response_serializer.data["itineraries"])}')
 
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+            response_data = response_serializer.data
+            if reused_plan is not None:
+                response_data['reused_plan_id'] = reused_plan.id
+            else:
+                # 비슷한 조건의 추천 계획 (다음에 재사용할 수 있도록 제안)
+                response_data['similar_plans'] = [
+                    {'id': plan.id, 'title': plan.title, 'rating': plan.rating, 'distance': distance}
+                    for plan, distance in similar_plans(**search_args, k=3)
+                ]
+
+            return Response(response_data, status=status.HTTP_201_CREATED)
 
+        except Throttled:
+            raise
         except Exception as e:
             return Response({
                 'error': f'여행 계획 생성 중 오류가 발생했습니다: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['get'], url_path='similar')
+    def search_similar(self, request):
+        """조건으로 비슷한 추천 여행 계획 검색 API (?region=&travel_style=&days=&budget=&people_count=&accommodation_type=&k=)"""
+        serializer = SimilarPlanQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        query = serializer.validated_data
+        results = similar_plans(
+            region=query['region'],
+            travel_style=query['travel_style'],
+            days=query['days'],
+            budget=query['budget'],
+            people_count=query['people_count'],
+            accommodation_type=query['accommodation_type'],
+            k=query['k'],
+        )
+        return Response([
+            dict(TravelPlanSerializer(plan).data, distance=distance)
+            for plan, distance in results
+        ], status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk=None):
+        """이 여행 계획과 비슷한 추천 여행 계획 목록 API (?k=5)"""
+        travel_plan = self.get_object()
+        try:
+            k = max(1, min(int(request.query_params.get('k', 5)), 20))
+        except ValueError:
+            return Response({
+                'error': 'k는 숫자여야 합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = similar_plans(
+            region=travel_plan.region,
+            travel_style=travel_plan.travel_style,
+            days=(travel_plan.end_date - travel_plan.start_date).days + 1,
+            budget=travel_plan.budget,
+            people_count=travel_plan.people_count,
+            accommodation_type=travel_plan.accommodation_type,
+            k=k,
+            exclude_ids=[travel_plan.id],
+        )
+        return Response([
+            dict(TravelPlanSerializer(plan).data, distance=distance)
+            for plan, distance in results
+        ], status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post', 'delete'], url_path='recommend')
     def recommend_plan(self, request, pk=None):
         """여행 계획 추천/추천 취소 API"""
@@ -212,9 +337,7 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], url_path='modify')
     def modify_plan(self, request, pk=None):
-        """여행 계획 수정 API (요구사항에 맞게 AI가 계획 수정)"""
-        from .serializers import TravelPlanModifySerializer
-        
+        """여행 계획 수정 API (요구사항에 맞게 AI가 계획 수정, Idempotency-Key 헤더로 중복 수정 방지)"""
         # pk가 없으면 kwargs에서 가져오기
         if pk is None:
             pk = self.kwargs.get('pk')
@@ -223,7 +346,12 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
             return Response({
                 'error': '여행 계획 ID가 필요합니다.'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
+
+        return idempotent(request, f'modify:{pk}', lambda: self._modify_plan(request, pk))
+
+    def _modify_plan(self, request, pk):
+        from .serializers import TravelPlanModifySerializer
+
         # 본인 계획만 수정 가능
         try:
             travel_plan = TravelPlan.objects.get(pk=pk, user=request.user)
@@ -242,18 +370,28 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
         # AI 서비스를 통해 계획 수정
         try:
             gemini_service = GeminiService()
-            modified_itinerary_data = gemini_service.modify_itinerary(
-                existing_plan=travel_plan,
-                requirements=requirements,
-                budget=travel_plan.budget,
-                people_count=travel_plan.people_count,
-                start_date=travel_plan.start_date,
-                end_date=travel_plan.end_date,
-                departure_location=travel_plan.departure_location,
-                region=travel_plan.region,
-                travel_style=travel_plan.travel_style,
-                accommodation_type=travel_plan.accommodation_type
-            )
+            # 동시 실행 한도 초과 시 대기, 대기열도 가득 차면 503
+            try:
+                with limiter.slot('modify'):
+                    self._charge_llm(request)
+                    try:
+                        modified_itinerary_data = gemini_service.modify_itinerary(
+                            existing_plan=travel_plan,
+                            requirements=requirements,
+                            budget=travel_plan.budget,
+                            people_count=travel_plan.people_count,
+                            start_date=travel_plan.start_date,
+                            end_date=travel_plan.end_date,
+                            departure_location=travel_plan.departure_location,
+                            region=travel_plan.region,
+                            travel_style=travel_plan.travel_style,
+                            accommodation_type=travel_plan.accommodation_type
+                        )
+                    finally:
+                        # 사용량 일일 집계 (Gemini 호출 수/토큰/재시도)
+                        gemini_service.record_usage(request.user, 'modify')
+            except LLMOverloaded as e:
+                return overloaded_response(e)
             
             # 기존 일정을 업데이트 (삭제하지 않고 수정)
             updated_count = 0
@@ -264,6 +402,7 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                     for it in travel_plan.itineraries.all()
                 }
                 
+                saved_days = []
                 for day_data in modified_itinerary_data['days']:
                     day_number = day_data['day_number']
                     try:
@@ -278,10 +417,12 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                             itinerary.events_info = day_data.get('events_info', itinerary.events_info)
                             itinerary.estimated_cost = day_data.get('estimated_cost', itinerary.estimated_cost)
                             itinerary.save()
+                            # 일정별 장소는 바뀐 일정으로 다시 매칭 (삭제 시그널로 장소의 일정 포함 횟수 감소)
+                            itinerary.places.all().delete()
                             print(f'✓ Day {day_number} 일정 업데이트 완료')
                         else:
                             # 기존 일정이 없으면 새로 생성
-                            Itinerary.objects.create(
+                            itinerary = Itinerary.objects.create(
                                 travel_plan=travel_plan,
                                 day_number=day_number,
                                 date=travel_plan.start_date + timedelta(days=day_number - 1),
@@ -294,11 +435,14 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
                                 estimated_cost=day_data.get('estimated_cost', None)
                             )
                             print(f'✓ Day {day_number} 일정 생성 완료')
+                        saved_days.append(itinerary)
                         updated_count += 1
                     except Exception as e:
                         print(f'✗ 일정 업데이트 오류 (day {day_number}): {e}')
                         import traceback
                         traceback.print_exc()
+
+                create_itinerary_places(travel_plan.region, saved_days)
             
             print(f'✓ 일정 업데이트 완료: {updated_count}개')
             
@@ -308,6 +452,8 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
             response_serializer = TravelPlanSerializer(travel_plan)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
             
+        except Throttled:
+            raise
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -319,10 +465,19 @@ class TravelPlanViewSet(viewsets.ModelViewSet):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def recommended_plans(request):
-    """추천된 여행 계획 목록 API"""
+    """
+    추천된 여행 계획 목록 API
+
+    ?ordering=popular면 추천 계획이 많은 지역(미리 집계된 지역 통계) 순, 같은 지역은 평점/최신순으로 정렬합니다.
+    """
     from .serializers import TravelPlanSerializer
     
     plans = TravelPlan.objects.filter(is_recommended=True).order_by('-recommended_at')
+    if request.query_params.get('ordering') == 'popular':
+        region_recommended = RegionStats.objects.filter(region=OuterRef('region')).values('recommended_count')[:1]
+        plans = plans.annotate(
+            region_recommended=Coalesce(Subquery(region_recommended, output_field=IntegerField()), Value(0))
+        ).order_by('-region_recommended', '-rating', '-recommended_at')
     serializer = TravelPlanSerializer(plans, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+from contextlib import ExitStack, contextmanager
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections, router, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import CASCADE
+from django.dispatch import receiver
+
+
+CATALOG_DB = 'catalog'
+# 카탈로그 DB에 두는 모델 (장소/축제 원본 데이터 - 대량 적재, 읽기 위주). 북마크/일정 등 사용자 데이터는 default
+CATALOG_MODELS = {('places', 'place'), ('places', 'datafilemanifest'), ('festivals', 'festival')}
+
+_target = None  # reload_catalog 중 카탈로그 모델을 보낼 DB 별칭 (catalog_target)
+
+
+def readonly_uri(path):
+    """SQLite 읽기 전용 URI (immutable: 파일이 바뀌지 않는다고 보고 잠금/변경 확인 생략)"""
+    return f'file:{quote(os.path.abspath(path))}?mode=ro&immutable=1'
+
+
+def catalog_database(path, readonly=False):
+    """
+    카탈로그 DB의 DATABASES 항목 (settings.py에서 사용)
+
+    readonly=True면 immutable URI로 열어 잠금 없이 읽습니다 (Django SQLite 백엔드는 항상 uri=True로 연결).
+    파일은 reload_catalog가 os.replace로 통째로 교체하며, 교체되면 다음 요청에서 다시 연결합니다.
+    """
+    if readonly:
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': readonly_uri(path)}
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+
+
+def is_catalog_model(model):
+    return (model._meta.app_label, model._meta.model_name) in CATALOG_MODELS
+
+
+def catalog_alias():
+    """카탈로그 모델을 읽고 쓰는 DB 별칭 (카탈로그 DB를 분리하지 않았으면 default)"""
+    if _target is not None:
+        return _target
+    return CATALOG_DB if CATALOG_DB in settings.DATABASES else 'default'
+
+
+def is_readonly(alias):
+    """읽기 전용으로 연 카탈로그 DB인지 (인기도 카운터 등 서비스 중 쓰기는 건너뜀)"""
+    return alias == CATALOG_DB and _target is None and settings.CATALOG_DB_READONLY
+
+
+def same_database(*models):
+    """모델들이 같은 DB에 있는지 (JOIN/서브쿼리 가능 여부)"""
+    return len({router.db_for_write(model) for model in models}) == 1
+
+
+@contextmanager
+def atomic_all(*models):
+    """모델들이 있는 DB마다 트랜잭션 (같은 DB면 하나)"""
+    with ExitStack() as stack:
+        for alias in dict.fromkeys(router.db_for_write(model) for model in models):
+            stack.enter_context(transaction.atomic(using=alias))
+        yield
+
+
+@contextmanager
+def catalog_target(alias):
+    """블록 안에서 카탈로그 모델을 alias DB로 보냄 (reload_catalog가 복사본에 적재할 때)"""
+    global _target
+    previous, _target = _target, alias
+    try:
+        yield
+    finally:
+        _target = previous
+
+
+def cross_db_cascade(collector, field, sub_objs, using):
+    """
+    다른 DB에 있을 수 있는 참조 행의 CASCADE (북마크/일정 장소 -> 장소)
+
+    같은 DB면 CASCADE와 같고, 다르면 참조 행이 있는 DB에서 따로 삭제합니다 (삭제 시그널 포함).
+    """
+    alias = router.db_for_write(sub_objs.model)
+    if alias == using:
+        return CASCADE(collector, field, sub_objs, using)
+    sub_objs.using(alias).delete()
+
+
+cross_db_cascade.lazy_sub_objs = True  # 삭제하는 DB에서 참조 행을 미리 조회하지 않음
+
+
+class CatalogRouter:
+    """
+    장소/축제 모델을 카탈로그 DB로 보내는 라우터 (DATABASES에 'catalog'가 있을 때만)
+
+    카탈로그 DB와 default DB 사이의 외래 키(북마크/일정 장소 -> 장소)는 DB 제약 없이 ORM에서만 관리합니다.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model)
+
+    def _db_for(self, model):
+        alias = catalog_alias()
+        if is_catalog_model(model):
+            return alias
+        # 분리했을 때는 장소 인스턴스에서 따라간 북마크/일정 장소도 default로 (지정하지 않으면 인스턴스의 DB를 사용)
+        return 'default' if alias != 'default' else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # type() 대신 _meta.model - request.user 같은 SimpleLazyObject도 실제 모델로 확인
+        if is_catalog_model(obj1._meta.model) or is_catalog_model(obj2._meta.model):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if CATALOG_DB not in settings.DATABASES:
+            return None
+        if model_name is None:
+            return db != CATALOG_DB  # 대상 모델을 알 수 없는 데이터 마이그레이션은 default에서만
+        if (app_label, model_name) in CATALOG_MODELS:
+            return db == CATALOG_DB
+        return db != CATALOG_DB
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+@receiver(connection_created)
+def remember_catalog_file(sender, connection, **kwargs):
+    if connection.alias == CATALOG_DB:
+        connection.catalog_file_key = _file_key(settings.CATALOG_DB_PATH)
+
+
+@receiver(request_started)
+def close_swapped_catalog(**kwargs):
+    """카탈로그 파일이 교체되었으면 연결을 닫아 다음 쿼리에서 새 파일로 다시 연결 (request_started)"""
+    if CATALOG_DB not in settings.DATABASES:
+        return
+    connection = connections[CATALOG_DB]
+    if connection.connection is not None and \
+            getattr(connection, 'catalog_file_key', None) != _file_key(settings.CATALOG_DB_PATH):
+        connection.close()
+
+
+def copy_database(source, target):
+    """SQLite 파일을 일관된 상태로 복사 (온라인 백업 API - 복사 중에도 원본을 읽고 쓸 수 있음)"""
+    if os.path.exists(target):
+        os.remove(target)
+    src = sqlite3.connect(f'file:{quote(os.path.abspath(source))}?mode=ro', uri=True)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from festivals.models import Festival
+from places.models import DataFileManifest, Place
+from .catalog_db import readonly_uri
+from .data_sync import file_checksum, row_hash
+from .tourism_ingest import iter_parsed
+
+
+SNAPSHOT_FORMAT = '1'
+# (데이터셋, 모델) - 스냅샷에 들어가는 카탈로그 테이블 (DataFileManifest는 --sync 기준 체크섬)
+CATALOG_DATASETS = [('places', Place), ('festivals', Festival)]
+SNAPSHOT_MODELS = [Place, Festival, DataFileManifest]
+
+
+class SnapshotError(Exception):
+    """스냅샷 파일이 없거나 현재 모델과 맞지 않음"""
+
+
+def readonly_database(path):
+    """
+    스냅샷을 읽기 전용 DB로 연결하는 DATABASES 항목 (테스트 픽스처 등)
+
+    예: DATABASES['catalog'] = readonly_database(settings.CATALOG_SNAPSHOT_PATH)
+    (Django SQLite 백엔드는 항상 uri=True로 연결하므로 NAME에 URI를 그대로 쓸 수 있음)
+    """
+    return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': readonly_uri(path)}
+
+
+def _connection():
+    """카탈로그 모델이 있는 DB 연결 (카탈로그 DB를 분리하지 않았으면 default)"""
+    return connections[router.db_for_write(Place)]
+
+
+def schema_sql():
+    """카탈로그 테이블 CREATE 문 (현재 모델 기준 - 스냅샷 테이블 구조가 DB 테이블과 같도록)"""
+    with _connection().schema_editor(collect_sql=True) as editor:
+        for model in SNAPSHOT_MODELS:
+            editor.create_model(model)
+    return editor.collected_sql
+
+
+def schema_version(statements=None):
+    return hashlib.sha256('\n'.join(statements or schema_sql()).encode('utf-8')).hexdigest()[:16]
+
+
+def _columns(model):
+    """pk를 제외한 컬럼 (필드, 컬럼명)"""
+    return [(field, field.column) for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def _quoted(names):
+    return ', '.join(_connection().ops.quote_name(name) for name in names)
+
+
+def _insert_sql(model):
+    columns = [column for _, column in _columns(model)]
+    return (f'INSERT OR IGNORE INTO {_connection().ops.quote_name(model._meta.db_table)} ({_quoted(columns)}) '
+            f'VALUES ({", ".join("?" for _ in columns)})')
+
+
+def _db_values(model, values, now):
+    """모델 필드 값 dict -> INSERT 값 (지정하지 않은 필드는 모델 기본값, 생성/수정 시각은 now)"""
+    connection = _connection()
+    result = []
+    for field, _ in _columns(model):
+        if field.name in values:
+            value = values[field.name]
+        elif field.name in ('created_at', 'updated_at', 'synced_at'):
+            value = now
+        else:
+            value = field.get_default()
+        result.append(field.get_db_prep_save(value, connection))
+    return result
+
+
+def build_snapshot(path, datasets, workers=1, log=print):
+    """
+    tourism_data -> 카탈로그 스냅샷 SQLite 파일
+
+    datasets: [(데이터셋, 모델, 적재 작업 목록), ...] (load_places/load_festivals와 같은 파싱/정규화 단계 사용)
+    임시 파일에 만든 뒤 os.replace로 바꾸므로 만드는 중에도 기존 스냅샷을 읽을 수 있습니다.
+    반환값: 메타 정보 dict (version 등)
+    """
+    connection = _connection()
+    statements = schema_sql()
+    temp_path = f'{path}.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    started = time.monotonic()
+    now = timezone.now()
+    db = sqlite3.connect(temp_path)
+    try:
+        db.execute('PRAGMA journal_mode = OFF')  # 임시 파일이므로 저널/동기화 생략
+        db.execute('PRAGMA synchronous = OFF')
+        for statement in statements:
+            db.execute(statement)
+        db.execute('CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+        checksums = {}
+        counts = {}
+        for dataset, model, tasks in datasets:
+            insert_sql = _insert_sql(model)
+            by_key = {task.file_key: task for task in tasks}
+            file_rows = {}
+            for task in tasks:
+                checksums[task.file_key] = file_checksum(task.path)
+
+            for kind, file_key, payload, _ in iter_parsed(tasks, workers):
+                if kind == 'error':
+                    raise SnapshotError(f'{file_key} 파싱 실패: {payload}')
+                if kind == 'batch':
+                    db.executemany(insert_sql, [
+                        _db_values(model, {**row, 'content_hash': row_hash(row)}, now) for row in payload
+                    ])
+                    file_rows[file_key] = file_rows.get(file_key, 0) + len(payload)
+                    continue
+                task = by_key[file_key]
+                db.execute(_insert_sql(DataFileManifest), _db_values(DataFileManifest, {
+                    'dataset': dataset,
+                    'file_key': file_key,
+                    'checksum': checksums[file_key],
+                    'scope': task.scope,
+                    'row_count': file_rows.get(file_key, 0),
+                }, now))
+
+            counts[dataset] = db.execute(
+                f'SELECT COUNT(*) FROM {connection.ops.quote_name(model._meta.db_table)}').fetchone()[0]
+            log(f'  - {dataset}: {counts[dataset]}개 ({len(tasks)}개 파일)')
+
+        digest = hashlib.sha256(f'{SNAPSHOT_FORMAT}:{schema_version(statements)}'.encode('utf-8'))
+        for file_key, checksum in sorted(checksums.items()):
+            digest.update(f'{file_key}:{checksum}'.encode('utf-8'))
+        meta = {
+            'format': SNAPSHOT_FORMAT,
+            'schema': schema_version(statements),
+            'version': digest.hexdigest()[:16],
+            'created_at': now.isoformat(),
+            'counts': json.dumps(counts),
+        }
+        db.executemany('INSERT INTO snapshot_meta (key, value) VALUES (?, ?)', meta.items())
+        db.commit()
+        db.execute('ANALYZE')  # 쿼리 플래너 통계를 미리 계산
+        db.execute('VACUUM')
+    except BaseException:
+        db.close()
+        os.remove(temp_path)
+        raise
+    db.close()
+
+    os.replace(temp_path, path)
+    meta['seconds'] = round(time.monotonic() - started, 2)
+    return meta
+
+
+def read_meta(path):
+    """스냅샷 메타 정보 (파일이 없거나 형식/스키마가 현재 모델과 다르면 SnapshotError)"""
+    if not os.path.exists(path):
+        raise SnapshotError(f'스냅샷 파일을 찾을 수 없습니다: {path}')
+    try:
+        db = sqlite3.connect(readonly_uri(path), uri=True)
+        try:
+            meta = dict(db.execute('SELECT key, value FROM snapshot_meta').fetchall())
+        finally:
+            db.close()
+    except sqlite3.DatabaseError as e:
+        raise SnapshotError(f'스냅샷 파일을 읽을 수 없습니다: {e}')
+
+    if meta.get('format') != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"지원하지 않는 스냅샷 형식입니다: {meta.get('format')}")
+    if meta.get('schema') != schema_version():
+        raise SnapshotError('스냅샷의 테이블 구조가 현재 모델과 다릅니다. build_catalog_snapshot으로 다시 만들어주세요.')
+    return meta
+
+
+def import_snapshot(path):
+    """
+    스냅샷을 현재 DB로 가져오기 (SQLite ATTACH + INSERT ... SELECT, ORM을 거치지 않음)
+
+    이미 있는 content_id는 건너뜁니다. 테이블이 비어 있던 데이터셋은 스냅샷의 파일 체크섬도 기록하여
+    이후 load_places/load_festivals --sync가 바뀐 파일만 읽도록 합니다.
+    반환값: {데이터셋: 추가된 행 수}
+    """
+    connection = _connection()
+    if connection.vendor != 'sqlite':
+        raise SnapshotError('스냅샷 가져오기는 SQLite DB에서만 지원합니다.')
+    read_meta(path)
+
+    imported = {}
+    with connection.cursor() as cursor:
+        # ATTACH는 트랜잭션 밖에서 실행해야 함
+        cursor.execute('ATTACH DATABASE %s AS snapshot', [readonly_uri(path)])
+        try:
+            with transaction.atomic(using=connection.alias):
+                for dataset, model in CATALOG_DATASETS:
+                    table = connection.ops.quote_name(model._meta.db_table)
+                    columns = _quoted(column for _, column in _columns(model))
+                    was_empty = not model.objects.exists()
+                    cursor.execute(
+                        f'INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM snapshot.{table} ORDER BY id')
+                    imported[dataset] = cursor.rowcount
+
+                    if was_empty:
+                        manifest = connection.ops.quote_name(DataFileManifest._meta.db_table)
+                        manifest_columns = _quoted(column for _, column in _columns(DataFileManifest))
+                        DataFileManifest.objects.filter(dataset=dataset).delete()
+                        cursor.execute(
+                            f'INSERT INTO main.{manifest} ({manifest_columns}) '
+                            f'SELECT {manifest_columns} FROM snapshot.{manifest} WHERE dataset = %s', [dataset])
+        finally:
+            cursor.execute('DETACH DATABASE snapshot')
+    return imported
@@ -0,0 +1,18 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .catalog_db import is_readonly
+
+
+def bump(queryset, **deltas):
+    """
+    카운터 필드를 deltas만큼 증감 (단일 UPDATE, 0 미만으로 내려가지 않음)
+
+    예: bump(Place.objects.filter(pk=place_id), bookmark_count=1)
+    읽기 전용으로 연 카탈로그 DB의 카운터는 건너뜁니다 (reload_catalog에서 다시 계산).
+    """
+    if is_readonly(queryset.db):
+        return
+    updates = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+    if updates:
+        queryset.update(**updates)
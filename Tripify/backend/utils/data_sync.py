@@ -0,0 +1,190 @@
+import hashlib
+import json
+from collections import Counter
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from places.models import DataFileManifest
+
+
+READ_CHUNK_SIZE = 1 << 20  # 체크섬 계산 시 1MB씩 읽음
+BATCH_SIZE = 500
+LOOKUP_CHUNK_SIZE = 900  # content_id__in 조회를 나누는 크기 (SQLite 변수 개수 제한)
+
+
+def file_checksum(path):
+    """파일 SHA-256 (파일 전체를 메모리에 올리지 않음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def row_hash(values):
+    """적재할 필드 값의 해시 (이전 동기화 때와 값이 같은지 비교용)"""
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_update_rows(model, rows, fields):
+    """
+    pk별 필드 값 일괄 UPDATE (executemany 한 번)
+
+    rows: [(pk, {필드: 값}), ...]. QuerySet.bulk_update는 CASE WHEN 식을 만드는 비용이 커서
+    수만 행을 갱신할 때는 필드 변환(get_db_prep_save)만 거친 UPDATE 문을 직접 실행합니다.
+    """
+    if not rows:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    model_fields = [model._meta.get_field(name) for name in fields]
+    assignments = ', '.join(f'{connection.ops.quote_name(field.column)} = %s' for field in model_fields)
+    sql = (f'UPDATE {connection.ops.quote_name(model._meta.db_table)} SET {assignments} '
+           f'WHERE {connection.ops.quote_name(model._meta.pk.column)} = %s')
+    params = [
+        [field.get_db_prep_save(values[field.name], connection) for field in model_fields] + [pk]
+        for pk, values in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+    return len(rows)
+
+
+class IncrementalSync:
+    """
+    tourism_data 파일 단위 증분 동기화 (Place / Festival 공용)
+
+    - 파일 체크섬이 지난 동기화와 같으면 파일을 읽지 않고 건너뜀
+    - 바뀐 파일은 행별 해시(content_hash)를 비교하여 새 행은 bulk_create, 바뀐 행은 일괄 UPDATE
+    - 파일에서 사라진 행, 사라진 파일의 행은 is_active=False (카카오 등 다른 출처 행은 건드리지 않음)
+
+    - 중복 병합(dedupe_places)으로 비활성화된 행(merged_into가 있는 행)은 다시 활성화/갱신하지 않음
+
+    model은 content_id, content_hash, is_active, updated_at 필드를 가져야 합니다.
+    (카탈로그 DB를 분리한 경우 트랜잭션은 모델이 있는 DB에서 엽니다)
+    """
+
+    def __init__(self, model, dataset):
+        self.model = model
+        self.dataset = dataset
+        self.has_merged = any(field.name == 'merged_into' for field in model._meta.concrete_fields)
+        self.db = router.db_for_write(model)
+        self.manifest = {entry.file_key: entry for entry in DataFileManifest.objects.filter(dataset=dataset)}
+        self.seen_files = set()
+        self._seen_ids = {}  # 반영 중인 파일 -> 지금까지 받은 content_id
+        self.stats = Counter()
+
+    def is_unchanged(self, file_key, checksum):
+        """지난 동기화 이후 바뀌지 않은 파일인지 (확인한 파일은 사라진 파일 목록에서 제외)"""
+        self.seen_files.add(file_key)
+        entry = self.manifest.get(file_key)
+        if entry is not None and entry.checksum == checksum:
+            self.stats['skipped_files'] += 1
+            return True
+        return False
+
+    def _managed(self, scope):
+        """scope에 해당하는 원본 데이터 행 (카카오에서 저장한 장소 등은 제외)"""
+        return self.model.objects.filter(**scope).exclude(content_id__startswith='kakao_')
+
+    def apply_batch(self, file_key, rows):
+        """
+        바뀐 파일의 행 배치 반영 (파일 하나를 여러 배치로 나누어 넣을 수 있음) - (생성 수, 갱신 수)
+
+        rows: 모델 필드 값 dict 목록 (content_id 포함)
+        """
+        with transaction.atomic(using=self.db):
+            self.seen_files.add(file_key)
+            seen_ids = self._seen_ids.setdefault(file_key, set())
+            now = timezone.now()
+            by_id = {}
+            for row in rows:
+                if row.get('content_id'):
+                    by_id[row['content_id']] = row
+            seen_ids.update(by_id)
+
+            existing = {}
+            merged = set()
+            for ids in _chunks(by_id, LOOKUP_CHUNK_SIZE):
+                rows_in_db = self.model.objects.filter(content_id__in=ids)
+                if self.has_merged:
+                    merged.update(rows_in_db.filter(merged_into__isnull=False).values_list('content_id', flat=True))
+                for pk, content_id, content_hash, is_active in rows_in_db.values_list(
+                        'pk', 'content_id', 'content_hash', 'is_active'):
+                    existing[content_id] = (pk, content_hash, is_active)
+
+            created, updated = [], []
+            fields = set()
+            for content_id, row in by_id.items():
+                content_hash = row_hash(row)
+                current = existing.get(content_id)
+                if content_id in merged:
+                    self.stats['merged'] += 1  # 병합된 중복 장소는 비활성화 상태 유지
+                elif current is None:
+                    created.append(self.model(**row, content_hash=content_hash))
+                elif current[1] != content_hash or not current[2]:
+                    # 직접 UPDATE하므로 auto_now 대신 updated_at을 지정 (인덱스 데이터 버전에 반영)
+                    updated.append((current[0], {**row, 'content_hash': content_hash,
+                                                 'is_active': True, 'updated_at': now}))
+                    fields.update(row)
+                else:
+                    self.stats['unchanged'] += 1
+
+            self.model.objects.bulk_create(created, batch_size=BATCH_SIZE)
+            fields.discard('content_id')
+            bulk_update_rows(self.model, updated, [*sorted(fields), 'content_hash', 'is_active', 'updated_at'])
+            self.stats['created'] += len(created)
+            self.stats['updated'] += len(updated)
+            return len(created), len(updated)
+
+    def complete_file(self, file_key, checksum, scope):
+        """
+        파일의 모든 배치를 반영한 뒤 호출 - 파일에서 사라진 행을 비활성화하고 체크섬 기록 (비활성화 수)
+
+        scope: 이 파일 행의 조건 (예: {'place_type': 'tourist', 'category': '강'})
+        중간에 실패한 파일은 호출하지 않으므로 다음 동기화 때 다시 읽습니다.
+        """
+        with transaction.atomic(using=self.db):
+            seen_ids = self._seen_ids.pop(file_key, set())
+            active = self._managed(scope).filter(is_active=True).values_list('pk', 'content_id')
+            missing = [pk for pk, content_id in active if content_id not in seen_ids]
+            deactivated = self._deactivate(missing, timezone.now())
+
+            DataFileManifest.objects.update_or_create(
+                dataset=self.dataset, file_key=file_key,
+                defaults={'checksum': checksum, 'scope': scope, 'row_count': len(seen_ids)},
+            )
+            return deactivated
+
+    def _deactivate(self, pks, now):
+        count = 0
+        for chunk in _chunks(pks, LOOKUP_CHUNK_SIZE):
+            count += self.model.objects.filter(pk__in=chunk).update(is_active=False, updated_at=now)
+        self.stats['deactivated'] += count
+        return count
+
+    def finish(self, folders):
+        """
+        지난 동기화에 있었지만 이번에 없는 파일의 행 비활성화 (읽은 폴더 안의 파일만 - 폴더가 없으면 건드리지 않음)
+
+        반환값: 사라진 파일 수
+        """
+        with transaction.atomic(using=self.db):
+            now = timezone.now()
+            removed = [
+                entry for file_key, entry in self.manifest.items()
+                if file_key not in self.seen_files and file_key.split('/', 1)[0] in folders
+            ]
+            for entry in removed:
+                pks = list(self._managed(entry.scope).filter(is_active=True).values_list('pk', flat=True))
+                self._deactivate(pks, now)
+                entry.delete()
+            self.stats['removed_files'] += len(removed)
+            return len(removed)
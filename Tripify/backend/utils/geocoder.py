@@ -0,0 +1,253 @@
+import json
+import math
+import os
+import threading
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+
+
+AdminArea = namedtuple('AdminArea', ['sido', 'sigungu'])
+
+# 시도 정식 명칭 -> 주소/사용자 입력에 쓰이는 다른 표기
+# ('광주시'는 경기도 광주시와 겹치므로 별칭에서 제외)
+SIDO_ALIASES = {
+    '서울특별시': ['서울', '서울시'],
+    '부산광역시': ['부산', '부산시'],
+    '대구광역시': ['대구', '대구시'],
+    '인천광역시': ['인천', '인천시'],
+    '광주광역시': ['광주'],
+    '대전광역시': ['대전', '대전시'],
+    '울산광역시': ['울산', '울산시'],
+    '세종특별자치시': ['세종', '세종시'],
+    '경기도': ['경기'],
+    '강원특별자치도': ['강원', '강원도'],
+    '충청북도': ['충북'],
+    '충청남도': ['충남'],
+    '전북특별자치도': ['전북', '전라북도'],
+    '전라남도': ['전남'],
+    '경상북도': ['경북'],
+    '경상남도': ['경남'],
+    '제주특별자치도': ['제주', '제주도'],
+}
+
+SIGUNGU_SUFFIXES = ('시', '군', '구')
+# 역지오코딩 격자 (약 1km 칸, 빈 칸이면 주변 MAX_RING칸까지 확인)
+GRID_DEGREES = 0.01
+MAX_RING = 4
+BBOX_MARGIN_DEGREES = 0.05  # 격자에서 못 찾으면 이 여유만큼 넓힌 시군구 영역 안에서 가장 가까운 중심점
+KOREA_BOUNDS = (33.0, 39.0, 124.5, 132.0)  # 최소/최대 위도, 최소/최대 경도 (좌표 오류 데이터 제외)
+
+_TERMINAL = '$'
+
+
+def _trie_insert(trie, key, value):
+    node = trie
+    for char in key:
+        node = node.setdefault(char, {})
+    node[_TERMINAL] = value
+
+
+def _trie_match(trie, text, start=0):
+    """
+    text[start:]의 앞부분과 일치하는 가장 긴 이름 (값, 끝 위치)
+
+    이름 뒤가 공백/문장부호/문자열 끝일 때만 일치로 봅니다 (예: "제주시"의 "제주"는 불일치).
+    """
+    node = trie
+    best = (None, start)
+    position = start
+    while position < len(text):
+        node = node.get(text[position])
+        if node is None:
+            break
+        position += 1
+        if _TERMINAL in node and (position == len(text) or not text[position].isalnum()):
+            best = (node[_TERMINAL], position)
+    return best
+
+
+def _skip_separators(text, position):
+    while position < len(text) and not text[position].isalnum():
+        position += 1
+    return position
+
+
+class OfflineGeocoder:
+    """
+    오프라인 행정구역 조회 (시도/시군구)
+
+    - 주소 정규화: 시도 별칭 트라이 + tourism_data 주소에서 모은 시군구 이름 트라이
+    - 역지오코딩: tourism_data 좌표로 만든 격자(칸별 시군구 빈도) + 시군구 중심점/영역
+    """
+
+    def __init__(self, records=()):
+        # records: [(주소, 위도, 경도), ...]
+        self._sido_trie = {}
+        for sido, aliases in SIDO_ALIASES.items():
+            for name in [sido, *aliases]:
+                _trie_insert(self._sido_trie, name, sido)
+
+        self.districts = defaultdict(set)  # 시도 -> 시군구 이름
+        points = []
+        for address, latitude, longitude in records:
+            area = self._parse_tokens(address)
+            if area is None:
+                continue
+            if area.sigungu:
+                self.districts[area.sido].add(area.sigungu)
+            points.append((area, latitude, longitude))
+
+        self._sigungu_trie = {}
+        sidos_by_sigungu = defaultdict(set)
+        for sido, names in self.districts.items():
+            for name in names:
+                sidos_by_sigungu[name].add(sido)
+        for name, sidos in sidos_by_sigungu.items():
+            _trie_insert(self._sigungu_trie, name, frozenset(sidos))
+
+        self._build_spatial(points)
+
+    def _parse_tokens(self, address):
+        """데이터 적재용 주소("시도 시군구 ...") 파싱 (시도를 모르면 None)"""
+        tokens = (address or '').split()
+        if not tokens:
+            return None
+        sido, end = _trie_match(self._sido_trie, tokens[0])
+        if sido is None or end != len(tokens[0]):
+            return None
+        sigungu = tokens[1] if len(tokens) > 1 and tokens[1].endswith(SIGUNGU_SUFFIXES) else ''
+        return AdminArea(sido, sigungu)
+
+    def _build_spatial(self, points):
+        min_lat, max_lat, min_lng, max_lng = KOREA_BOUNDS
+        self._areas = []
+        area_ids = {}
+        cells = defaultdict(Counter)
+        sums = defaultdict(lambda: [0.0, 0.0, 0, math.inf, -math.inf, math.inf, -math.inf])
+        for area, latitude, longitude in points:
+            try:
+                latitude, longitude = float(latitude), float(longitude)
+            except (TypeError, ValueError):
+                continue
+            if not (min_lat <= latitude <= max_lat and min_lng <= longitude <= max_lng):
+                continue
+            if area not in area_ids:
+                area_ids[area] = len(self._areas)
+                self._areas.append(area)
+            area_id = area_ids[area]
+            cells[self._cell(latitude, longitude)][area_id] += 1
+            stats = sums[area_id]
+            stats[0] += latitude
+            stats[1] += longitude
+            stats[2] += 1
+            stats[3], stats[4] = min(stats[3], latitude), max(stats[4], latitude)
+            stats[5], stats[6] = min(stats[5], longitude), max(stats[6], longitude)
+
+        self._cells = {cell: dict(counter) for cell, counter in cells.items()}
+        # 시군구별 (중심 위도, 중심 경도, 최소 위도, 최대 위도, 최소 경도, 최대 경도)
+        self.centroids = {
+            area_id: (stats[0] / stats[2], stats[1] / stats[2], stats[3], stats[4], stats[5], stats[6])
+            for area_id, stats in sums.items()
+        }
+
+    @staticmethod
+    def _cell(latitude, longitude):
+        return int(math.floor(latitude / GRID_DEGREES)), int(math.floor(longitude / GRID_DEGREES))
+
+    def normalize(self, address):
+        """
+        자유 형식 주소/지역명 -> AdminArea(시도 정식 명칭, 시군구) (모르는 부분은 '')
+
+        예: "서울 강남구 테헤란로" -> ("서울특별시", "강남구"), "강릉시" -> ("강원특별자치도", "강릉시")
+        """
+        text = (address or '').strip()
+        sido, position = _trie_match(self._sido_trie, text)
+        position = _skip_separators(text, position)
+        sidos, end = _trie_match(self._sigungu_trie, text, position)
+
+        sigungu = ''
+        if sidos is not None:
+            if sido is None and len(sidos) == 1:
+                sido = next(iter(sidos))
+            if sido in sidos:
+                sigungu = text[position:end]
+        return AdminArea(sido or '', sigungu)
+
+    def region_of(self, address):
+        """주소의 시도 정식 명칭 (장소/축제의 region 값, 모르면 '')"""
+        return self.normalize(address).sido
+
+    def reverse(self, latitude, longitude):
+        """좌표 -> AdminArea (데이터 범위 밖이면 None)"""
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except (TypeError, ValueError):
+            return None
+        row, column = self._cell(latitude, longitude)
+        for ring in range(MAX_RING + 1):
+            votes = Counter()
+            for d_row in range(-ring, ring + 1):
+                for d_column in range(-ring, ring + 1):
+                    if max(abs(d_row), abs(d_column)) != ring:
+                        continue
+                    counts = self._cells.get((row + d_row, column + d_column))
+                    if counts:
+                        votes.update(counts)
+            if votes:
+                return self._areas[votes.most_common(1)[0][0]]
+
+        best, best_distance = None, None
+        for area_id, (lat, lng, min_lat, max_lat, min_lng, max_lng) in self.centroids.items():
+            if not (min_lat - BBOX_MARGIN_DEGREES <= latitude <= max_lat + BBOX_MARGIN_DEGREES
+                    and min_lng - BBOX_MARGIN_DEGREES <= longitude <= max_lng + BBOX_MARGIN_DEGREES):
+                continue
+            distance = (lat - latitude) ** 2 + ((lng - longitude) * math.cos(math.radians(latitude))) ** 2
+            if best_distance is None or distance < best_distance:
+                best, best_distance = area_id, distance
+        return self._areas[best] if best is not None else None
+
+
+def _load_records(data_dir):
+    """tourism_data 폴더의 모든 JSON 항목 (주소, 위도, 경도)"""
+    records = []
+    if not os.path.isdir(data_dir):
+        print(f'⚠️ 지오코더 데이터 폴더를 찾을 수 없습니다: {data_dir} (시도 정규화만 사용)')
+        return records
+    for root, _, files in os.walk(data_dir):
+        for file_name in files:
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(root, file_name), 'r', encoding='utf-8') as f:
+                    for item in json.load(f):
+                        records.append((item.get('address', ''), item.get('latitude'), item.get('longitude')))
+            except (OSError, ValueError) as e:
+                print(f'⚠️ 지오코더 데이터 읽기 실패 ({file_name}): {e}')
+    return records
+
+
+_geocoder = None
+_lock = threading.Lock()
+
+
+def get_geocoder():
+    """프로세스 단위 지오코더 (처음 사용할 때 tourism_data로 구성)"""
+    global _geocoder
+    if _geocoder is None:
+        with _lock:
+            if _geocoder is None:
+                _geocoder = OfflineGeocoder(_load_records(os.path.join(settings.BASE_DIR, 'tourism_data')))
+    return _geocoder
+
+
+def normalize_address(address):
+    return get_geocoder().normalize(address)
+
+
+def region_of(address):
+    return get_geocoder().region_of(address)
+
+
+def reverse_geocode(latitude, longitude):
+    return get_geocoder().reverse(latitude, longitude)
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .catalog_db import CATALOG_DB
+
+
+def pragma_statements(readonly=False, journal_mode=None, synchronous=None, busy_timeout_ms=None,
+                      mmap_size=None, cache_size_kb=None):
+    """
+    연결마다 실행할 SQLite PRAGMA 목록 (지정하지 않은 값은 settings의 SQLITE_* 사용)
+
+    busy_timeout을 가장 먼저 설정하여 journal_mode 변경 중 다른 연결과 겹쳐도 기다립니다.
+    읽기 전용 연결에는 파일을 바꾸는 journal_mode/synchronous를 적용하지 않습니다.
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE if journal_mode is None else journal_mode
+    synchronous = settings.SQLITE_SYNCHRONOUS if synchronous is None else synchronous
+    busy_timeout_ms = settings.SQLITE_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+    mmap_size = settings.SQLITE_MMAP_SIZE if mmap_size is None else mmap_size
+    cache_size_kb = settings.SQLITE_CACHE_SIZE_KB if cache_size_kb is None else cache_size_kb
+
+    statements = [f'PRAGMA busy_timeout = {int(busy_timeout_ms)}']
+    if not readonly:
+        if journal_mode:
+            statements.append(f'PRAGMA journal_mode = {journal_mode}')
+        if synchronous:
+            statements.append(f'PRAGMA synchronous = {synchronous}')
+    statements.append(f'PRAGMA mmap_size = {int(mmap_size)}')
+    statements.append(f'PRAGMA cache_size = {-int(cache_size_kb)}')  # 음수: KiB 단위
+    statements.append('PRAGMA temp_store = MEMORY')
+    return statements
+
+
+def _is_readonly(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    SQLite 연결 설정 훅 (새 연결마다 PRAGMA 적용)
+
+    카탈로그 DB(utils/catalog_db.py)는 journal_mode를 바꾸지 않습니다 - 서비스 프로세스가 immutable로 열면
+    -wal 파일을 읽지 않으므로 카탈로그 파일은 롤백 저널 모드로 두어야 합니다.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    readonly = _is_readonly(connection)
+    journal_mode = '' if connection.alias.startswith(CATALOG_DB) else None  # catalog, catalog_reload
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(readonly=readonly, journal_mode=journal_mode):
+            cursor.execute(statement)
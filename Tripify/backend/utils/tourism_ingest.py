@@ -0,0 +1,361 @@
+import json
+import multiprocessing
+import os
+import queue
+import time
+from collections import Counter, namedtuple
+
+from django.db import connections
+
+from .data_sync import IncrementalSync, file_checksum, row_hash
+
+
+READ_CHUNK_SIZE = 64 * 1024  # 스트리밍 파서가 한 번에 읽는 크기
+BATCH_SIZE = 500  # 작업자 -> 쓰기 단계로 넘기는 행 수
+QUEUE_BATCHES_PER_WORKER = 4  # 쓰기 대기 큐 크기 (작업자당 배치 수, 쓰기가 느리면 작업자가 기다림)
+WORKER_POLL_SECONDS = 1.0
+COORDINATE_FIELDS = ('latitude', 'longitude')
+
+_WHITESPACE = ' \t\r\n'
+_DELIMITERS = _WHITESPACE + ',]'
+_decoder = json.JSONDecoder()
+
+# 파일 하나의 적재 작업 (builder(item, *args) -> 모델 필드 값 dict, scope: --sync에서 이 파일 행의 조건)
+IngestTask = namedtuple('IngestTask', ['file_key', 'path', 'builder', 'args', 'scope'])
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE):
+    """
+    JSON 배열 파일의 항목을 하나씩 반환 (파일 전체를 읽지 않고 chunk_size씩 읽으며 디코딩)
+
+    메모리에는 읽는 중인 청크와 디코딩 중인 항목만 올라갑니다.
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer, position, eof = '', 0, False
+
+        def read_more():
+            nonlocal buffer, position, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer, position = buffer[position:] + chunk, 0
+
+        def skip(characters):
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in characters:
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                read_more()
+
+        skip(_WHITESPACE)
+        if position >= len(buffer):
+            return
+        if buffer[position] != '[':
+            raise ValueError(f'JSON 배열이 아닙니다: {path}')
+        position += 1
+
+        while True:
+            skip(_WHITESPACE + ',')
+            if position >= len(buffer):
+                raise ValueError(f'JSON 배열이 닫히지 않았습니다: {path}')
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()  # 항목이 청크 경계에 걸림
+                continue
+            if end >= len(buffer) or buffer[end] not in _DELIMITERS:
+                # 숫자 등 청크 경계에서 잘렸을 수 있는 값은 다음 청크와 함께 다시 디코딩
+                if eof:
+                    if end < len(buffer):
+                        raise ValueError(f'잘못된 JSON 배열 항목입니다: {path}')
+                else:
+                    read_more()
+                    continue
+            position = end
+            yield item
+
+
+def _coordinate(value):
+    try:
+        return str(float(value)) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_file(task, batch_size=BATCH_SIZE):
+    """
+    파일 하나를 스트리밍으로 읽어 정규화/검증한 행 배치를 차례로 반환 - (행 목록, 건너뛴 항목 수)
+
+    content_id나 제목이 없는 항목은 건너뛰고, 숫자가 아닌 좌표는 None으로 바꿉니다.
+    """
+    batch, invalid = [], 0
+    for item in iter_json_array(task.path):
+        row = task.builder(item, *task.args) if isinstance(item, dict) else None
+        if not row or not row.get('content_id') or not row.get('title'):
+            invalid += 1
+            continue
+        for field in COORDINATE_FIELDS:
+            if field in row:
+                row[field] = _coordinate(row[field])
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch, invalid
+            batch, invalid = [], 0
+    if batch or invalid:
+        yield batch, invalid
+
+
+def _parse_messages(task, batch_size, emit):
+    """파일 하나의 메시지 전달 (emit에 걸린 시간은 파싱 시간에서 제외)"""
+    started = time.monotonic()
+    waited = 0.0
+    try:
+        for batch, invalid in parse_file(task, batch_size):
+            emit_started = time.monotonic()
+            emit(('batch', task.file_key, batch, invalid))
+            waited += time.monotonic() - emit_started
+    except Exception as e:  # 작업자는 다음 파일을 계속 처리
+        emit(('error', task.file_key, str(e), time.monotonic() - started - waited))
+        return
+    emit(('done', task.file_key, None, time.monotonic() - started - waited))
+
+
+def _worker(tasks, results, batch_size):
+    """파싱 작업자 프로세스 (DB는 사용하지 않음)"""
+    import django
+    django.setup()  # spawn 방식 플랫폼에서는 앱 레지스트리를 새로 구성
+    for task in iter(tasks.get, None):
+        _parse_messages(task, batch_size, results.put)
+    results.put(('exit', None, None, 0))
+
+
+def _inline_messages(tasks, batch_size):
+    """작업자 1개: 현재 프로세스에서 파싱"""
+    for task in tasks:
+        started = time.monotonic()
+        waited = 0.0
+        try:
+            for batch, invalid in parse_file(task, batch_size):
+                yield_started = time.monotonic()
+                yield ('batch', task.file_key, batch, invalid)
+                waited += time.monotonic() - yield_started
+        except Exception as e:
+            yield ('error', task.file_key, str(e), time.monotonic() - started - waited)
+            continue
+        yield ('done', task.file_key, None, time.monotonic() - started - waited)
+
+
+def _parallel_messages(tasks, workers, batch_size):
+    """
+    작업자 프로세스 여러 개에서 파싱하고 결과 배치를 차례로 반환
+
+    결과 큐 크기를 제한하여 쓰기 단계가 밀리면 작업자가 기다리므로 메모리 사용량이 늘지 않습니다.
+    """
+    context = multiprocessing.get_context()
+    task_queue = context.Queue()
+    results = context.Queue(maxsize=workers * QUEUE_BATCHES_PER_WORKER)
+    for task in tasks:
+        task_queue.put(task)
+    for _ in range(workers):
+        task_queue.put(None)
+
+    connections.close_all()  # fork 전에 DB 연결을 닫아 작업자와 공유하지 않음
+    processes = [context.Process(target=_worker, args=(task_queue, results, batch_size), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    running = workers
+    try:
+        while running:
+            try:
+                message = results.get(timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError('파싱 작업자가 비정상 종료되었습니다')
+                continue
+            if message[0] == 'exit':
+                running -= 1
+                continue
+            yield message
+    finally:
+        for process in processes:
+            if process.is_alive() and running:
+                process.terminate()
+            process.join()
+
+
+def iter_parsed(tasks, workers=1, batch_size=BATCH_SIZE):
+    """
+    파싱 단계 메시지 (종류, file_key, 내용, 부가값)
+
+    ('batch', file_key, 행 목록, 건너뛴 항목 수), ('done', file_key, None, 파싱 초), ('error', file_key, 오류, 파싱 초)
+    workers가 2 이상이면 작업자 프로세스에서 파싱합니다.
+    """
+    workers = min(max(1, workers), len(tasks)) or 1
+    if workers > 1:
+        return _parallel_messages(tasks, workers, batch_size)
+    return _inline_messages(tasks, batch_size)
+
+
+class _CreateMissingWriter:
+    """
+    기존 content_id는 건너뛰고 새 행만 bulk_create (--sync 없이 실행할 때)
+
+    중복 병합(dedupe_places)된 행도 비활성화 상태로 남아 있으므로 다시 만들지 않습니다.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.files = {}
+        self.stats = Counter()
+
+    def write(self, task, rows):
+        counts = self.files.setdefault(task.file_key, Counter())
+        existing = set(self.model.objects.filter(
+            content_id__in=[row['content_id'] for row in rows]).values_list('content_id', flat=True))
+        created = []
+        for row in rows:
+            if row['content_id'] in existing:
+                counts['skipped'] += 1
+                continue
+            existing.add(row['content_id'])
+            # 다음 --sync에서 비교할 해시 포함
+            created.append(self.model(**row, content_hash=row_hash(row)))
+        self.model.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        counts['created'] += len(created)
+
+    def complete(self, task):
+        counts = self.files.pop(task.file_key, Counter())
+        self.stats.update(counts)
+        return f"생성: {counts['created']}개, 스킵: {counts['skipped']}개"
+
+    def summary(self):
+        return f"완료! 총 {self.stats['created']}개 생성, {self.stats['skipped']}개 스킵"
+
+
+class _SyncWriter:
+    """증분 동기화 (utils.data_sync.IncrementalSync)"""
+
+    def __init__(self, model, dataset):
+        self.sync = IncrementalSync(model, dataset)
+        self.checksums = {}
+        self.files = {}
+
+    def write(self, task, rows):
+        created, updated = self.sync.apply_batch(task.file_key, rows)
+        counts = self.files.setdefault(task.file_key, Counter())
+        counts['created'] += created
+        counts['updated'] += updated
+
+    def complete(self, task):
+        counts = self.files.pop(task.file_key, Counter())
+        deactivated = self.sync.complete_file(task.file_key, self.checksums[task.file_key], task.scope)
+        return f"생성: {counts['created']}개, 갱신: {counts['updated']}개, 비활성화: {deactivated}개"
+
+    def summary(self):
+        stats = self.sync.stats
+        return (f"동기화 완료! 생성 {stats['created']}개, 갱신 {stats['updated']}개, 변경 없음 {stats['unchanged']}개, "
+                f"비활성화 {stats['deactivated']}개 (변경 없는 파일 {stats['skipped_files']}개, "
+                f"사라진 파일 {stats['removed_files']}개, 병합된 중복 유지 {stats['merged']}개)")
+
+
+class IngestPipeline:
+    """
+    tourism_data 적재 파이프라인 (load_places / load_festivals 공용)
+
+    1. (--sync) 파일 체크섬 - 바뀌지 않은 파일은 건너뜀
+    2. 파싱/정규화 - 작업자 프로세스에서 파일을 스트리밍으로 읽어 BATCH_SIZE 행씩 넘김
+    3. 쓰기 - 현재 프로세스 하나에서만 DB에 씀 (SQLite 쓰기 잠금 경합 없음)
+    단계별 시간을 마지막에 출력합니다.
+    """
+
+    def __init__(self, model, dataset, stdout, style, sync=False, workers=1, batch_size=BATCH_SIZE):
+        self.model = model
+        self.dataset = dataset
+        self.stdout = stdout
+        self.style = style
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.writer = _SyncWriter(model, dataset) if sync else _CreateMissingWriter(model)
+        self.timings = Counter()
+
+    def _select_tasks(self, tasks):
+        """--sync면 체크섬이 바뀐 파일만"""
+        if not isinstance(self.writer, _SyncWriter):
+            return list(tasks)
+        started = time.monotonic()
+        selected = []
+        for task in tasks:
+            try:
+                checksum = file_checksum(task.path)
+            except OSError as e:
+                self.writer.sync.seen_files.add(task.file_key)  # 읽지 못한 파일의 행은 비활성화하지 않음
+                self.stdout.write(self.style.ERROR(f'  - {task.file_key} ERROR 오류: {e}'))
+                continue
+            if self.writer.sync.is_unchanged(task.file_key, checksum):
+                self.stdout.write(f'  - {task.file_key} 변경 없음')
+                continue
+            self.writer.checksums[task.file_key] = checksum
+            selected.append(task)
+        self.timings['checksum'] += time.monotonic() - started
+        return selected
+
+    def run(self, tasks, folders):
+        """
+        적재 실행 (folders: 이번에 읽은 폴더 - --sync에서 이 폴더 안의 사라진 파일만 비활성화)
+        """
+        started = time.monotonic()
+        tasks = self._select_tasks(tasks)
+        by_key = {task.file_key: task for task in tasks}
+        workers = min(self.workers, len(tasks)) or 1
+        self.stdout.write(f'\n파일 {len(tasks)}개 처리 중... (파싱 작업자 {workers}개)')
+        messages = iter_parsed(tasks, workers, self.batch_size)
+
+        invalid = Counter()
+        failed = set()  # 쓰기 중 오류가 난 파일 (남은 배치는 버림)
+        for kind, file_key, payload, extra in messages:
+            task = by_key[file_key]
+            if kind != 'batch':
+                self.timings['parse'] += extra
+            if file_key in failed:
+                continue
+            write_started = time.monotonic()
+            try:
+                if kind == 'batch':
+                    self.writer.write(task, payload)
+                    invalid[file_key] += extra
+                elif kind == 'done':
+                    result = self.writer.complete(task)
+                    if invalid[file_key]:
+                        result += f', 잘못된 항목: {invalid[file_key]}개'
+                    self.stdout.write(f'  - {file_key} OK {result}')
+                else:
+                    raise ValueError(payload)
+            except Exception as e:
+                failed.add(file_key)
+                self.writer.files.pop(file_key, None)
+                self.stdout.write(self.style.ERROR(f'  - {file_key} ERROR 오류: {e}'))
+            self.timings['write'] += time.monotonic() - write_started
+
+        if isinstance(self.writer, _SyncWriter):
+            self.writer.sync.finish(folders)
+        total = time.monotonic() - started
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(self.style.SUCCESS(self.writer.summary()))
+        self.stdout.write(
+            f"단계별 시간: 체크섬 {self.timings['checksum']:.2f}초, 파싱/정규화 {self.timings['parse']:.2f}초 "
+            f"(작업자 합계), DB 쓰기 {self.timings['write']:.2f}초, 전체 {total:.2f}초"
+        )
+        self.stdout.write('=' * 60)
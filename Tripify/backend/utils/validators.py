@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+
+ITINERARY_MEAL_KEYS = ('아침', '점심', '저녁')
+
+# 일차별 필드 -> (허용 타입, 필수 여부)
+ITINERARY_DAY_FIELDS = {
+    'day_number': ((int,), True),
+    'description': ((str,), False),
+    'attractions': ((list,), True),
+    'transportation_info': ((dict,), False),
+    'accommodation_info': ((dict,), False),
+    'meals_info': ((dict,), True),
+    'events_info': ((list,), False),
+    'estimated_cost': ((int, float), True),
+}
+
+
+def _type_checker(types):
+    """bool을 숫자로 취급하지 않는 isinstance 검사 함수 생성"""
+    numeric = int in types or float in types
+
+    def check(value):
+        if numeric and isinstance(value, bool):
+            return False
+        return isinstance(value, types)
+
+    return check
+
+
+@lru_cache(maxsize=64)
+def compile_itinerary_validator(expected_days=None, meal_keys=ITINERARY_MEAL_KEYS, first_day=1):
+    """
+    일정 JSON 검증 함수 생성
+
+    필드별 타입 검사 함수를 미리 만들어 두고, 반환된 validate(data)는
+    일정 전체를 한 번만 순회하며 구조/타입/일수/식사 키를 검사해 오류 메시지 목록을 반환합니다.
+    (오류가 없으면 빈 목록)
+    """
+    field_checks = tuple(
+        (name, _type_checker(types), required)
+        for name, (types, required) in ITINERARY_DAY_FIELDS.items()
+    )
+    meal_keys = tuple(meal_keys)
+
+    def validate(data):
+        if not isinstance(data, dict):
+            return ['최상위 JSON이 객체가 아닙니다.']
+        days = data.get('days')
+        if not isinstance(days, list):
+            return ['"days" 배열이 없습니다.']
+
+        errors = []
+        if expected_days is not None and len(days) != expected_days:
+            errors.append(f'일수 불일치: 요청 {expected_days}일, 생성 {len(days)}일')
+
+        for index, day in enumerate(days, first_day):
+            if not isinstance(day, dict):
+                errors.append(f'Day {index} - 객체가 아닙니다.')
+                continue
+
+            for name, check, required in field_checks:
+                if name not in day:
+                    if required:
+                        errors.append(f'Day {index} - {name} 누락')
+                elif not check(day[name]):
+                    errors.append(f'Day {index} - {name} 타입 오류: {type(day[name]).__name__}')
+
+            if day.get('day_number') != index:
+                errors.append(f'Day {index} - day_number 순서 오류: {day.get("day_number")}')
+
+            meals_info = day.get('meals_info')
+            if isinstance(meals_info, dict):
+                missing_keys = [key for key in meal_keys if key not in meals_info]
+                if missing_keys:
+                    errors.append(f'Day {index} - meals_info에 누락된 키: {missing_keys}')
+
+        return errors
+
+    return validate
+
+
+def validate_itinerary(data, expected_days=None, first_day=1):
+    """일정 JSON 검증 (오류 메시지 목록 반환)"""
+    return compile_itinerary_validator(expected_days, first_day=first_day)(data)
@@ -12,6 +12,11 @@ export const placeAPI = {
   getFestivals(params) {
     return axios.get('/places/festivals/', { params })
   },
+
+  // 좌표 -> 행정구역 (서버 오프라인 조회, 응답: sido, sigungu, address)
+  reverseGeocode(lat, lng) {
+    return axios.get('/places/reverse-geocode/', { params: { lat, lng } })
+  },
   
   getBookmarks() {
     return axios.get('/bookmarks/')
@@ -13,10 +13,12 @@ export const tripAPI = {
     return axios.post('/travel/plans/', data)
   },
   
-  generatePlan(data) {
+  generatePlan(data, idempotencyKey) {
     // AI 일정 생성은 시간이 걸리므로 60초 타임아웃 설정
+    // 같은 Idempotency-Key로 다시 요청하면 서버가 이전 결과를 그대로 반환 (중복 생성 방지)
     return axios.post('/travel/plans/generate/', data, {
       timeout: 60000, // 60초
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
     })
   },
   
@@ -40,9 +42,10 @@ export const tripAPI = {
     return axios.get('/travel/recommended/')
   },
   
-  modifyPlan(id, data) {
+  modifyPlan(id, data, idempotencyKey) {
     return axios.post(`/travel/plans/${id}/modify/`, data, {
       timeout: 60000, // 60초
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
     })
   },
   
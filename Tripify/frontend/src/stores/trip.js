@@ -7,6 +7,17 @@ export const useTripStore = defineStore('trip', () => {
   const currentPlan = ref(null)
   const loading = ref(false)
 
+  // 같은 내용의 재요청(더블 클릭, 타임아웃 후 재시도)에는 같은 Idempotency-Key 사용
+  // 성공하면 키를 지워서, 이후 같은 조건으로 새로 생성할 때는 새 키 사용
+  const idempotencyKeys = new Map()
+  const idempotencyKeyFor = (scope, data) => {
+    const fingerprint = `${scope}:${JSON.stringify(data)}`
+    if (!idempotencyKeys.has(fingerprint)) {
+      idempotencyKeys.set(fingerprint, crypto.randomUUID())
+    }
+    return [fingerprint, idempotencyKeys.get(fingerprint)]
+  }
+
   const fetchPlans = async () => {
     loading.value = true
     try {
@@ -60,7 +71,9 @@ export const useTripStore = defineStore('trip', () => {
   const generatePlan = async (data) => {
     loading.value = true
     try {
-      const response = await tripAPI.generatePlan(data)
+      const [fingerprint, idempotencyKey] = idempotencyKeyFor('generate', data)
+      const response = await tripAPI.generatePlan(data, idempotencyKey)
+      idempotencyKeys.delete(fingerprint)
       console.log('=== generatePlan API Response ===')
       console.log('Plan ID:', response.data?.id)
       console.log('Has itineraries:', !!response.data?.itineraries)
@@ -174,7 +187,9 @@ export const useTripStore = defineStore('trip', () => {
     loading.value = true
     try {
       console.log('[Store] 계획 수정 시작 - Plan ID:', id, '요구사항:', requirements)
-      const response = await tripAPI.modifyPlan(id, { requirements })
+      const [fingerprint, idempotencyKey] = idempotencyKeyFor(`modify:${id}`, { requirements })
+      const response = await tripAPI.modifyPlan(id, { requirements }, idempotencyKey)
+      idempotencyKeys.delete(fingerprint)
       console.log('[Store] 계획 수정 성공:', response.data)
       
       // 현재 계획 업데이트